@@ -144,18 +144,168 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+REDIS_URL = f"redis://{os.environ.get('REDIS_HOST', 'redis')}:6379/0"
+
+# Banco do Redis usado pelos testes (é limpo a cada teste; nunca aponte para o do broker)
+REDIS_TEST_URL = os.environ.get('REDIS_TEST_URL', f"redis://{os.environ.get('REDIS_HOST', 'redis')}:6379/15")
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"redis://{os.environ.get('REDIS_HOST', 'redis')}:6379/1",
+    }
+}
+
+# Tempo (segundos) que os contadores do dashboard ficam em cache
+DASHBOARD_STATS_CACHE_TTL = int(os.environ.get('DASHBOARD_STATS_CACHE_TTL', 30))
+
 CELERY_BROKER_URL = f"redis://{os.environ.get('REDIS_HOST', 'redis')}:6379/0"
 CELERY_RESULT_BACKEND = f"redis://{os.environ.get('REDIS_HOST', 'redis')}:6379/0"
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+# Alertas do Discord ficam numa fila própria (worker: celery -A app worker -Q discord)
+CELERY_TASK_ROUTES = {
+    'automations.tasks.deliver_discord_batch': {'queue': 'discord'},
+    'automations.tasks.flush_discord_webhook': {'queue': 'discord'},
+}
+
+# Agendamento adaptativo por canal (segundos)
+LIVE_SCHEDULER_TICK = float(os.environ.get('LIVE_SCHEDULER_TICK', 15))
+LIVE_SCHEDULER_MAX_DISPATCH = int(os.environ.get('LIVE_SCHEDULER_MAX_DISPATCH', 20000))
+LIVE_SCHEDULER_CLAIM_SECONDS = int(os.environ.get('LIVE_SCHEDULER_CLAIM_SECONDS', 300))
+LIVE_SCHEDULER_CHUNK_SIZE = int(os.environ.get('LIVE_SCHEDULER_CHUNK_SIZE', 2000))
+# Um canal fica no máximo uma vez na fila/em verificação; a marca expira sozinha se o worker morrer
+LIVE_DISPATCH_DEDUP_SECONDS = int(os.environ.get('LIVE_DISPATCH_DEDUP_SECONDS', 900))
+# Backpressure: a fila do broker guarda no máximo TARGET_SECONDS de trabalho na vazão medida dos workers (0 desliga)
+LIVE_BACKPRESSURE_TARGET_SECONDS = float(os.environ.get('LIVE_BACKPRESSURE_TARGET_SECONDS', 60))
+LIVE_BACKPRESSURE_WINDOW = int(os.environ.get('LIVE_BACKPRESSURE_WINDOW', 60))
+LIVE_BACKPRESSURE_MIN_BATCHES = int(os.environ.get('LIVE_BACKPRESSURE_MIN_BATCHES', 4))
+# Intervalo usado quando nenhum seguidor do canal tem plano (o de cada plano fica em Plan.poll_interval_seconds)
+LIVE_POLL_DEFAULT_INTERVAL = int(os.environ.get('LIVE_POLL_DEFAULT_INTERVAL', 60))
+LIVE_POLL_ONLINE_INTERVAL = int(os.environ.get('LIVE_POLL_ONLINE_INTERVAL', 30))
+LIVE_POLL_MAX_INTERVAL = int(os.environ.get('LIVE_POLL_MAX_INTERVAL', 3600))
+# Canal que a plataforma disse não existir (handle inválido)
+LIVE_POLL_NOT_FOUND_INTERVAL = int(os.environ.get('LIVE_POLL_NOT_FOUND_INTERVAL', 6 * 3600))
+LIVE_POLL_IDLE_FACTOR = int(os.environ.get('LIVE_POLL_IDLE_FACTOR', 5))
+LIVE_POLL_DORMANT_FACTOR = int(os.environ.get('LIVE_POLL_DORMANT_FACTOR', 15))
+LIVE_POLL_IDLE_AFTER_DAYS = int(os.environ.get('LIVE_POLL_IDLE_AFTER_DAYS', 7))
+LIVE_POLL_DORMANT_AFTER_DAYS = int(os.environ.get('LIVE_POLL_DORMANT_AFTER_DAYS', 30))
+LIVE_POLL_HOT_WINDOW_HOURS = int(os.environ.get('LIVE_POLL_HOT_WINDOW_HOURS', 1))
+LIVE_POLL_DAILY_HABIT_THRESHOLD = int(os.environ.get('LIVE_POLL_DAILY_HABIT_THRESHOLD', 3))
+
 CELERY_BEAT_SCHEDULE = {
-    'check-lives-every-minute': {
+    'dispatch-due-channels': {
         'task': 'automations.tasks.scheduler_beat',
-        'schedule': 60.0,
+        'schedule': LIVE_SCHEDULER_TICK,
     },
+    'sync-monitored-channels': {
+        'task': 'automations.tasks.sync_monitored_channels',
+        'schedule': 600.0,
+    },
+    'enforce-plan-limits': {
+        'task': 'automations.tasks.enforce_plan_limits_sweep',
+        'schedule': 3600.0,
+    },
+    'purge-notification-logs': {
+        'task': 'automations.tasks.purge_notification_logs_sweep',
+        'schedule': 3600.0,
+    },
+    'renew-websub-subscriptions': {
+        'task': 'automations.tasks.renew_websub_subscriptions',
+        'schedule': 600.0,
+    },
+}
+
+# Verificação de lives em lote (asyncio + httpx)
+YOUTUBE_BASE_URL = os.environ.get('YOUTUBE_BASE_URL', 'https://www.youtube.com')
+TIKTOK_BASE_URL = os.environ.get('TIKTOK_BASE_URL', 'https://www.tiktok.com')
+LIVE_CHECK_BATCH_SIZE = int(os.environ.get('LIVE_CHECK_BATCH_SIZE', 200))
+LIVE_CHECK_CONCURRENCY = int(os.environ.get('LIVE_CHECK_CONCURRENCY', 50))
+LIVE_CHECK_TIMEOUT = float(os.environ.get('LIVE_CHECK_TIMEOUT', 10))
+LIVE_CHECK_CONNECT_TIMEOUT = float(os.environ.get('LIVE_CHECK_CONNECT_TIMEOUT', 5))
+
+# Circuit breaker por plataforma: abre quando a taxa de erro da janela passa do limite
+LIVE_BREAKER_ERROR_THRESHOLD = float(os.environ.get('LIVE_BREAKER_ERROR_THRESHOLD', 0.5))
+LIVE_BREAKER_MIN_REQUESTS = int(os.environ.get('LIVE_BREAKER_MIN_REQUESTS', 20))
+LIVE_BREAKER_WINDOW = float(os.environ.get('LIVE_BREAKER_WINDOW', 60))
+LIVE_BREAKER_OPEN_SECONDS = float(os.environ.get('LIVE_BREAKER_OPEN_SECONDS', 60))
+LIVE_BREAKER_HALF_OPEN_PROBES = int(os.environ.get('LIVE_BREAKER_HALF_OPEN_PROBES', 3))
+
+# Limite global de requisições por segundo em cada plataforma (0 desliga)
+LIVE_PLATFORM_RPS = {
+    'YOUTUBE': float(os.environ.get('YOUTUBE_MAX_RPS', 20)),
+    'TIKTOK': float(os.environ.get('TIKTOK_MAX_RPS', 10)),
+}
+
+# Concorrência e tamanho de lote por plataforma (0 usa LIVE_CHECK_CONCURRENCY / LIVE_CHECK_BATCH_SIZE)
+LIVE_PLATFORM_CONCURRENCY = {
+    'YOUTUBE': int(os.environ.get('YOUTUBE_CHECK_CONCURRENCY', 0)),
+    'TIKTOK': int(os.environ.get('TIKTOK_CHECK_CONCURRENCY', 0)),
 }
+LIVE_PLATFORM_BATCH_SIZE = {
+    'YOUTUBE': int(os.environ.get('YOUTUBE_CHECK_BATCH_SIZE', 0)),
+    'TIKTOK': int(os.environ.get('TIKTOK_CHECK_BATCH_SIZE', 0)),
+}
+
+# @handles / URLs personalizadas do YouTube já resolvidas para o ID do canal (segundos em cache)
+YOUTUBE_ALIAS_CACHE_TTL = int(os.environ.get('YOUTUBE_ALIAS_CACHE_TTL', 24 * 3600))
+YOUTUBE_ALIAS_NOT_FOUND_TTL = int(os.environ.get('YOUTUBE_ALIAS_NOT_FOUND_TTL', 3600))
+
+# Salas ao vivo do TikTok em cache: as verificações seguintes usam o check_alive em lote
+TIKTOK_WEBCAST_URL = os.environ.get('TIKTOK_WEBCAST_URL', 'https://webcast.tiktok.com/webcast')
+TIKTOK_ROOM_CACHE_TTL = int(os.environ.get('TIKTOK_ROOM_CACHE_TTL', 6 * 3600))
+TIKTOK_CHECK_ALIVE_BATCH_SIZE = int(os.environ.get('TIKTOK_CHECK_ALIVE_BATCH_SIZE', 50))
+
+# Watcher do TikTok: conexão persistente com os canais ao vivo (comando watch_tiktok)
+TIKTOK_WATCHER_MAX_CONNECTIONS = int(os.environ.get('TIKTOK_WATCHER_MAX_CONNECTIONS', 500))
+TIKTOK_WATCHER_REFRESH_SECONDS = float(os.environ.get('TIKTOK_WATCHER_REFRESH_SECONDS', 30))
+TIKTOK_WATCHER_LEASE_SECONDS = int(os.environ.get('TIKTOK_WATCHER_LEASE_SECONDS', 90))
+TIKTOK_WATCHER_RETRY_SECONDS = float(os.environ.get('TIKTOK_WATCHER_RETRY_SECONDS', 30))
+
+# WebSub (push do YouTube). Sem WEBSUB_CALLBACK_BASE_URL (URL pública do site) fica desligado
+WEBSUB_CALLBACK_BASE_URL = os.environ.get('WEBSUB_CALLBACK_BASE_URL', '')
+WEBSUB_HUB_URL = os.environ.get('WEBSUB_HUB_URL', 'https://pubsubhubbub.appspot.com/subscribe')
+WEBSUB_LEASE_SECONDS = int(os.environ.get('WEBSUB_LEASE_SECONDS', 5 * 24 * 3600))
+WEBSUB_RENEW_BEFORE = int(os.environ.get('WEBSUB_RENEW_BEFORE', 24 * 3600))
+WEBSUB_RETRY_SECONDS = int(os.environ.get('WEBSUB_RETRY_SECONDS', 3600))
+WEBSUB_MAX_REQUESTS_PER_RUN = int(os.environ.get('WEBSUB_MAX_REQUESTS_PER_RUN', 200))
+WEBSUB_TIMEOUT = float(os.environ.get('WEBSUB_TIMEOUT', 10))
+WEBSUB_PUSH_DEBOUNCE = float(os.environ.get('WEBSUB_PUSH_DEBOUNCE', 10))
+# Polling dos canais com inscrição válida e fora do ar vira rede de segurança
+WEBSUB_SAFETY_NET_INTERVAL = int(os.environ.get('WEBSUB_SAFETY_NET_INTERVAL', 1800))
+
+# Cache compartilhado do resultado das verificações (segundos)
+LIVE_STATUS_CACHE_TTL = float(os.environ.get('LIVE_STATUS_CACHE_TTL', 15))
+LIVE_STATUS_LOCK_TIMEOUT = float(os.environ.get('LIVE_STATUS_LOCK_TIMEOUT', LIVE_CHECK_TIMEOUT + 5))
+LIVE_STATUS_WAIT_INTERVAL = 0.1
+
+# Leitura em streaming da página /live do YouTube
+YOUTUBE_SCAN_CHUNK_SIZE = int(os.environ.get('YOUTUBE_SCAN_CHUNK_SIZE', 16384))
+YOUTUBE_SCAN_MAX_BYTES = int(os.environ.get('YOUTUBE_SCAN_MAX_BYTES', 1500000))
+
+# Entrega no Discord: token bucket por webhook e global (tokens/segundo)
+DISCORD_TIMEOUT = float(os.environ.get('DISCORD_TIMEOUT', 10))
+DISCORD_COALESCE_WINDOW = float(os.environ.get('DISCORD_COALESCE_WINDOW', 2))
+DISCORD_MAX_EMBEDS = 10
+DISCORD_WEBHOOK_BUCKET_CAPACITY = int(os.environ.get('DISCORD_WEBHOOK_BUCKET_CAPACITY', 5))
+DISCORD_WEBHOOK_RATE = float(os.environ.get('DISCORD_WEBHOOK_RATE', 2.5))
+DISCORD_GLOBAL_BUCKET_CAPACITY = int(os.environ.get('DISCORD_GLOBAL_BUCKET_CAPACITY', 50))
+DISCORD_GLOBAL_RATE = float(os.environ.get('DISCORD_GLOBAL_RATE', 40))
+DISCORD_MAX_ATTEMPTS = int(os.environ.get('DISCORD_MAX_ATTEMPTS', 5))
+DISCORD_RETRY_BASE_DELAY = float(os.environ.get('DISCORD_RETRY_BASE_DELAY', 2))
+DISCORD_RETRY_MAX_DELAY = float(os.environ.get('DISCORD_RETRY_MAX_DELAY', 300))
+
+# Retenção dos logs de notificação: 'archive' copia para NotificationLogArchive antes de apagar, 'delete' só apaga.
+# NOTIFICATION_LOG_RETENTION_DAYS=0 desliga a limpeza.
+NOTIFICATION_LOG_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_LOG_RETENTION_DAYS', 90))
+NOTIFICATION_LOG_RETENTION_MODE = os.environ.get('NOTIFICATION_LOG_RETENTION_MODE', 'archive')
+NOTIFICATION_LOG_RETENTION_BATCH = int(os.environ.get('NOTIFICATION_LOG_RETENTION_BATCH', 5000))
+NOTIFICATION_LOG_RETENTION_MAX_BATCHES = int(os.environ.get('NOTIFICATION_LOG_RETENTION_MAX_BATCHES', 100))
+
+# Token exigido pelo endpoint /metrics (Prometheus). Vazio: só usuários staff logados acessam.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
 
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
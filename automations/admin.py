@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Automation, NotificationLog
+from .models import Automation, MonitoredChannel, NotificationLog, NotificationLogArchive, YouTubeChannelAlias
 
 # --- CONFIGURAÇÃO DE AUTOMAÇÕES ---
 @admin.register(Automation)
@@ -10,11 +10,12 @@ class AutomationAdmin(admin.ModelAdmin):
         'platform', 
         'channel_identifier', 
         'is_active', 
+        'is_suspended',
         'last_status', 
         'updated_at'
     )
     
-    list_filter = ('platform', 'is_active', 'last_status', 'created_at')
+    list_filter = ('platform', 'is_active', 'is_suspended', 'last_status', 'created_at')
     search_fields = ('name', 'user__username', 'channel_identifier')
     list_editable = ('is_active',)
     readonly_fields = ('created_at', 'updated_at')
@@ -27,18 +28,54 @@ class AutomationAdmin(admin.ModelAdmin):
             'fields': ('discord_webhook_url',),
         }),
         ('Status e Histórico', {
-            'fields': ('last_status', 'created_at', 'updated_at'),
+            'fields': ('last_status', 'is_suspended', 'created_at', 'updated_at'),
         }),
     )
 
 # --- CONFIGURAÇÃO DE LOGS ---
 @admin.register(NotificationLog)
 class NotificationLogAdmin(admin.ModelAdmin):
-    list_display = ('automation', 'status', 'timestamp')
-    list_filter = ('status', 'timestamp')
+    list_display = ('automation', 'status', 'event', 'timestamp')
+    list_filter = ('status', 'event', 'timestamp')
     search_fields = ('automation__name', 'details')
-    readonly_fields = ('automation', 'status', 'details', 'timestamp')
+    readonly_fields = ('automation', 'status', 'event', 'details', 'timestamp')
+    list_select_related = ('automation',)
+    # Evita o COUNT(*) da tabela inteira a cada página
+    show_full_result_count = False
     
     # Remove botão de "Adicionar Log" manual, pois logs devem ser gerados pelo sistema
     def has_add_permission(self, request):
-        return False
\ No newline at end of file
+        return False
+
+@admin.register(NotificationLogArchive)
+class NotificationLogArchiveAdmin(admin.ModelAdmin):
+    list_display = ('automation_id', 'user_id', 'status', 'event', 'timestamp')
+    list_filter = ('status', 'event')
+    search_fields = ('details',)
+    readonly_fields = ('automation_id', 'user_id', 'status', 'event', 'details', 'timestamp')
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+# --- CONFIGURAÇÃO DE CANAIS MONITORADOS ---
+@admin.register(MonitoredChannel)
+class MonitoredChannelAdmin(admin.ModelAdmin):
+    list_display = (
+        'channel_identifier',
+        'platform',
+        'is_active',
+        'last_status',
+        'last_checked_at',
+        'next_check_at',
+        'last_live_at',
+    )
+    list_filter = ('platform', 'is_active', 'last_status')
+    search_fields = ('channel_identifier',)
+    readonly_fields = ('last_checked_at', 'last_live_at', 'live_start_hours')
+
+@admin.register(YouTubeChannelAlias)
+class YouTubeChannelAliasAdmin(admin.ModelAdmin):
+    list_display = ('alias', 'channel_id', 'resolved_at')
+    search_fields = ('alias', 'channel_id')
+    readonly_fields = ('resolved_at',)
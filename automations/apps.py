@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class AutomationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'automations'
\ No newline at end of file
+    name = 'automations'
+
+    def ready(self):
+        import automations.signals
@@ -0,0 +1,86 @@
+"""
+Quanto o scheduler pode despachar por ciclo sem empilhar trabalho no broker.
+
+A fila do Celery é uma lista no mesmo Redis de REDIS_URL e é medida em
+mensagens; cada mensagem é um lote de process_channels_batch. A vazão dos
+workers vem dos lotes terminados nos últimos LIVE_BACKPRESSURE_WINDOW
+segundos, contados em baldes de BUCKET_SECONDS no Redis.
+"""
+import logging
+import math
+import time
+
+import redis
+from django.conf import settings
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+DRAINED_KEY = "scheduler:drained"
+BUCKET_SECONDS = 10
+
+
+def _bucket(now):
+    return int(now // BUCKET_SECONDS)
+
+
+def _window_buckets():
+    return max(1, int(settings.LIVE_BACKPRESSURE_WINDOW // BUCKET_SECONDS))
+
+
+def record_drained(batches=1, now=None):
+    """
+    Conta lotes terminados pelos workers no balde do instante atual.
+    """
+    key = f"{DRAINED_KEY}:{_bucket(now or time.time())}"
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.incrby(key, batches)
+        pipe.expire(key, (_window_buckets() + 1) * BUCKET_SECONDS)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Falha ao registrar vazão dos workers: {e}")
+
+
+def drain_rate(now=None):
+    """
+    Lotes terminados por segundo na janela, só com baldes já fechados.
+    """
+    current = _bucket(now or time.time())
+    buckets = range(current - _window_buckets(), current)
+    values = get_redis().mget([f"{DRAINED_KEY}:{bucket}" for bucket in buckets])
+    return sum(int(value or 0) for value in values) / (len(buckets) * BUCKET_SECONDS)
+
+
+def queue_depth():
+    """
+    Mensagens esperando na fila padrão do Celery (a dos lotes de verificação).
+    """
+    return get_redis().llen(getattr(settings, 'CELERY_TASK_DEFAULT_QUEUE', 'celery'))
+
+
+def dispatch_budget():
+    """
+    Quantos lotes podem entrar na fila neste ciclo: o suficiente para a fila
+    ter LIVE_BACKPRESSURE_TARGET_SECONDS de trabalho na vazão medida. Fila
+    vazia quer dizer workers ociosos, então o alvo dobra até achar a capacidade
+    real; LIVE_BACKPRESSURE_MIN_BATCHES garante a partida sem histórico.
+
+    Retorna (orçamento, profundidade da fila, vazão); orçamento None quando o
+    controle está desligado ou o broker não respondeu (despacha tudo, como antes).
+    """
+    if not settings.LIVE_BACKPRESSURE_TARGET_SECONDS:
+        return None, None, None
+    try:
+        depth = queue_depth()
+        rate = drain_rate()
+    except redis.RedisError as e:
+        logger.warning(f"Sem leitura da fila do broker, despachando sem limite: {e}")
+        return None, None, None
+
+    target = rate * settings.LIVE_BACKPRESSURE_TARGET_SECONDS
+    if depth == 0:
+        target *= 2
+    budget = max(settings.LIVE_BACKPRESSURE_MIN_BATCHES, math.ceil(target)) - depth
+    return max(0, budget), depth, rate
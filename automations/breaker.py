@@ -0,0 +1,142 @@
+import time
+
+from django.conf import settings
+
+from app.redis_client import get_redis
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Resultado de allow(): pode verificar tudo, não pode verificar nada, ou só algumas sondas
+ALLOW = 'allow'
+DENY = 'deny'
+PROBE = 'probe'
+
+# Decide se a plataforma pode ser chamada. Aberto até 'until'; depois disso passa
+# para meio-aberto e libera no máximo ARGV[3] sondas (renovadas se ninguém reportar).
+ALLOW_SCRIPT = """
+local key = KEYS[1]
+local now_ms = tonumber(ARGV[1])
+local open_ms = tonumber(ARGV[2])
+local max_probes = tonumber(ARGV[3])
+
+local state = redis.call('HGET', key, 'state')
+if not state then
+    return 'allow'
+end
+
+local until_ms = tonumber(redis.call('HGET', key, 'until'))
+if state == 'open' then
+    if now_ms < until_ms then
+        return 'deny'
+    end
+    redis.call('HSET', key, 'state', 'half_open', 'probes', 0, 'until', now_ms + open_ms)
+elseif now_ms >= until_ms then
+    -- Sondas que nunca reportaram (worker caiu): libera outras
+    redis.call('HSET', key, 'probes', 0, 'until', now_ms + open_ms)
+end
+
+if redis.call('HINCRBY', key, 'probes', 1) <= max_probes then
+    return 'probe'
+end
+return 'deny'
+"""
+
+# Registra sucessos/falhas. Fechado: abre quando a taxa de erro da janela passa
+# do limite. Meio-aberto: qualquer falha reabre, sucesso fecha.
+RECORD_SCRIPT = """
+local key = KEYS[1]
+local window_key = KEYS[2]
+local now_ms = tonumber(ARGV[1])
+local successes = tonumber(ARGV[2])
+local failures = tonumber(ARGV[3])
+local min_requests = tonumber(ARGV[4])
+local threshold = tonumber(ARGV[5])
+local open_ms = tonumber(ARGV[6])
+local window_ms = tonumber(ARGV[7])
+
+local state = redis.call('HGET', key, 'state')
+if state == 'open' then
+    return 'open'
+end
+if state == 'half_open' then
+    if failures > 0 then
+        redis.call('HSET', key, 'state', 'open', 'until', now_ms + open_ms)
+        return 'opened'
+    end
+    if successes > 0 then
+        redis.call('DEL', key, window_key)
+        return 'closed'
+    end
+    return 'half_open'
+end
+
+local total = redis.call('HINCRBY', window_key, 'total', successes + failures)
+local errors = redis.call('HINCRBY', window_key, 'errors', failures)
+redis.call('PEXPIRE', window_key, window_ms * 2)
+if total >= min_requests and errors / total >= threshold then
+    redis.call('HSET', key, 'state', 'open', 'until', now_ms + open_ms)
+    redis.call('DEL', window_key)
+    return 'opened'
+end
+return 'closed'
+"""
+
+_scripts = {}
+
+
+def _script(name, source):
+    if name not in _scripts:
+        _scripts[name] = get_redis().register_script(source)
+    return _scripts[name]
+
+
+def _state_key(platform):
+    return f"breaker:{platform}"
+
+
+def _window_key(platform, now_ms):
+    window_ms = int(settings.LIVE_BREAKER_WINDOW * 1000)
+    return f"breaker:{platform}:window:{now_ms // window_ms}"
+
+
+def allow(platform):
+    """
+    ALLOW (circuito fechado), DENY (aberto: não chame a plataforma) ou
+    PROBE (meio-aberto: faça só algumas verificações de teste).
+    """
+    return _script('allow', ALLOW_SCRIPT)(
+        keys=[_state_key(platform)],
+        args=[
+            int(time.time() * 1000),
+            int(settings.LIVE_BREAKER_OPEN_SECONDS * 1000),
+            settings.LIVE_BREAKER_HALF_OPEN_PROBES,
+        ],
+    )
+
+
+def record(platform, successes, failures):
+    """
+    Informa o resultado das verificações feitas. Retorna 'opened' quando este
+    registro abriu o circuito, ou o estado atual ('closed', 'open', 'half_open').
+    """
+    if not successes and not failures:
+        return None
+    now_ms = int(time.time() * 1000)
+    return _script('record', RECORD_SCRIPT)(
+        keys=[_state_key(platform), _window_key(platform, now_ms)],
+        args=[
+            now_ms,
+            successes,
+            failures,
+            settings.LIVE_BREAKER_MIN_REQUESTS,
+            settings.LIVE_BREAKER_ERROR_THRESHOLD,
+            int(settings.LIVE_BREAKER_OPEN_SECONDS * 1000),
+            int(settings.LIVE_BREAKER_WINDOW * 1000),
+        ],
+    )
+
+
+def state(platform):
+    return get_redis().hget(_state_key(platform), 'state') or CLOSED
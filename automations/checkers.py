@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import re
+
+import httpx
+from django.conf import settings
+
+from . import breaker
+from .metrics import Recorder
+from .ratelimit import acquire
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+TIKTOK_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json",
+    "Referer": "https://www.tiktok.com/",
+    "Origin": "https://www.tiktok.com",
+}
+
+# Parâmetros mínimos aceitos pela rota pública de sala do TikTok (mesmos usados pela lib TikTokLive)
+TIKTOK_ROOM_PARAMS = {
+    "aid": "1988",
+    "app_name": "tiktok_web",
+    "device_platform": "web_pc",
+    "sourceType": "54",
+}
+
+# Status da sala no TikTok que indica que a live terminou
+TIKTOK_ROOM_ENDED = 4
+
+# Verificação sem resposta (erro, timeout ou circuito aberto): não muda o status de ninguém
+UNKNOWN_RESULT = (None, "", None)
+
+# Canal que não existe na plataforma: certamente não está ao vivo
+GONE_RESULT = (False, "", None)
+
+
+class ChannelGone(Exception):
+    """
+    O canal não existe na plataforma. É um estado do canal, não uma falha da
+    plataforma: não conta para o circuit breaker.
+    """
+
+
+class UpstreamStatusError(Exception):
+    """
+    A plataforma respondeu com um status HTTP diferente de 200.
+    """
+
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def parse_youtube_html(html):
+    """
+    Extrai (is_live, title, thumbnail) do HTML da página /live de um canal.
+    """
+    if '"isLive":true' not in html:
+        return False, "", None
+
+    title_search = re.search(r'<title>(.*?)- YouTube</title>', html)
+    title = title_search.group(1).strip() if title_search else "Live no YouTube"
+    thumb_search = re.search(r'"thumbnailUrl":["\'](.*?)["\']', html)
+    thumbnail = thumb_search.group(1) if thumb_search else None
+    return True, title, thumbnail
+
+
+def parse_tiktok_room(data, username):
+    """
+    Extrai (is_live, title, thumbnail) da resposta JSON de /api-live/user/room/.
+    """
+    live_room = (data.get("data") or {}).get("liveRoom") or {}
+    status = live_room.get("status", TIKTOK_ROOM_ENDED)
+    if status == TIKTOK_ROOM_ENDED:
+        return False, "", None
+
+    title = live_room.get("title") or f"Live de {username}"
+    return True, title, live_room.get("coverUrl") or None
+
+
+def rate_limit_wait(provider):
+    """
+    Consome um token do limite global de requisições por segundo da plataforma
+    (provider.max_rps, compartilhado por todos os workers). Retorna quantos
+    segundos esperar antes de tentar de novo; 0 libera a requisição.
+    """
+    rate = provider.max_rps
+    if not rate:
+        return 0
+    return acquire(f"platform:{provider.platform}", max(1, int(rate)), rate)
+
+
+async def wait_for_rate_limit_async(provider):
+    while wait := await asyncio.to_thread(rate_limit_wait, provider):
+        await asyncio.sleep(wait)
+
+
+def build_client(concurrency=None):
+    """
+    Cliente HTTP compartilhado por todas as verificações de um lote:
+    conexões keep-alive reaproveitadas e HTTP/2 quando o servidor suporta.
+    """
+    concurrency = concurrency or settings.LIVE_CHECK_CONCURRENCY
+    return httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        timeout=httpx.Timeout(settings.LIVE_CHECK_TIMEOUT, connect=settings.LIVE_CHECK_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency,
+            keepalive_expiry=30,
+        ),
+    )
+
+
+async def check_many_async(provider, identifiers, client=None, recorder=None, concurrency=None):
+    """
+    Verifica vários canais da plataforma do `provider` no loop atual: primeiro o
+    que provider.fetch_batch resolver em lote, depois provider.fetch em paralelo
+    para o resto, respeitando `concurrency` (padrão LIVE_CHECK_CONCURRENCY).
+    Retorna {identificador: (is_live, title, thumbnail)}.
+    Latências e erros vão para `recorder` (gravado por quem chamou, fora do loop).
+    """
+    platform = provider.platform
+    semaphore = asyncio.Semaphore(concurrency or settings.LIVE_CHECK_CONCURRENCY)
+    recorder = recorder if recorder is not None else Recorder()
+
+    async def run_one(identifier):
+        async with semaphore:
+            try:
+                await wait_for_rate_limit_async(provider)
+                with recorder.timer('live_check_duration_seconds', platform=platform):
+                    return await provider.fetch(client, identifier)
+            except ChannelGone:
+                logger.info(f"{platform}: canal '{identifier}' não existe; próximas verificações espaçadas")
+                recorder.inc('live_check_errors_total', platform=platform, kind='not_found')
+                await asyncio.to_thread(provider.mark_gone, identifier)
+                return GONE_RESULT
+            except UpstreamStatusError as e:
+                logger.warning(f"{platform} retornou status {e.status_code} para '{identifier}'")
+                recorder.inc('live_check_errors_total', platform=platform, kind=f"http_{e.status_code}")
+            except httpx.TimeoutException as e:
+                logger.error(f"Timeout ao verificar {platform} para '{identifier}': {e}")
+                recorder.inc('live_check_errors_total', platform=platform, kind='timeout')
+            except Exception as e:
+                logger.error(f"Erro ao verificar {platform} para '{identifier}': {e}")
+                recorder.inc('live_check_errors_total', platform=platform, kind='error')
+            return UNKNOWN_RESULT
+
+    owns_client = client is None
+    if owns_client:
+        client = build_client(concurrency)
+    try:
+        resolved = await provider.fetch_batch(client, identifiers, recorder)
+        pending = [identifier for identifier in identifiers if identifier not in resolved]
+        results = await asyncio.gather(*(run_one(identifier) for identifier in pending))
+    finally:
+        if owns_client:
+            await client.aclose()
+
+    resolved.update(zip(pending, results))
+    return {identifier: resolved[identifier] for identifier in identifiers}
+
+
+def check_many(provider, identifiers, concurrency=None, recorder=None):
+    """
+    Ponto de entrada síncrono (LiveProvider.check_many) para check_many_async.
+    Com um `recorder` recebido, gravar as métricas fica a cargo de quem chamou.
+
+    Passa pelo circuit breaker da plataforma: com o circuito aberto nenhum canal
+    é verificado (todos voltam UNKNOWN_RESULT); meio-aberto, só um canal do lote
+    serve de sonda.
+    """
+    identifiers = list(dict.fromkeys(identifiers))
+    if not identifiers:
+        return {}
+    owns_recorder = recorder is None
+    if owns_recorder:
+        recorder = Recorder()
+    platform = provider.platform
+    try:
+        mode = breaker.allow(platform)
+        allowed = []
+        if mode == breaker.ALLOW:
+            allowed = identifiers
+        elif mode == breaker.PROBE:
+            allowed = identifiers[:1]
+
+        results = {}
+        if allowed:
+            results = asyncio.run(check_many_async(provider, allowed, recorder=recorder, concurrency=concurrency))
+            record_outcome(platform, results.values(), recorder)
+
+        skipped = [identifier for identifier in identifiers if identifier not in results]
+        if skipped:
+            recorder.inc('live_check_short_circuited_total', len(skipped), platform=platform)
+            results.update({identifier: UNKNOWN_RESULT for identifier in skipped})
+        return results
+    finally:
+        if owns_recorder:
+            recorder.flush()
+
+
+def record_outcome(platform, results, recorder):
+    """
+    Informa ao circuit breaker quantas verificações deram resposta e quantas falharam.
+    """
+    results = list(results)
+    failures = sum(1 for is_live, _, _ in results if is_live is None)
+    if breaker.record(platform, len(results) - failures, failures) == 'opened':
+        logger.warning(f"Circuit breaker aberto para {platform}: verificações suspensas por {settings.LIVE_BREAKER_OPEN_SECONDS}s")
+        recorder.inc('live_breaker_opened_total', platform=platform)
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import random
+
+from discord_webhook import DiscordEmbed, DiscordWebhook
+from django.conf import settings
+
+from app.redis_client import get_redis
+
+from . import metrics
+from .providers import get_provider
+from .ratelimit import acquire_all, block
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_BUCKET = "discord:global"
+
+# Retira até N alertas da fila do webhook; se ela esvaziar, libera a janela
+# para que o próximo alerta agende um novo flush.
+POP_PENDING_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+redis.call('LTRIM', KEYS[1], #items, -1)
+local remaining = redis.call('LLEN', KEYS[1])
+if remaining == 0 then
+    redis.call('DEL', KEYS[2])
+end
+return {items, remaining}
+"""
+
+_pop_script = None
+
+
+def _pending_keys(webhook_url):
+    digest = hashlib.sha1(webhook_url.encode()).hexdigest()
+    return f"discord:pending:{digest}", f"discord:window:{digest}"
+
+
+def queue_alert(webhook_url, alert, window):
+    """
+    Guarda o alerta na fila do webhook. Retorna True quando abriu uma nova
+    janela de agrupamento (quem chamou deve agendar o flush).
+    """
+    pending_key, window_key = _pending_keys(webhook_url)
+    client = get_redis()
+    client.rpush(pending_key, json.dumps(alert))
+    client.expire(pending_key, 3600)
+    # A chave da janela só expira sozinha se o flush se perder
+    return bool(client.set(window_key, 1, nx=True, ex=int(window) + 300))
+
+
+def pop_pending_alerts(webhook_url, limit):
+    """
+    Retorna (alertas, quantos ainda sobraram na fila).
+    """
+    global _pop_script
+    if _pop_script is None:
+        _pop_script = get_redis().register_script(POP_PENDING_SCRIPT)
+
+    items, remaining = _pop_script(keys=list(_pending_keys(webhook_url)), args=[limit])
+    return [json.loads(item) for item in items], int(remaining)
+
+
+def watch_url(automation):
+    try:
+        provider = get_provider(automation.platform)
+    except LookupError:
+        return ""
+    return provider.watch_url(automation.channel_identifier)
+
+
+def build_discord_embed(automation, is_starting, title, thumbnail_url):
+    if is_starting:
+        embed_color = '00FF00'
+        status_msg = "🔴 LIVE INICIADA!"
+        desc = f"A live **{title}** começou no {automation.get_platform_display()}!"
+    else:
+        embed_color = '808080'
+        status_msg = "⚫ LIVE ENCERRADA!"
+        desc = f"A live no {automation.get_platform_display()} terminou. Obrigado a todos!"
+
+    embed = DiscordEmbed(title=status_msg, description=desc, color=embed_color)
+    if thumbnail_url:
+        embed.set_thumbnail(url=thumbnail_url)
+
+    embed.add_embed_field(name="Assistir agora", value=f"[Clique aqui para entrar]({watch_url(automation)})")
+    embed.set_footer(text=f"Bot LiveSync - Automação: {automation.name}")
+    embed.set_timestamp()
+    return embed
+
+
+def reserve_send(webhook_url):
+    """
+    Consome um token do balde global e um do balde do webhook, os dois juntos:
+    se um deles mandar esperar, o outro não é gasto.
+    Retorna 0 se pode enviar agora, ou quantos segundos esperar.
+    """
+    return acquire_all([
+        (GLOBAL_BUCKET, settings.DISCORD_GLOBAL_BUCKET_CAPACITY, settings.DISCORD_GLOBAL_RATE),
+        (webhook_url, settings.DISCORD_WEBHOOK_BUCKET_CAPACITY, settings.DISCORD_WEBHOOK_RATE),
+    ])
+
+
+def retry_after(response):
+    """
+    Lê o tempo de espera de uma resposta 429 (header Retry-After ou corpo JSON).
+    """
+    try:
+        body = response.json()
+    except ValueError:
+        body = {}
+
+    value = body.get("retry_after") or response.headers.get("Retry-After") or 1
+    try:
+        return float(value), bool(body.get("global"))
+    except (TypeError, ValueError):
+        return 1.0, False
+
+
+def backoff(attempt):
+    """
+    Espera exponencial com jitter para a próxima tentativa.
+    """
+    delay = settings.DISCORD_RETRY_BASE_DELAY * (2 ** attempt)
+    return min(delay, settings.DISCORD_RETRY_MAX_DELAY) * random.uniform(0.8, 1.2)
+
+
+class DeliveryOutcome:
+    SENT = 'SENT'
+    RETRY = 'RETRY'
+    FAILED = 'FAILED'
+
+    def __init__(self, kind, detail, delay=0):
+        self.kind = kind
+        self.detail = detail
+        self.delay = delay
+
+
+def execute_webhook(webhook_url, embeds, attempt):
+    """
+    Faz uma tentativa de envio e classifica o resultado: enviado, tentar de
+    novo (com quanto esperar) ou falha definitiva.
+    """
+    webhook = DiscordWebhook(url=webhook_url, timeout=settings.DISCORD_TIMEOUT)
+    for embed in embeds:
+        webhook.add_embed(embed)
+
+    recorder = metrics.Recorder()
+    try:
+        with recorder.timer('discord_send_duration_seconds'):
+            response = webhook.execute()
+    except Exception as e:
+        logger.error(f"Falha no Discord: {e}")
+        recorder.inc('discord_responses_total', status='error')
+        recorder.flush()
+        return DeliveryOutcome(DeliveryOutcome.RETRY, str(e), backoff(attempt))
+
+    status = response.status_code
+    recorder.inc('discord_responses_total', status=status)
+    recorder.flush()
+    if 200 <= status < 300:
+        return DeliveryOutcome(DeliveryOutcome.SENT, "Enviado com sucesso")
+
+    if status == 429:
+        wait, is_global = retry_after(response)
+        # Respeita o Retry-After para todos os workers, não só para esta tarefa
+        block(GLOBAL_BUCKET if is_global else webhook_url, wait)
+        logger.warning(f"Discord 429 (global={is_global}), aguardando {wait:.2f}s")
+        return DeliveryOutcome(DeliveryOutcome.RETRY, "Rate limit do Discord (429)", wait)
+
+    if status >= 500:
+        return DeliveryOutcome(DeliveryOutcome.RETRY, f"Discord retornou {status}", backoff(attempt))
+
+    # 4xx: webhook apagado, payload inválido... não adianta tentar de novo
+    return DeliveryOutcome(DeliveryOutcome.FAILED, f"Discord retornou {status}")
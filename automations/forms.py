@@ -1,5 +1,7 @@
+import requests
 from django import forms
 from .models import Automation
+from .youtube_resolver import ChannelNotFound, resolve_channel_id
 
 class AutomationForm(forms.ModelForm):
     class Meta:
@@ -17,7 +19,7 @@ class AutomationForm(forms.ModelForm):
             }),
             'channel_identifier': forms.TextInput(attrs={
                 'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-indigo-500 focus:ring-indigo-500 sm:text-sm p-2 border',
-                'placeholder': '@usuario (TikTok) ou ID do Canal (YouTube)'
+                'placeholder': '@usuario (TikTok) ou @handle / ID do Canal (YouTube)'
             }),
             'discord_webhook_url': forms.URLInput(attrs={
                 'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-indigo-500 focus:ring-indigo-500 sm:text-sm p-2 border',
@@ -26,4 +28,20 @@ class AutomationForm(forms.ModelForm):
             'is_active': forms.CheckboxInput(attrs={
                 'class': 'h-4 w-4 text-indigo-600 focus:ring-indigo-500 border-gray-300 rounded'
             }),
-        }
\ No newline at end of file
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        identifier = cleaned_data.get('channel_identifier')
+        if cleaned_data.get('platform') != Automation.PlatformChoices.YOUTUBE or not identifier:
+            return cleaned_data
+
+        # Guarda o ID do canal (UC...): a verificação usa sempre a URL direta /channel/<id>/live
+        try:
+            cleaned_data['channel_identifier'] = resolve_channel_id(identifier)
+        except ChannelNotFound:
+            self.add_error('channel_identifier', "Canal do YouTube não encontrado. Use o @handle, a URL do canal ou o ID (UC...).")
+        except requests.RequestException:
+            # YouTube fora do ar agora: salva como digitado e a primeira verificação resolve
+            pass
+        return cleaned_data
@@ -0,0 +1,292 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import redis
+from django.conf import settings
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "live:cache:stats"
+
+# Libera o lock só se ele ainda for nosso (o dono pode ter expirado e outro worker assumido)
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Renova o lock só se ele ainda for nosso
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_release_script = None
+_extend_script = None
+
+
+def _result_key(platform, channel_identifier):
+    return f"live:status:{platform}:{channel_identifier}"
+
+
+def _lock_key(platform, channel_identifier):
+    return f"live:lock:{platform}:{channel_identifier}"
+
+
+def _watch_key(platform, channel_identifier):
+    return f"live:watch:{platform}:{channel_identifier}"
+
+
+def _dispatch_key(platform, channel_identifier):
+    return f"live:dispatch:{platform}:{channel_identifier}"
+
+
+def _decode(raw):
+    is_live, title, thumbnail = json.loads(raw)
+    return is_live, title, thumbnail
+
+
+def _count(platform, outcome, amount=1):
+    if amount:
+        get_redis().hincrby(STATS_KEY, f"{platform}:{outcome}", amount)
+
+
+def invalidate(platform, identifiers):
+    """
+    Descarta os resultados em cache (ex.: push avisando que algo mudou no canal).
+    """
+    if identifiers:
+        get_redis().delete(*[_result_key(platform, identifier) for identifier in identifiers])
+
+
+def get_cached(platform, identifiers):
+    """
+    Resultados ainda válidos no cache. Retorna {identificador: (is_live, title, thumbnail)}.
+    """
+    identifiers = list(identifiers)
+    if not identifiers:
+        return {}
+    values = get_redis().mget([_result_key(platform, identifier) for identifier in identifiers])
+    return {identifier: _decode(raw) for identifier, raw in zip(identifiers, values) if raw is not None}
+
+
+def store(platform, results):
+    """
+    Grava os resultados com LIVE_STATUS_CACHE_TTL. Resultados desconhecidos
+    (erro ou circuito aberto) não entram no cache.
+    """
+    results = {identifier: result for identifier, result in results.items() if result[0] is not None}
+    if not results:
+        return
+    ttl_ms = int(settings.LIVE_STATUS_CACHE_TTL * 1000)
+    pipe = get_redis().pipeline(transaction=False)
+    for identifier, result in results.items():
+        pipe.set(_result_key(platform, identifier), json.dumps(list(result)), px=ttl_ms)
+    pipe.execute()
+
+
+def acquire_locks(platform, identifiers):
+    """
+    Tenta ficar responsável pela verificação de cada canal (SET NX com expiração).
+    Retorna {identificador: token} só dos canais cujo lock conseguimos.
+    """
+    lock_ms = int(settings.LIVE_STATUS_LOCK_TIMEOUT * 1000)
+    tokens = {identifier: uuid.uuid4().hex for identifier in identifiers}
+    pipe = get_redis().pipeline(transaction=False)
+    for identifier, token in tokens.items():
+        pipe.set(_lock_key(platform, identifier), token, nx=True, px=lock_ms)
+    acquired = pipe.execute()
+    return {identifier: token for (identifier, token), ok in zip(tokens.items(), acquired) if ok}
+
+
+def release_locks(platform, tokens):
+    global _release_script
+    if not tokens:
+        return
+    if _release_script is None:
+        _release_script = get_redis().register_script(RELEASE_LOCK_SCRIPT)
+
+    pipe = get_redis().pipeline(transaction=False)
+    for identifier, token in tokens.items():
+        _release_script(keys=[_lock_key(platform, identifier)], args=[token], client=pipe)
+    pipe.execute()
+
+
+def extend_locks(platform, tokens):
+    global _extend_script
+    if not tokens:
+        return
+    if _extend_script is None:
+        _extend_script = get_redis().register_script(EXTEND_LOCK_SCRIPT)
+
+    lock_ms = int(settings.LIVE_STATUS_LOCK_TIMEOUT * 1000)
+    pipe = get_redis().pipeline(transaction=False)
+    for identifier, token in tokens.items():
+        _extend_script(keys=[_lock_key(platform, identifier)], args=[token, lock_ms], client=pipe)
+    pipe.execute()
+
+
+@contextmanager
+def hold_locks(platform, tokens):
+    """
+    Mantém os locks enquanto o bloco roda, renovando a cada terço de
+    LIVE_STATUS_LOCK_TIMEOUT. Um lote leva o tempo que o limite de requisições
+    da plataforma deixar (200 canais a 10 req/s são 20 s), bem mais que o
+    timeout; se o worker morrer, a renovação para e o lock expira sozinho.
+    """
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(settings.LIVE_STATUS_LOCK_TIMEOUT / 3):
+            try:
+                extend_locks(platform, tokens)
+            except redis.RedisError as e:
+                logger.warning(f"Falha ao renovar locks de verificação ({platform}): {e}")
+
+    renewer = threading.Thread(target=renew, name=f"live-lock-{platform}", daemon=True)
+    renewer.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        renewer.join()
+
+
+def wait_for(platform, identifiers):
+    """
+    Espera outro worker terminar a verificação que está em andamento. Retorna
+    o que apareceu no cache; para de esperar por um canal se o lock dele sumir
+    sem deixar resultado (o dono renova o lock enquanto verifica, então lock
+    presente quer dizer verificação viva; se o dono morrer, ele expira em
+    LIVE_STATUS_LOCK_TIMEOUT).
+    """
+    client = get_redis()
+    pending = list(identifiers)
+    found = {}
+    while pending:
+        time.sleep(settings.LIVE_STATUS_WAIT_INTERVAL)
+        ready = get_cached(platform, pending)
+        found.update(ready)
+        pending = [identifier for identifier in pending if identifier not in ready]
+        if pending:
+            locked = client.mget([_lock_key(platform, identifier) for identifier in pending])
+            pending = [identifier for identifier, token in zip(pending, locked) if token is not None]
+    return found
+
+
+def cached_check_many(platform, identifiers, check):
+    """
+    Cache compartilhado entre workers na frente das verificações.
+
+    Quem encontra o resultado no Redis não vai à plataforma. Entre os que não
+    encontram, só o dono do lock do canal faz a requisição (single-flight); os
+    demais esperam o resultado aparecer e, se o dono sumir, verificam por conta
+    própria. `check(identificadores)` devolve {identificador: resultado}.
+    """
+    identifiers = list(dict.fromkeys(identifiers))
+    if not identifiers:
+        return {}
+
+    results = get_cached(platform, identifiers)
+    _count(platform, 'hit', len(results))
+    misses = [identifier for identifier in identifiers if identifier not in results]
+    if not misses:
+        return results
+    _count(platform, 'miss', len(misses))
+
+    tokens = acquire_locks(platform, misses)
+    try:
+        owned = [identifier for identifier in misses if identifier in tokens]
+        if owned:
+            with hold_locks(platform, tokens):
+                checked = check(owned)
+            store(platform, checked)
+            results.update(checked)
+    finally:
+        release_locks(platform, tokens)
+
+    waiting = [identifier for identifier in misses if identifier not in tokens]
+    if waiting:
+        shared = wait_for(platform, waiting)
+        _count(platform, 'shared', len(shared))
+        results.update(shared)
+
+        leftover = [identifier for identifier in waiting if identifier not in shared]
+        if leftover:
+            checked = check(leftover)
+            store(platform, checked)
+            results.update(checked)
+
+    return results
+
+
+def cache_stats():
+    """
+    Contadores acumulados por plataforma: {plataforma: {'hit': n, 'miss': n, 'shared': n}}.
+    'shared' são as falhas de cache resolvidas esperando a verificação de outro worker.
+    """
+    stats = {}
+    for field, value in get_redis().hgetall(STATS_KEY).items():
+        platform, outcome = field.split(':', 1)
+        stats.setdefault(platform, {'hit': 0, 'miss': 0, 'shared': 0})[outcome] = int(value)
+    return stats
+
+
+def renew_watches(platform, identifiers, ttl):
+    """
+    Marca os canais como acompanhados por uma conexão persistente (watcher)
+    por `ttl` segundos. Enquanto a marca existir o scheduler não os verifica.
+    """
+    if not identifiers:
+        return
+    pipe = get_redis().pipeline(transaction=False)
+    for identifier in identifiers:
+        pipe.set(_watch_key(platform, identifier), 1, ex=int(ttl))
+    pipe.execute()
+
+
+def release_watch(platform, channel_identifier):
+    get_redis().delete(_watch_key(platform, channel_identifier))
+
+
+def watched(platform, identifiers):
+    """
+    Subconjunto de `identifiers` acompanhado agora por algum watcher.
+    """
+    identifiers = list(identifiers)
+    if not identifiers:
+        return set()
+    values = get_redis().mget([_watch_key(platform, identifier) for identifier in identifiers])
+    return {identifier for identifier, value in zip(identifiers, values) if value}
+
+
+def claim_dispatches(platform, identifiers, ttl=None):
+    """
+    Reserva a verificação dos canais do despacho até o lote terminar
+    (release_dispatches) ou, se o worker morrer, por `ttl` segundos
+    (LIVE_DISPATCH_DEDUP_SECONDS). Retorna só os canais reservados agora;
+    os outros já estão na fila ou em verificação e não devem ser enfileirados de novo.
+    """
+    identifiers = list(identifiers)
+    if not identifiers:
+        return []
+    ttl = int(ttl or settings.LIVE_DISPATCH_DEDUP_SECONDS)
+    pipe = get_redis().pipeline(transaction=False)
+    for identifier in identifiers:
+        pipe.set(_dispatch_key(platform, identifier), 1, nx=True, ex=ttl)
+    return [identifier for identifier, claimed in zip(identifiers, pipe.execute()) if claimed]
+
+
+def release_dispatches(platform, identifiers):
+    identifiers = list(identifiers)
+    if identifiers:
+        get_redis().delete(*[_dispatch_key(platform, identifier) for identifier in identifiers])
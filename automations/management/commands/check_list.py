@@ -0,0 +1,118 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from automations.metrics import Recorder
+from automations.models import Automation
+from automations.providers import get_provider
+from automations.tasks import check_channels, persist_channel_results
+
+class Command(BaseCommand):
+    help = 'Força a verificação de todas as lives cadastradas manualmente'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            help='Quantas verificações simultâneas por lote (padrão: o limite de cada plataforma)',
+        )
+        parser.add_argument('--platform', choices=Automation.PlatformChoices.values, help='Só verifica esta plataforma')
+        parser.add_argument('--user', help='Só verifica as automações deste usuário (username ou ID)')
+        parser.add_argument('--dry-run', action='store_true', help='Só verifica: não grava no banco nem envia no Discord')
+        parser.add_argument('--only-changed', action='store_true', help='Mostra só as automações que mudaram de status')
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔍 Iniciando verificação manual de lives...")
+        now = timezone.now()
+        dry_run = options['dry_run']
+
+        # Mesmo critério do scheduler: só automações ativas com plano válido
+        automations = Automation.objects.entitled(now)
+        if options['platform']:
+            automations = automations.filter(platform=options['platform'])
+        if options['user']:
+            user = options['user']
+            user_filter = Q(user__username=user)
+            if user.isdigit():
+                user_filter |= Q(user_id=int(user))
+            automations = automations.filter(user_filter)
+
+        channels = {}
+        for platform, channel_identifier in automations.values_list('platform', 'channel_identifier').distinct():
+            channels.setdefault(platform, []).append(channel_identifier)
+
+        if not channels:
+            self.stdout.write(self.style.WARNING("⚠ Nenhuma automação ativa encontrada."))
+            return
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Modo simulação: nada será gravado nem enviado ao Discord."))
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        totals = {'channels': 0, 'automations': 0, 'live': 0, 'changed': 0, 'alerts': 0}
+
+        # Mesmo caminho das tasks: lotes verificados em paralelo (asyncio) e gravados em bulk
+        for platform, identifiers in sorted(channels.items()):
+            batch_size = get_provider(platform).batch_size
+            for start in range(0, len(identifiers), batch_size):
+                results = check_channels(
+                    platform,
+                    identifiers[start:start + batch_size],
+                    concurrency=options['concurrency'],
+                    recorder=recorder,
+                )
+                checked, changed, alerts = persist_channel_results(
+                    platform,
+                    results,
+                    timezone.now(),
+                    automations=automations,
+                    # Com filtro de usuário o lote não enxerga todos os seguidores do canal
+                    update_channels=not options['user'],
+                    dry_run=dry_run,
+                )
+                self.report_batch(checked, changed, alerts, results, options['only_changed'])
+
+                totals['channels'] += len(results)
+                totals['automations'] += len(checked)
+                totals['live'] += sum(1 for is_live, _, _ in results.values() if is_live)
+                totals['changed'] += len(changed)
+                totals['alerts'] += len(alerts)
+
+        elapsed = time.perf_counter() - started
+        failures = sum(
+            amount for (name, _), amount in recorder.counters.items() if name == 'live_check_errors_total'
+        )
+        recorder.flush()
+
+        self.stdout.write(self.style.SUCCESS("\n🏁 Verificação concluída!"))
+        self.stdout.write(
+            f"   {totals['channels']} canais ({totals['automations']} automações) em {elapsed:.1f}s "
+            f"— {totals['channels'] / elapsed if elapsed else 0:.1f} canais/s"
+        )
+        self.stdout.write(f"   Ao vivo: {totals['live']}  Mudanças: {totals['changed']}")
+        alerts_label = "Alertas (simulados)" if dry_run else "Alertas enfileirados"
+        self.stdout.write(f"   {alerts_label}: {totals['alerts']}")
+        style = self.style.ERROR if failures else self.style.SUCCESS
+        self.stdout.write(style(f"   Falhas nas verificações: {int(failures)}"))
+
+    def report_batch(self, checked, changed, alerts, results, only_changed):
+        changed_ids = {automation.id for automation in changed}
+        alert_kinds = {automation.id: is_starting for automation, is_starting, _, _ in alerts}
+
+        for auto in checked:
+            if only_changed and auto.id not in changed_ids:
+                continue
+
+            is_live = results[auto.channel_identifier][0]
+            if is_live is None:
+                status_str = "DESCONHECIDO ❔ (falha ou circuito aberto)"
+            else:
+                status_str = "ONLINE 🔴" if is_live else "OFFLINE ⚫"
+            self.stdout.write(f"Checking: {auto.name} ({auto.get_platform_display()})... {status_str}")
+
+            if auto.id in alert_kinds:
+                if alert_kinds[auto.id]:
+                    self.stdout.write(f"   -> Mudança detectada! Alerta de live iniciada para {auto.discord_webhook_url}")
+                else:
+                    self.stdout.write("   -> Live encerrou. Alerta de encerramento.")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from automations.live_cache import cache_stats
+from automations.plan_limits import polling_report
+
+class Command(BaseCommand):
+    help = 'Mostra quantas verificações estão sendo evitadas por canal único, plano e limites'
+
+    def handle(self, *args, **options):
+        report = polling_report()
+
+        self.stdout.write("📊 Relatório de verificações\n")
+
+        self.stdout.write("Automações")
+        self.stdout.write(f"   Ativas: {report['active_automations']}")
+        self.stdout.write(f"   Com plano válido (verificadas): {report['entitled_automations']}")
+        self.stdout.write(f"   Plano expirado (ignoradas): {report['expired_plan_automations']}")
+        self.stdout.write(f"   Sem plano (ignoradas): {report['no_plan_automations']}")
+        self.stdout.write(f"   Suspensas pelo limite do plano: {report['suspended_automations']}")
+
+        self.stdout.write("\nCanais")
+        self.stdout.write(f"   Monitorados: {report['active_channels']}")
+        self.stdout.write(f"   Seguidos só por usuários sem direito (não verificados): {report['unentitled_channels']}")
+
+        self.stdout.write("\nVerificações por hora")
+        self.stdout.write(f"   Modelo antigo (1 por automação a cada 60 s): {report['naive_checks_per_hour']}")
+        self.stdout.write(f"   Atual (teto, 1 por canal no intervalo do plano): {report['checks_per_hour']}")
+        self.stdout.write(self.style.SUCCESS(f"   Economia: {report['saved_checks_per_hour']} verificações/hora"))
+
+        self.stdout.write("\nCache de status das lives")
+        for platform, counts in sorted(cache_stats().items()):
+            lookups = counts['hit'] + counts['miss']
+            hit_rate = counts['hit'] / lookups * 100 if lookups else 0
+            self.stdout.write(
+                f"   {platform}: {counts['hit']} acertos, {counts['miss']} falhas "
+                f"({counts['shared']} resolvidas por outro worker), {hit_rate:.1f}% de acerto"
+            )
@@ -0,0 +1,23 @@
+import asyncio
+import signal
+
+from django.core.management.base import BaseCommand
+from automations.watcher import TikTokLiveWatcher
+
+class Command(BaseCommand):
+    help = 'Mantém conexões abertas com as lives do TikTok em andamento e aplica o OFFLINE assim que elas terminam'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-connections', type=int, help='Limite de conexões simultâneas (padrão TIKTOK_WATCHER_MAX_CONNECTIONS)')
+
+    def handle(self, *args, **options):
+        self.stdout.write("👀 Acompanhando as lives do TikTok em andamento...")
+        asyncio.run(self.watch(options['max_connections']))
+        self.stdout.write(self.style.SUCCESS("Watcher encerrado."))
+
+    async def watch(self, max_connections):
+        watcher = TikTokLiveWatcher(max_connections=max_connections)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, watcher.stop)
+        await watcher.run()
@@ -0,0 +1,153 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import redis
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics"
+
+# Limites (segundos) dos buckets dos histogramas de latência
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+INF_LABEL = 'le="+Inf"'
+
+# nome: (tipo, descrição) — só o que está aqui aparece em /metrics
+METRICS = {
+    'live_check_duration_seconds': ('histogram', "Duração de cada verificação de live, por plataforma"),
+    'live_check_errors_total': ('counter', "Verificações que falharam, por plataforma e tipo (error, timeout, http_<status>)"),
+    'live_check_short_circuited_total': ('counter', "Verificações puladas pelo circuit breaker (resultado UNKNOWN)"),
+    'live_breaker_opened_total': ('counter', "Quantas vezes o circuit breaker de cada plataforma abriu"),
+    'tiktok_room_cache_total': ('counter', "Cache de salas do TikTok por resultado (hit, miss, stale, error)"),
+    'live_check_batch_duration_seconds': ('histogram', "Duração de cada lote de process_channels_batch"),
+    'discord_send_duration_seconds': ('histogram', "Duração das chamadas ao webhook do Discord"),
+    'discord_responses_total': ('counter', "Respostas do Discord por status HTTP (error quando não houve resposta)"),
+    'scheduler_cycle_duration_seconds': ('histogram', "Duração de cada execução do scheduler_beat"),
+    'scheduler_dispatched_channels_total': ('counter', "Canais despachados pelo scheduler"),
+    'scheduler_skipped_dispatch_total': ('counter', "Despachos ignorados porque o canal já estava na fila ou em verificação"),
+    'scheduler_deferred_channels_total': ('counter', "Canais vencidos já lidos e deixados para o próximo ciclo por falta de capacidade dos workers"),
+    'scheduler_lag_seconds': ('gauge', "Atraso do canal vencido mais antigo no último ciclo do scheduler"),
+    'scheduler_queue_depth': ('gauge', "Lotes na fila do broker no último ciclo do scheduler"),
+    'scheduler_drain_rate': ('gauge', "Lotes terminados por segundo pelos workers (janela LIVE_BACKPRESSURE_WINDOW)"),
+    'scheduler_finished_channels_total': ('counter', "Canais cuja verificação terminou e foi gravada"),
+    'scheduler_finished_automations_total': ('counter', "Automações atualizadas a partir dos canais verificados"),
+    'websub_notifications_total': ('counter', "Pushes WebSub recebidos por resultado (dispatched, ignored, already_queued, invalid_signature)"),
+}
+
+
+def _labels(labels):
+    return ",".join(f'{name}="{value}"' for name, value in sorted(labels.items()))
+
+
+class Recorder:
+    """
+    Acumula métricas em memória e grava tudo no Redis de uma vez (flush),
+    para um lote de centenas de verificações custar um único round trip.
+    Os valores são somados entre todos os workers; gauges guardam o último valor gravado.
+    """
+
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.histograms = defaultdict(list)
+        self.gauges = {}
+
+    def inc(self, name, amount=1, **labels):
+        self.counters[(name, _labels(labels))] += amount
+
+    def observe(self, name, value, **labels):
+        self.histograms[(name, _labels(labels))].append(value)
+
+    def set(self, name, value, **labels):
+        self.gauges[(name, _labels(labels))] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def flush(self):
+        if not self.counters and not self.histograms and not self.gauges:
+            return
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for (name, labels), amount in self.counters.items():
+                pipe.hincrbyfloat(f"{KEY_PREFIX}:{name}", labels, amount)
+            for (name, labels), value in self.gauges.items():
+                pipe.hset(f"{KEY_PREFIX}:{name}", labels, value)
+            for (name, labels), values in self.histograms.items():
+                key = f"{KEY_PREFIX}:{name}"
+                for bound in LATENCY_BUCKETS:
+                    hits = sum(1 for value in values if value <= bound)
+                    if hits:
+                        pipe.hincrby(key, f"{labels}|{bound}", hits)
+                pipe.hincrby(key, f"{labels}|+Inf", len(values))
+                pipe.hincrbyfloat(key, f"{labels}|sum", sum(values))
+            pipe.execute()
+        except redis.RedisError as e:
+            # Métrica nunca derruba o caminho principal
+            logger.warning(f"Falha ao gravar métricas: {e}")
+        self.counters.clear()
+        self.histograms.clear()
+        self.gauges.clear()
+
+
+def inc(name, amount=1, **labels):
+    recorder = Recorder()
+    recorder.inc(name, amount, **labels)
+    recorder.flush()
+
+
+def _format_labels(labels, extra=None):
+    parts = [labels] if labels else []
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_prometheus():
+    """
+    Todas as métricas no formato texto do Prometheus (exposition format 0.0.4).
+    """
+    client = get_redis()
+    pipe = client.pipeline(transaction=False)
+    for name in METRICS:
+        pipe.hgetall(f"{KEY_PREFIX}:{name}")
+    stored = dict(zip(METRICS, pipe.execute()))
+
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        fields = stored[name]
+
+        if kind in ('counter', 'gauge'):
+            for labels, value in sorted(fields.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+
+        series = defaultdict(dict)
+        for field, value in fields.items():
+            labels, suffix = field.rsplit("|", 1)
+            series[labels][suffix] = value
+        for labels, values in sorted(series.items()):
+            # Os buckets já são gravados acumulados; bucket sem observação vale 0
+            for bound in LATENCY_BUCKETS:
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_format_labels(labels, le)} {int(values.get(str(bound), 0))}")
+            total = int(values.get("+Inf", 0))
+            lines.append(f"{name}_bucket{_format_labels(labels, INF_LABEL)} {total}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values.get('sum', 0))}")
+            lines.append(f"{name}_count{_format_labels(labels)} {total}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+HOURS_PER_WEEK = 7 * 24
+
+
+def backfill_channels(apps, schema_editor):
+    """
+    Marca os logs antigos como início/fim de live e monta os canais monitorados
+    com o histórico de horários a partir desses logs.
+
+    Os logs de uma automação sempre alternam início -> fim (UNKNOWN/OFFLINE -> ONLINE
+    gera o primeiro), então a posição de cada log indica o evento.
+    """
+    Automation = apps.get_model('automations', 'Automation')
+    NotificationLog = apps.get_model('automations', 'NotificationLog')
+    MonitoredChannel = apps.get_model('automations', 'MonitoredChannel')
+
+    channels = {}
+    for automation in Automation.objects.all().iterator():
+        key = (automation.platform, automation.channel_identifier)
+        channel = channels.setdefault(key, {
+            'is_active': False,
+            'last_status': 'UNKNOWN',
+            'last_live_at': None,
+            'starts': set(),
+        })
+        channel['is_active'] = channel['is_active'] or automation.is_active
+        if automation.last_status == 'ONLINE' or channel['last_status'] == 'UNKNOWN':
+            channel['last_status'] = automation.last_status
+
+        started_ids = []
+        ended_ids = []
+        logs = NotificationLog.objects.filter(automation_id=automation.id).order_by('timestamp', 'id')
+        for position, (log_id, timestamp) in enumerate(logs.values_list('id', 'timestamp')):
+            if position % 2 == 0:
+                started_ids.append(log_id)
+                # Mesma live vista por vários seguidores conta uma vez só
+                channel['starts'].add(timestamp.replace(minute=0, second=0, microsecond=0))
+                if channel['last_live_at'] is None or timestamp > channel['last_live_at']:
+                    channel['last_live_at'] = timestamp
+            else:
+                ended_ids.append(log_id)
+
+        NotificationLog.objects.filter(id__in=started_ids).update(event='STARTED')
+        NotificationLog.objects.filter(id__in=ended_ids).update(event='ENDED')
+
+    to_create = []
+    for (platform, channel_identifier), data in channels.items():
+        hours = [0] * HOURS_PER_WEEK
+        for start in data['starts']:
+            hours[start.weekday() * 24 + start.hour] += 1
+        to_create.append(MonitoredChannel(
+            platform=platform,
+            channel_identifier=channel_identifier,
+            is_active=data['is_active'],
+            last_status=data['last_status'],
+            last_live_at=data['last_live_at'],
+            live_start_hours=hours if data['starts'] else [],
+        ))
+    MonitoredChannel.objects.bulk_create(to_create, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0004_remove_userprofile_plan_remove_userprofile_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationlog',
+            name='event',
+            field=models.CharField(blank=True, choices=[('STARTED', 'Live iniciada'), ('ENDED', 'Live encerrada')], default='', max_length=10, verbose_name='Evento'),
+        ),
+        migrations.CreateModel(
+            name='MonitoredChannel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('TIKTOK', 'TikTok'), ('YOUTUBE', 'YouTube')], max_length=20, verbose_name='Plataforma')),
+                ('channel_identifier', models.CharField(max_length=100, verbose_name='Identificador do Canal')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Possui automações ativas?')),
+                ('last_status', models.CharField(choices=[('ONLINE', 'Online'), ('OFFLINE', 'Offline'), ('UNKNOWN', 'Desconhecido')], default='UNKNOWN', max_length=20, verbose_name='Último Status')),
+                ('next_check_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima verificação')),
+                ('last_checked_at', models.DateTimeField(blank=True, null=True, verbose_name='Última verificação')),
+                ('last_live_at', models.DateTimeField(blank=True, null=True, verbose_name='Último início de live')),
+                ('live_start_hours', models.JSONField(blank=True, default=list, verbose_name='Histórico de horários de live')),
+            ],
+            options={
+                'verbose_name': 'Canal Monitorado',
+                'verbose_name_plural': 'Canais Monitorados',
+                'indexes': [models.Index(fields=['is_active', 'next_check_at'], name='channel_due_idx')],
+                'unique_together': {('platform', 'channel_identifier')},
+            },
+        ),
+        migrations.RunPython(backfill_channels, migrations.RunPython.noop),
+    ]
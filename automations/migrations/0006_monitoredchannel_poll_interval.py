@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:45
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def set_channel_intervals(apps, schema_editor):
+    Automation = apps.get_model('automations', 'Automation')
+    MonitoredChannel = apps.get_model('automations', 'MonitoredChannel')
+
+    rows = (
+        Automation.objects.filter(is_active=True)
+        .values('platform', 'channel_identifier')
+        .annotate(best_interval=Min('user__profile__plan__poll_interval_seconds'))
+        .order_by()
+    )
+    for row in rows:
+        if row['best_interval']:
+            MonitoredChannel.objects.filter(
+                platform=row['platform'],
+                channel_identifier=row['channel_identifier'],
+            ).update(poll_interval=row['best_interval'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0005_monitoredchannel_notificationlog_event'),
+        ('accounts', '0001_initial'),
+        ('plans', '0002_plan_poll_interval_seconds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoredchannel',
+            name='poll_interval',
+            field=models.PositiveIntegerField(default=60, verbose_name='Intervalo do Plano (segundos)'),
+        ),
+        migrations.RunPython(set_channel_intervals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0006_monitoredchannel_poll_interval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automation',
+            name='is_suspended',
+            field=models.BooleanField(default=False, verbose_name='Suspensa pelo limite do plano?'),
+        ),
+    ]
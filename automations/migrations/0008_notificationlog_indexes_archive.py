@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:51
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Os índices da notificationlog (tabela grande) são criados com CONCURRENTLY,
+    # que não roda dentro de transação e não trava as escritas dos workers.
+    atomic = False
+
+    dependencies = [
+        ('automations', '0007_automation_is_suspended'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('automation_id', models.BigIntegerField(verbose_name='ID da Automação')),
+                ('user_id', models.BigIntegerField(verbose_name='ID do Usuário')),
+                ('timestamp', models.DateTimeField(verbose_name='Data e Hora')),
+                ('status', models.CharField(choices=[('SUCCESS', 'Sucesso'), ('FAILURE', 'Falha')], max_length=20, verbose_name='Status do Log')),
+                ('event', models.CharField(blank=True, choices=[('STARTED', 'Live iniciada'), ('ENDED', 'Live encerrada')], default='', max_length=10, verbose_name='Evento')),
+                ('details', models.CharField(blank=True, default='', max_length=200, verbose_name='Detalhes do Log')),
+            ],
+            options={
+                'verbose_name': 'Log Arquivado',
+                'verbose_name_plural': 'Logs Arquivados',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='notificationlog',
+            index=models.Index(fields=['automation', '-timestamp'], name='log_automation_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notificationlog',
+            index=models.Index(fields=['automation', 'status'], name='log_automation_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notificationlog',
+            index=models.Index(fields=['-timestamp'], name='log_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationlogarchive',
+            index=models.Index(fields=['user_id', '-timestamp'], name='log_archive_user_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_stats(apps, schema_editor):
+    Automation = apps.get_model('automations', 'Automation')
+    NotificationLog = apps.get_model('automations', 'NotificationLog')
+    UserStats = apps.get_model('automations', 'UserStats')
+
+    stats = {}
+    for row in Automation.objects.values('user_id').annotate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+    ).order_by():
+        stats[row['user_id']] = UserStats(
+            user_id=row['user_id'],
+            total_automations=row['total'],
+            active_automations=row['active'],
+        )
+    for row in NotificationLog.objects.filter(status='SUCCESS').values('automation__user_id').annotate(
+        sent=Count('id'),
+    ).order_by():
+        stats[row['automation__user_id']].successful_notifications = row['sent']
+
+    UserStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0008_notificationlog_indexes_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_automations', models.PositiveIntegerField(default=0, verbose_name='Total de Automações')),
+                ('active_automations', models.PositiveIntegerField(default=0, verbose_name='Automações Ativas')),
+                ('successful_notifications', models.PositiveBigIntegerField(default=0, verbose_name='Notificações Enviadas')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='automation_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Estatística de Usuário',
+                'verbose_name_plural': 'Estatísticas de Usuários',
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0009_userstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoredchannel',
+            name='websub_lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Inscrição WebSub válida até'),
+        ),
+        migrations.AddField(
+            model_name='monitoredchannel',
+            name='websub_requested_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Inscrição WebSub pedida em'),
+        ),
+        migrations.AddField(
+            model_name='monitoredchannel',
+            name='websub_secret',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Segredo WebSub'),
+        ),
+    ]
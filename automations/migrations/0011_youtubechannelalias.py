@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0010_monitoredchannel_websub'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YouTubeChannelAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=150, unique=True, verbose_name='Handle ou URL personalizada')),
+                ('channel_id', models.CharField(max_length=64, verbose_name='ID do Canal')),
+                ('resolved_at', models.DateTimeField(auto_now=True, verbose_name='Resolvido em')),
+            ],
+            options={
+                'verbose_name': 'Alias de Canal do YouTube',
+                'verbose_name_plural': 'Aliases de Canais do YouTube',
+            },
+        ),
+    ]
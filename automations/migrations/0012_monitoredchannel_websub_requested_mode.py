@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0011_youtubechannelalias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoredchannel',
+            name='websub_requested_mode',
+            field=models.CharField(blank=True, max_length=11, verbose_name='Pedido WebSub pendente'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0012_monitoredchannel_websub_requested_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoredchannel',
+            name='not_found_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Canal não encontrado em'),
+        ),
+    ]
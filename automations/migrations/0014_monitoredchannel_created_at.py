@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automations', '0013_monitoredchannel_not_found_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoredchannel',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Monitorado desde'),
+        ),
+    ]
@@ -1,5 +1,23 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class AutomationQuerySet(models.QuerySet):
+
+    def entitled(self, now=None):
+        """
+        Automações que devem ser verificadas: ativas, não suspensas e de
+        usuários com plano válido (existe e não expirou).
+        """
+        now = now or timezone.now()
+        return self.filter(
+            Q(user__profile__plan_expires_at__isnull=True) | Q(user__profile__plan_expires_at__gt=now),
+            is_active=True,
+            is_suspended=False,
+            user__profile__plan__isnull=False,
+        )
 
 
 class Automation(models.Model):
@@ -44,6 +62,12 @@ class Automation(models.Model):
         default=True, 
         verbose_name="Automação Ativa?"
     )
+
+    # Ligado pela varredura de limites quando a automação passa do limite do plano
+    is_suspended = models.BooleanField(
+        default=False,
+        verbose_name="Suspensa pelo limite do plano?"
+    )
     
     # Campos de Controle
     last_status = models.CharField(
@@ -56,6 +80,8 @@ class Automation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
 
+    objects = AutomationQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.get_platform_display()}) - {self.channel_identifier}"
 
@@ -74,6 +100,10 @@ class NotificationLog(models.Model):
     class LogStatusChoices(models.TextChoices):
         SUCCESS = 'SUCCESS', 'Sucesso'
         FAILURE = 'FAILURE', 'Falha'
+
+    class EventChoices(models.TextChoices):
+        STARTED = 'STARTED', 'Live iniciada'
+        ENDED = 'ENDED', 'Live encerrada'
     
     automation = models.ForeignKey(
         Automation, 
@@ -89,6 +119,14 @@ class NotificationLog(models.Model):
         verbose_name="Status do Log"
     )
     
+    event = models.CharField(
+        max_length=10,
+        choices=EventChoices.choices,
+        blank=True,
+        default='',
+        verbose_name="Evento"
+    )
+
     details = models.TextField(verbose_name="Detalhes do Log")
 
     def __str__(self):
@@ -97,4 +135,136 @@ class NotificationLog(models.Model):
     class Meta:
         verbose_name = "Log de Notificação"
         verbose_name_plural = "Logs de Notificações"
-        ordering = ['-timestamp']
\ No newline at end of file
+        ordering = ['-timestamp']
+        indexes = [
+            # Dashboard: últimos logs e contagem por status das automações de um usuário
+            models.Index(fields=['automation', '-timestamp'], name='log_automation_recent_idx'),
+            models.Index(fields=['automation', 'status'], name='log_automation_status_idx'),
+            # Listagem do admin (ordenada por data) e limpeza por retenção
+            models.Index(fields=['-timestamp'], name='log_recent_idx'),
+        ]
+
+
+class NotificationLogArchive(models.Model):
+    """
+    Cópia compacta dos logs que passaram do prazo de retenção.
+    Sem chave estrangeira: o arquivo sobrevive à exclusão da automação.
+    Dos detalhes só fica o começo (DETAILS_MAX_LENGTH): o bastante para o motivo
+    da falha, sem carregar textos longos de erro para sempre.
+    """
+
+    DETAILS_MAX_LENGTH = 200
+
+    automation_id = models.BigIntegerField(verbose_name="ID da Automação")
+    user_id = models.BigIntegerField(verbose_name="ID do Usuário")
+    timestamp = models.DateTimeField(verbose_name="Data e Hora")
+    status = models.CharField(max_length=20, choices=NotificationLog.LogStatusChoices.choices, verbose_name="Status do Log")
+    event = models.CharField(max_length=10, choices=NotificationLog.EventChoices.choices, blank=True, default='', verbose_name="Evento")
+    details = models.CharField(max_length=DETAILS_MAX_LENGTH, blank=True, default='', verbose_name="Detalhes do Log")
+
+    def __str__(self):
+        return f"Log arquivado {self.id} - automação {self.automation_id} - {self.status} em {self.timestamp}"
+
+    class Meta:
+        verbose_name = "Log Arquivado"
+        verbose_name_plural = "Logs Arquivados"
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user_id', '-timestamp'], name='log_archive_user_idx'),
+        ]
+
+
+class MonitoredChannel(models.Model):
+    """
+    Estado de polling de um canal, compartilhado por todas as automações
+    que seguem a mesma plataforma + identificador.
+    """
+
+    platform = models.CharField(
+        max_length=20,
+        choices=Automation.PlatformChoices.choices,
+        verbose_name="Plataforma"
+    )
+
+    channel_identifier = models.CharField(max_length=100, verbose_name="Identificador do Canal")
+
+    is_active = models.BooleanField(default=True, verbose_name="Possui automações ativas?")
+
+    last_status = models.CharField(
+        max_length=20,
+        choices=Automation.StatusChoices.choices,
+        default=Automation.StatusChoices.UNKNOWN,
+        verbose_name="Último Status"
+    )
+
+    # Menor intervalo entre os planos de quem segue o canal (plano mais rápido manda)
+    poll_interval = models.PositiveIntegerField(default=60, verbose_name="Intervalo do Plano (segundos)")
+
+    # Agendamento adaptativo
+    next_check_at = models.DateTimeField(default=timezone.now, verbose_name="Próxima verificação")
+    last_checked_at = models.DateTimeField(null=True, blank=True, verbose_name="Última verificação")
+    last_live_at = models.DateTimeField(null=True, blank=True, verbose_name="Último início de live")
+    # Sem live registrada, o recuo de canal parado conta a partir daqui
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Monitorado desde")
+
+    # Quantas lives começaram em cada hora da semana (0 = segunda 00h ... 167 = domingo 23h)
+    live_start_hours = models.JSONField(default=list, blank=True, verbose_name="Histórico de horários de live")
+
+    # A plataforma disse que o canal não existe (handle inválido): verificado raramente até ser resolvido
+    not_found_at = models.DateTimeField(null=True, blank=True, verbose_name="Canal não encontrado em")
+
+    # Inscrição WebSub (push do YouTube): segredo do HMAC e validade confirmada pelo hub
+    websub_secret = models.CharField(max_length=64, blank=True, verbose_name="Segredo WebSub")
+    websub_requested_at = models.DateTimeField(null=True, blank=True, verbose_name="Inscrição WebSub pedida em")
+    websub_requested_mode = models.CharField(max_length=11, blank=True, verbose_name="Pedido WebSub pendente")
+    websub_lease_expires_at = models.DateTimeField(null=True, blank=True, verbose_name="Inscrição WebSub válida até")
+
+    def __str__(self):
+        return f"{self.get_platform_display()} - {self.channel_identifier}"
+
+    class Meta:
+        verbose_name = "Canal Monitorado"
+        verbose_name_plural = "Canais Monitorados"
+        unique_together = ('platform', 'channel_identifier')
+        indexes = [
+            # Consulta do scheduler: canais ativos com verificação vencida, os mais atrasados primeiro
+            models.Index(fields=['is_active', 'next_check_at'], name='channel_due_idx'),
+        ]
+
+
+class UserStats(models.Model):
+    """
+    Contadores do dashboard mantidos incrementalmente (signals e tasks),
+    para a página não depender de COUNT(*) sobre o histórico do usuário.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='automation_stats')
+    total_automations = models.PositiveIntegerField(default=0, verbose_name="Total de Automações")
+    active_automations = models.PositiveIntegerField(default=0, verbose_name="Automações Ativas")
+    successful_notifications = models.PositiveBigIntegerField(default=0, verbose_name="Notificações Enviadas")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    def __str__(self):
+        return f"Estatísticas de {self.user}"
+
+    class Meta:
+        verbose_name = "Estatística de Usuário"
+        verbose_name_plural = "Estatísticas de Usuários"
+
+
+class YouTubeChannelAlias(models.Model):
+    """
+    @handle / URL personalizada do YouTube já resolvida para o ID do canal (UC...),
+    para a verificação sempre usar /channel/<id>/live sem resolver de novo.
+    """
+
+    alias = models.CharField(max_length=150, unique=True, verbose_name="Handle ou URL personalizada")
+    channel_id = models.CharField(max_length=64, verbose_name="ID do Canal")
+    resolved_at = models.DateTimeField(auto_now=True, verbose_name="Resolvido em")
+
+    def __str__(self):
+        return f"{self.alias} -> {self.channel_id}"
+
+    class Meta:
+        verbose_name = "Alias de Canal do YouTube"
+        verbose_name_plural = "Aliases de Canais do YouTube"
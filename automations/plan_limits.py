@@ -0,0 +1,93 @@
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Automation, MonitoredChannel
+
+CHUNK_SIZE = 1000
+
+
+def _update_in_chunks(ids, **fields):
+    for start in range(0, len(ids), CHUNK_SIZE):
+        Automation.objects.filter(id__in=ids[start:start + CHUNK_SIZE]).update(**fields)
+
+
+def enforce_plan_limits(now=None):
+    """
+    Suspende as automações ativas que passam do limite do plano do usuário
+    (as mais novas primeiro) e reativa as que voltaram a caber no limite.
+    Retorna (suspensas, reativadas).
+    """
+    now = now or timezone.now()
+
+    ranked = (
+        Automation.objects.filter(
+            Q(user__profile__plan_expires_at__isnull=True) | Q(user__profile__plan_expires_at__gt=now),
+            is_active=True,
+            user__profile__plan__isnull=False,
+        )
+        .annotate(
+            position=Window(
+                expression=RowNumber(),
+                partition_by=[F('user_id')],
+                order_by=[F('created_at').asc(), F('id').asc()],
+            )
+        )
+    )
+
+    # O filtro por is_suspended fica no Python: filtrar junto com a janela
+    # mudaria a numeração das linhas (o WHERE roda antes do ROW_NUMBER)
+    to_suspend = []
+    to_restore = []
+    rows = ranked.values_list('id', 'position', 'is_suspended', 'user__profile__plan__max_automations')
+    for automation_id, position, is_suspended, limit in rows.iterator(chunk_size=CHUNK_SIZE):
+        over_limit = position > limit
+        if over_limit and not is_suspended:
+            to_suspend.append(automation_id)
+        elif not over_limit and is_suspended:
+            to_restore.append(automation_id)
+
+    _update_in_chunks(to_suspend, is_suspended=True)
+    _update_in_chunks(to_restore, is_suspended=False)
+    return len(to_suspend), len(to_restore)
+
+
+def polling_report(now=None):
+    """
+    Números para o relatório de economia de verificações.
+    As estimativas de verificações por hora comparam o modelo antigo
+    (uma verificação por automação ativa a cada 60 s) com o atual
+    (uma por canal com plano válido, no intervalo do plano).
+    """
+    now = now or timezone.now()
+    active = Automation.objects.filter(is_active=True)
+    entitled = Automation.objects.entitled(now)
+
+    expired = active.filter(
+        user__profile__plan__isnull=False,
+        user__profile__plan_expires_at__lte=now,
+    ).count()
+    without_plan = active.filter(
+        Q(user__profile__isnull=True) | Q(user__profile__plan__isnull=True)
+    ).count()
+
+    active_count = active.count()
+    channels = MonitoredChannel.objects.filter(is_active=True)
+    checks_per_hour = sum(3600 / (interval or 1) for interval in channels.values_list('poll_interval', flat=True))
+    naive_checks_per_hour = active_count * 60
+
+    return {
+        'active_automations': active_count,
+        'entitled_automations': entitled.count(),
+        'expired_plan_automations': expired,
+        'no_plan_automations': without_plan,
+        'suspended_automations': active.filter(is_suspended=True).count(),
+        'active_channels': channels.count(),
+        'unentitled_channels': (
+            active.values('platform', 'channel_identifier').distinct().count()
+            - entitled.values('platform', 'channel_identifier').distinct().count()
+        ),
+        'naive_checks_per_hour': naive_checks_per_hour,
+        'checks_per_hour': round(checks_per_hour),
+        'saved_checks_per_hour': round(naive_checks_per_hour - checks_per_hour),
+    }
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+
+import httpx
+from django.conf import settings
+from django.utils import timezone
+
+from .checkers import (
+    TIKTOK_HEADERS,
+    TIKTOK_ROOM_PARAMS,
+    UpstreamStatusError,
+    YOUTUBE_HEADERS,
+    check_many,
+    parse_tiktok_room,
+    wait_for_rate_limit_async,
+)
+from .models import Automation, MonitoredChannel
+from .scanner import YouTubeLiveScanner
+from .tiktok_rooms import forget_rooms, get_rooms, store_room
+from .youtube_resolver import is_channel_id, known_channel_id, resolve_channel_id
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = {}
+
+
+def register(cls):
+    """
+    Registra o provider da plataforma (Automation.PlatformChoices) em PROVIDERS.
+    """
+    PROVIDERS[cls.platform] = cls()
+    return cls
+
+
+def get_provider(platform):
+    """
+    Provider da plataforma; LookupError se nenhum estiver registrado.
+    """
+    try:
+        return PROVIDERS[platform]
+    except KeyError:
+        raise LookupError(f"Nenhum provider registrado para a plataforma '{platform}'")
+
+
+class LiveProvider:
+    """
+    Detecção de live de uma plataforma. Subclasses implementam `fetch` (um canal,
+    no cliente httpx compartilhado do lote) e `watch_url`; quem precisar de outra
+    estratégia em lote (uma rota que aceita vários canais, por exemplo) sobrescreve
+    `check_many`. Limites de concorrência, requisições por segundo e tamanho de
+    lote vêm das settings, por plataforma.
+    """
+
+    platform = None
+
+    @property
+    def concurrency(self):
+        return settings.LIVE_PLATFORM_CONCURRENCY.get(self.platform) or settings.LIVE_CHECK_CONCURRENCY
+
+    @property
+    def max_rps(self):
+        return settings.LIVE_PLATFORM_RPS.get(self.platform)
+
+    @property
+    def batch_size(self):
+        return settings.LIVE_PLATFORM_BATCH_SIZE.get(self.platform) or settings.LIVE_CHECK_BATCH_SIZE
+
+    def check_many(self, identifiers, concurrency=None, recorder=None):
+        """
+        Retorna {identificador: (is_live, title, thumbnail)}; UNKNOWN_RESULT
+        para os canais que falharam ou foram barrados pelo circuit breaker.
+        """
+        return check_many(self, identifiers, concurrency=concurrency or self.concurrency, recorder=recorder)
+
+    async def fetch_batch(self, client, identifiers, recorder):
+        """
+        Resolve em lote o que a plataforma permitir, antes das verificações
+        individuais. Retorna {identificador: resultado}; quem ficar de fora passa por fetch.
+        """
+        return {}
+
+    async def fetch(self, client, channel_identifier):
+        raise NotImplementedError
+
+    def watch_url(self, channel_identifier):
+        raise NotImplementedError
+
+    def canonical_identifiers(self, identifiers):
+        """
+        {identificador salvo: identificador canônico} para os que devem ser
+        regravados depois da verificação (ex.: @handle que já tem ID conhecido).
+        """
+        return {}
+
+    def mark_gone(self, channel_identifier):
+        """
+        Registra que o canal não existe (ChannelGone); compute_next_check passa
+        a verificá-lo só a cada LIVE_POLL_NOT_FOUND_INTERVAL.
+        """
+        MonitoredChannel.objects.filter(
+            platform=self.platform, channel_identifier=channel_identifier, not_found_at__isnull=True,
+        ).update(not_found_at=timezone.now())
+
+
+@register
+class YouTubeProvider(LiveProvider):
+    platform = Automation.PlatformChoices.YOUTUBE
+
+    async def fetch(self, client, channel_identifier):
+        channel_id = channel_identifier
+        if not is_channel_id(channel_id):
+            # @handle salvo sem resolver: resolve uma vez, depois vem do cache/tabela
+            channel_id = await asyncio.to_thread(resolve_channel_id, channel_identifier)
+        url = f"{settings.YOUTUBE_BASE_URL}/channel/{channel_id}/live"
+
+        # Sai do stream assim que o scanner decide; o httpx descarta o resto do corpo
+        async with client.stream("GET", url, headers=YOUTUBE_HEADERS) as response:
+            if response.status_code != 200:
+                raise UpstreamStatusError(response.status_code)
+
+            scanner = YouTubeLiveScanner(max_bytes=settings.YOUTUBE_SCAN_MAX_BYTES)
+            async for chunk in response.aiter_bytes(settings.YOUTUBE_SCAN_CHUNK_SIZE):
+                if scanner.feed(chunk):
+                    break
+
+        return scanner.result()
+
+    def canonical_identifiers(self, identifiers):
+        renames = {}
+        for identifier in identifiers:
+            if is_channel_id(identifier):
+                continue
+            channel_id = known_channel_id(identifier)
+            if channel_id:
+                renames[identifier] = channel_id
+        return renames
+
+    def watch_url(self, channel_identifier):
+        channel_id = known_channel_id(channel_identifier)
+        if channel_id:
+            return f"https://www.youtube.com/channel/{channel_id}/live"
+        return f"https://www.youtube.com/@{channel_identifier.lstrip('@')}/live"
+
+
+@register
+class TikTokProvider(LiveProvider):
+    platform = Automation.PlatformChoices.TIKTOK
+
+    async def fetch(self, client, username):
+        clean_user = username.replace("@", "")
+        response = await client.get(
+            f"{settings.TIKTOK_BASE_URL}/api-live/user/room/",
+            params={**TIKTOK_ROOM_PARAMS, "uniqueId": clean_user},
+            headers=TIKTOK_HEADERS,
+        )
+
+        if response.status_code != 200:
+            raise UpstreamStatusError(response.status_code)
+
+        data = response.json()
+        is_live, title, cover = parse_tiktok_room(data, clean_user)
+        room_id = ((data.get("data") or {}).get("user") or {}).get("roomId")
+        if is_live and room_id:
+            # As próximas verificações dessa live vão direto para o check_alive
+            await asyncio.to_thread(store_room, clean_user, room_id, title, cover)
+        return is_live, title, cover
+
+    async def fetch_batch(self, client, usernames, recorder):
+        """
+        Canais com sala ao vivo em cache são confirmados pelo check_alive, várias
+        salas por requisição. Sala que não está mais viva (ou lote que falhou)
+        sai do cache e o canal volta para a consulta completa em fetch.
+        """
+        rooms = await asyncio.to_thread(get_rooms, usernames)
+        recorder.inc('tiktok_room_cache_total', len(rooms), outcome='hit')
+        recorder.inc('tiktok_room_cache_total', len(usernames) - len(rooms), outcome='miss')
+
+        cached = list(rooms.items())
+        batch_size = settings.TIKTOK_CHECK_ALIVE_BATCH_SIZE
+        results = {}
+        for start in range(0, len(cached), batch_size):
+            chunk = dict(cached[start:start + batch_size])
+            try:
+                alive = await self.check_alive(client, [room['room_id'] for room in chunk.values()])
+            except (UpstreamStatusError, httpx.HTTPError, ValueError) as e:
+                logger.warning(f"check_alive do TikTok falhou para {len(chunk)} salas: {e}")
+                recorder.inc('tiktok_room_cache_total', len(chunk), outcome='error')
+                await asyncio.to_thread(forget_rooms, list(chunk))
+                continue
+
+            stale = []
+            for username, room in chunk.items():
+                if alive.get(room['room_id']):
+                    results[username] = (True, room['title'], room['cover'])
+                else:
+                    stale.append(username)
+            if stale:
+                recorder.inc('tiktok_room_cache_total', len(stale), outcome='stale')
+                await asyncio.to_thread(forget_rooms, stale)
+        return results
+
+    async def check_alive(self, client, room_ids):
+        """
+        {room_id: está viva} pela rota barata de status de sala.
+        """
+        await wait_for_rate_limit_async(self)
+        response = await client.get(
+            f"{settings.TIKTOK_WEBCAST_URL}/room/check_alive/",
+            params={"aid": TIKTOK_ROOM_PARAMS["aid"], "room_ids": ",".join(room_ids)},
+            headers=TIKTOK_HEADERS,
+        )
+        if response.status_code != 200:
+            raise UpstreamStatusError(response.status_code)
+        return {str(room.get("room_id")): bool(room.get("alive")) for room in response.json().get("data") or []}
+
+    def watch_url(self, username):
+        return f"https://www.tiktok.com/@{username.replace('@', '')}/live"
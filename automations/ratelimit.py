@@ -0,0 +1,92 @@
+import hashlib
+import time
+
+from app.redis_client import get_redis
+
+# Token bucket atômico no Redis, para um ou mais baldes de uma vez. Cada balde
+# guarda tokens e o instante da última recarga num hash. Só consome quando todos
+# têm token: senão devolve quantos ms faltam (o maior entre os baldes) sem
+# gastar nada, para um balde não pagar pela espera de outro.
+TOKEN_BUCKET_SCRIPT = """
+local now_ms = tonumber(ARGV[1])
+local requested = tonumber(ARGV[2])
+local buckets = #KEYS / 2
+local available = {}
+local wait_ms = 0
+
+for i = 1, buckets do
+    local capacity = tonumber(ARGV[1 + 2 * i])
+    local refill_per_ms = tonumber(ARGV[2 + 2 * i])
+
+    local blocked_ttl = redis.call('PTTL', KEYS[2 * i])
+    if blocked_ttl > wait_ms then
+        wait_ms = blocked_ttl
+    end
+
+    local bucket = redis.call('HMGET', KEYS[2 * i - 1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1])
+    local ts = tonumber(bucket[2])
+    if tokens == nil then
+        tokens = capacity
+        ts = now_ms
+    end
+
+    tokens = math.min(capacity, tokens + math.max(0, now_ms - ts) * refill_per_ms)
+    if tokens < requested then
+        wait_ms = math.max(wait_ms, math.ceil((requested - tokens) / refill_per_ms))
+    end
+    available[i] = tokens
+end
+
+if wait_ms > 0 then
+    return wait_ms
+end
+
+for i = 1, buckets do
+    local capacity = tonumber(ARGV[1 + 2 * i])
+    local refill_per_ms = tonumber(ARGV[2 + 2 * i])
+    redis.call('HSET', KEYS[2 * i - 1], 'tokens', available[i] - requested, 'ts', now_ms)
+    redis.call('PEXPIRE', KEYS[2 * i - 1], math.ceil(capacity / refill_per_ms) + 1000)
+end
+return 0
+"""
+
+_script = None
+
+
+def _bucket_keys(name):
+    digest = hashlib.sha1(name.encode()).hexdigest()
+    return f"ratelimit:{digest}", f"ratelimit:{digest}:blocked"
+
+
+def acquire(name, capacity, per_second, tokens=1):
+    """
+    Tenta consumir tokens do balde `name`. Retorna 0 quando conseguiu, ou
+    quantos segundos esperar antes de tentar de novo.
+    """
+    return acquire_all([(name, capacity, per_second)], tokens)
+
+
+def acquire_all(buckets, tokens=1):
+    """
+    Igual a acquire para vários baldes [(nome, capacidade, por_segundo)]:
+    consome de todos ou de nenhum. Retorna 0 ou a maior espera entre eles.
+    """
+    global _script
+    if _script is None:
+        _script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+
+    keys = []
+    args = [int(time.time() * 1000), tokens]
+    for name, capacity, per_second in buckets:
+        keys.extend(_bucket_keys(name))
+        args.extend([capacity, per_second / 1000.0])
+    return int(_script(keys=keys, args=args)) / 1000.0
+
+
+def block(name, seconds):
+    """
+    Bloqueia o balde por `seconds` (ex.: Retry-After devolvido pelo servidor).
+    """
+    _, blocked_key = _bucket_keys(name)
+    get_redis().set(blocked_key, 1, px=max(int(seconds * 1000), 1))
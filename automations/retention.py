@@ -0,0 +1,64 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import NotificationLog, NotificationLogArchive
+from .stats import add_successful_notifications
+
+
+def purge_notification_logs(now=None):
+    """
+    Remove os NotificationLog mais antigos que NOTIFICATION_LOG_RETENTION_DAYS,
+    copiando antes para NotificationLogArchive quando o modo é 'archive'
+    (com os detalhes encurtados). Os envios removidos saem do contador do
+    dashboard, que conta só os logs ainda em NotificationLog.
+
+    Trabalha em lotes de NOTIFICATION_LOG_RETENTION_BATCH linhas (uma transação
+    curta por lote) e para depois de NOTIFICATION_LOG_RETENTION_MAX_BATCHES,
+    para não segurar o banco; o que sobrar fica para a próxima execução.
+    Retorna (removidos, arquivados).
+    """
+    days = settings.NOTIFICATION_LOG_RETENTION_DAYS
+    if not days:
+        return 0, 0
+
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=days)
+    archive = settings.NOTIFICATION_LOG_RETENTION_MODE == 'archive'
+    batch_size = settings.NOTIFICATION_LOG_RETENTION_BATCH
+
+    removed = archived = 0
+    for _ in range(settings.NOTIFICATION_LOG_RETENTION_MAX_BATCHES):
+        expired = NotificationLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp')
+        rows = list(
+            expired.values_list('id', 'automation_id', 'automation__user_id', 'timestamp', 'status', 'event', 'details')[:batch_size]
+        )
+        if not rows:
+            break
+
+        with transaction.atomic():
+            if archive:
+                NotificationLogArchive.objects.bulk_create([
+                    NotificationLogArchive(
+                        automation_id=automation_id,
+                        user_id=user_id,
+                        timestamp=timestamp,
+                        status=status,
+                        event=event,
+                        details=details[:NotificationLogArchive.DETAILS_MAX_LENGTH],
+                    )
+                    for _, automation_id, user_id, timestamp, status, event, details in rows
+                ])
+                archived += len(rows)
+            removed += NotificationLog.objects.filter(id__in=[row[0] for row in rows]).delete()[0]
+            add_successful_notifications({
+                user_id: -sent for user_id, sent in Counter(row[2] for row in rows if row[4] == 'SUCCESS').items()
+            }, create=False)
+
+        if len(rows) < batch_size:
+            break
+
+    return removed, archived
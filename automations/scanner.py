@@ -0,0 +1,119 @@
+import re
+
+
+class YouTubeLiveScanner:
+    """
+    Detector incremental para a página /channel/<id>/live do YouTube.
+
+    Recebe o corpo da resposta em pedaços (feed) e procura o marcador de live,
+    o título e a thumbnail mesmo quando eles ficam divididos entre dois pedaços.
+    Assim que há resposta, feed() retorna True e quem chamou pode fechar a conexão
+    sem baixar o resto da página (que costuma passar de 500 KB).
+    """
+
+    LIVE_MARKER = b'"isLive":true'
+
+    # O "isLive" fica no ytInitialPlayerResponse, que vem antes do ytInitialData.
+    # Ao chegar no ytInitialData sem ter visto o marcador, o canal está offline.
+    STOP_MARKERS = (b'var ytInitialData', b'window["ytInitialData"]')
+
+    TITLE_PREFIX = b'<title>'
+    TITLE_RE = re.compile(rb'<title>(.*?)- YouTube</title>')
+    THUMB_PREFIX = b'"thumbnailUrl":'
+    THUMB_RE = re.compile(rb'"thumbnailUrl":["\'](.*?)["\']')
+
+    DEFAULT_TITLE = "Live no YouTube"
+
+    # Quantos bytes um campo (título/thumbnail) pode ocupar antes de desistirmos dele
+    MAX_FIELD_BYTES = 4096
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.is_live = False
+        self.title = None
+        self.thumbnail = None
+        self.done = False
+        self._window = b''
+        self._overlap = max(len(m) for m in (self.LIVE_MARKER,) + self.STOP_MARKERS) - 1
+        self._field_search_from = {'title': 0, 'thumbnail': 0}
+
+    def feed(self, chunk):
+        """
+        Processa mais um pedaço do corpo. Retorna True quando não é preciso ler mais nada.
+        """
+        if self.done:
+            return True
+
+        self.bytes_read += len(chunk)
+        window = self._window + chunk
+        keep_from = max(len(window) - self._overlap, 0)
+
+        if self.title is None:
+            keep_from = min(keep_from, self._scan_field(window, 'title', self.TITLE_PREFIX, self.TITLE_RE))
+
+        if self.thumbnail is None:
+            keep_from = min(keep_from, self._scan_field(window, 'thumbnail', self.THUMB_PREFIX, self.THUMB_RE))
+
+        if not self.is_live and self.LIVE_MARKER in window:
+            self.is_live = True
+
+        if self.is_live:
+            self.done = self.title is not None and self.thumbnail is not None
+        else:
+            self.done = any(marker in window for marker in self.STOP_MARKERS)
+
+        if self.max_bytes and self.bytes_read >= self.max_bytes:
+            self.done = True
+
+        # Guarda só o necessário para casar padrões que atravessam o limite entre pedaços
+        self._window = window[keep_from:]
+        for name, start in self._field_search_from.items():
+            self._field_search_from[name] = max(start - keep_from, 0)
+
+        return self.done
+
+    def _scan_field(self, window, name, prefix, regex):
+        """
+        Procura um campo de tamanho variável. Retorna a partir de qual posição da
+        janela é preciso manter os bytes para continuar a busca no próximo pedaço.
+        """
+        start = window.find(prefix, self._field_search_from[name])
+        while start != -1:
+            match = regex.match(window, start)
+            if match:
+                value = match.group(1).decode('utf-8', errors='replace')
+                if name == 'title':
+                    self.title = value.strip()
+                else:
+                    self.thumbnail = value
+                return len(window)
+
+            if len(window) - start <= self.MAX_FIELD_BYTES:
+                # Prefixo encontrado, mas o valor ainda não terminou de chegar
+                self._field_search_from[name] = start
+                return start
+
+            start = window.find(prefix, start + 1)
+
+        self._field_search_from[name] = max(len(window) - len(prefix) + 1, 0)
+        return len(window)
+
+    def result(self):
+        """
+        Retorna (is_live, title, thumbnail) no mesmo formato das funções de verificação.
+        """
+        if not self.is_live:
+            return False, "", None
+        return True, self.title or self.DEFAULT_TITLE, self.thumbnail
+
+
+def scan_chunks(chunks, max_bytes=None):
+    """
+    Consome um iterável de pedaços de bytes até o scanner ter uma resposta.
+    """
+    scanner = YouTubeLiveScanner(max_bytes=max_bytes)
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner
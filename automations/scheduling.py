@@ -0,0 +1,259 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Automation, MonitoredChannel
+from .stats import refresh_automation_counts
+from .websub import has_lease
+
+HOURS_PER_WEEK = 7 * 24
+
+
+def hour_of_week(when):
+    return when.weekday() * 24 + when.hour
+
+
+def record_live_start(channel, when):
+    """
+    Registra o início de uma live no histórico de horários do canal.
+    """
+    hours = list(channel.live_start_hours or [])
+    if len(hours) != HOURS_PER_WEEK:
+        hours = [0] * HOURS_PER_WEEK
+    hours[hour_of_week(when)] += 1
+    channel.live_start_hours = hours
+    channel.last_live_at = when
+
+
+def is_hot_hour(channel, how):
+    """
+    Indica se o canal costuma entrar ao vivo perto dessa hora da semana
+    (mesma hora em semanas anteriores, ou mesma hora do dia com frequência).
+    """
+    hours = channel.live_start_hours
+    if not hours or len(hours) != HOURS_PER_WEEK:
+        return False
+
+    window = settings.LIVE_POLL_HOT_WINDOW_HOURS
+    for offset in range(-window, window + 1):
+        slot = (how + offset) % HOURS_PER_WEEK
+        if hours[slot]:
+            return True
+        same_hour_any_day = sum(hours[(slot + day * 24) % HOURS_PER_WEEK] for day in range(7))
+        if same_hour_any_day >= settings.LIVE_POLL_DAILY_HABIT_THRESHOLD:
+            return True
+    return False
+
+
+def plan_interval(intervals):
+    """
+    Intervalo do canal a partir dos planos de quem o segue: vale o plano mais rápido.
+    """
+    intervals = [interval for interval in intervals if interval]
+    return min(intervals) if intervals else settings.LIVE_POLL_DEFAULT_INTERVAL
+
+
+def base_interval(channel, now):
+    """
+    Intervalo de polling fora das janelas de horário habitual do canal.
+    O recuo de canais parados é um múltiplo do intervalo do plano (channel.poll_interval)
+    e só começa depois de LIVE_POLL_IDLE_AFTER_DAYS sem live; canal sem nenhuma
+    live registrada conta desde que passou a ser monitorado.
+    """
+    tier = channel.poll_interval or settings.LIVE_POLL_DEFAULT_INTERVAL
+
+    if channel.last_status == Automation.StatusChoices.ONLINE:
+        return min(tier, settings.LIVE_POLL_ONLINE_INTERVAL)
+
+    factor = 1
+    since_live = now - (channel.last_live_at or channel.created_at or now)
+    if since_live > timedelta(days=settings.LIVE_POLL_DORMANT_AFTER_DAYS):
+        factor = settings.LIVE_POLL_DORMANT_FACTOR
+    elif since_live > timedelta(days=settings.LIVE_POLL_IDLE_AFTER_DAYS):
+        factor = settings.LIVE_POLL_IDLE_FACTOR
+
+    return max(tier, min(tier * factor, settings.LIVE_POLL_MAX_INTERVAL))
+
+
+def phase(platform, channel_identifier):
+    """
+    Fração estável em [0, 1) derivada do canal: o lugar dele dentro do intervalo.
+    """
+    key = f"{platform}:{channel_identifier}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'big') / 2 ** 64
+
+
+def spread(channel, target, interval):
+    """
+    Instante da fase do canal mais próximo de `target` (até meio intervalo antes
+    ou depois). Canais com o mesmo intervalo ficam espalhados por igual, em vez
+    de vencerem juntos, e cada um mantém sempre o mesmo lugar no ciclo.
+    """
+    offset = (phase(channel.platform, channel.channel_identifier) * interval - target.timestamp()) % interval
+    if offset >= interval / 2:
+        offset -= interval
+    return target + timedelta(seconds=offset)
+
+
+def compute_next_check(channel, now):
+    """
+    Calcula quando o canal deve ser verificado de novo.
+
+    Canais ao vivo são verificados rápido (para pegar o fim da live), canais
+    parados há muito tempo recuam, e perto dos horários em que o canal costuma
+    entrar ao vivo o intervalo volta para o mínimo. O horário cai sempre na
+    fase do canal (spread).
+    """
+    if channel.not_found_at:
+        interval = settings.LIVE_POLL_NOT_FOUND_INTERVAL
+        return spread(channel, now + timedelta(seconds=interval), interval)
+
+    interval = base_interval(channel, now)
+
+    # Com push WebSub valendo, o início da live chega pelo callback; o polling é só rede de segurança
+    if channel.last_status != Automation.StatusChoices.ONLINE and has_lease(channel, now):
+        interval = max(interval, settings.WEBSUB_SAFETY_NET_INTERVAL)
+        return spread(channel, now + timedelta(seconds=interval), interval)
+
+    fast = min(interval, channel.poll_interval or settings.LIVE_POLL_DEFAULT_INTERVAL)
+
+    if interval <= fast or is_hot_hour(channel, hour_of_week(now)):
+        return spread(channel, now + timedelta(seconds=fast), fast)
+
+    next_check = spread(channel, now + timedelta(seconds=interval), interval)
+
+    # Não deixa o recuo atravessar o começo de uma janela habitual
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
+    probe = hour_start + timedelta(hours=1)
+    while probe < next_check:
+        if is_hot_hour(channel, hour_of_week(probe)):
+            return spread(channel, max(probe, now + timedelta(seconds=fast)), fast)
+        probe += timedelta(hours=1)
+
+    return next_check
+
+
+def rename_channels(platform, renames):
+    """
+    Regrava identificadores salvos ({antigo: canônico}, ex.: @handle -> ID do
+    canal) nas automações e no canal monitorado, para o mesmo canal não virar
+    dois MonitoredChannel. Se o canônico já tem canal, as automações passam para
+    ele e o antigo fica sem seguidores; automação que duplicaria outra do mesmo
+    usuário (unique_together) é desativada em vez de regravada. O update em
+    massa não dispara signals: os contadores dos donos dessas são refeitos aqui.
+    """
+    for old, new in renames.items():
+        with transaction.atomic():
+            automations = Automation.objects.filter(platform=platform, channel_identifier=old)
+            duplicates = dict(automations.filter(
+                user__automations__platform=platform, user__automations__channel_identifier=new,
+            ).values_list('id', 'user_id'))
+            Automation.objects.filter(id__in=list(duplicates)).update(is_active=False)
+            automations.exclude(id__in=list(duplicates)).update(channel_identifier=new)
+            for user_id in set(duplicates.values()):
+                refresh_automation_counts(user_id)
+
+            if MonitoredChannel.objects.filter(platform=platform, channel_identifier=new).exists():
+                refresh_channel(platform, new)
+                refresh_channel(platform, old)
+            else:
+                MonitoredChannel.objects.filter(platform=platform, channel_identifier=old).update(
+                    channel_identifier=new, not_found_at=None,
+                )
+
+
+def refresh_channel(platform, channel_identifier, check_now=False):
+    """
+    Garante que o canal exista e reflita se ainda há automações com direito a verificação nele.
+    Com check_now, antecipa a próxima verificação (ex.: automação recém-criada).
+    """
+    intervals = list(
+        Automation.objects.entitled().filter(
+            platform=platform,
+            channel_identifier=channel_identifier,
+        ).values_list('user__profile__plan__poll_interval_seconds', flat=True)
+    )
+    has_active = bool(intervals)
+    poll_interval = plan_interval(intervals)
+
+    channel, created = MonitoredChannel.objects.get_or_create(
+        platform=platform,
+        channel_identifier=channel_identifier,
+        defaults={'is_active': has_active, 'poll_interval': poll_interval},
+    )
+    if created:
+        return channel
+
+    update_fields = []
+    if has_active and channel.poll_interval != poll_interval:
+        channel.poll_interval = poll_interval
+        update_fields.append('poll_interval')
+    if channel.is_active != has_active:
+        channel.is_active = has_active
+        update_fields.append('is_active')
+    if has_active and (check_now or 'is_active' in update_fields):
+        channel.next_check_at = timezone.now()
+        update_fields.append('next_check_at')
+    if update_fields:
+        channel.save(update_fields=update_fields)
+    return channel
+
+
+def sync_channels():
+    """
+    Cria os canais que faltam, liga/desliga o agendamento conforme as automações
+    com plano válido (planos expirados deixam de gerar verificações) e atualiza o intervalo de plano de cada canal (uma única consulta
+    agrupada passando por UserProfile.plan).
+    """
+    now = timezone.now()
+    tiers = {
+        (row['platform'], row['channel_identifier']): plan_interval([row['best_interval']])
+        for row in (
+            Automation.objects.entitled(now)
+            .values('platform', 'channel_identifier')
+            .annotate(best_interval=Min('user__profile__plan__poll_interval_seconds'))
+            .order_by()
+        )
+    }
+    active_keys = set(tiers)
+
+    existing = {
+        (platform, channel_identifier): (channel_id, is_active, poll_interval)
+        for channel_id, platform, channel_identifier, is_active, poll_interval in MonitoredChannel.objects.values_list(
+            'id', 'platform', 'channel_identifier', 'is_active', 'poll_interval'
+        )
+    }
+
+    missing = [
+        MonitoredChannel(
+            platform=platform,
+            channel_identifier=channel_identifier,
+            poll_interval=tiers[(platform, channel_identifier)],
+            next_check_at=now,
+        )
+        for platform, channel_identifier in active_keys - set(existing)
+    ]
+    MonitoredChannel.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+
+    retiered = [
+        MonitoredChannel(id=channel_id, poll_interval=tiers[key])
+        for key, (channel_id, _, poll_interval) in existing.items()
+        if key in tiers and tiers[key] != poll_interval
+    ]
+    MonitoredChannel.objects.bulk_update(retiered, ['poll_interval'], batch_size=1000)
+
+    to_activate = [channel_id for key, (channel_id, is_active, _) in existing.items() if key in active_keys and not is_active]
+    to_deactivate = [channel_id for key, (channel_id, is_active, _) in existing.items() if key not in active_keys and is_active]
+    if to_activate:
+        MonitoredChannel.objects.filter(id__in=to_activate).update(is_active=True, next_check_at=now)
+    if to_deactivate:
+        MonitoredChannel.objects.filter(id__in=to_deactivate).update(is_active=False)
+
+    return (
+        f"{len(missing)} canais criados, {len(to_activate)} reativados, "
+        f"{len(to_deactivate)} desativados, {len(retiered)} mudaram de plano."
+    )
@@ -0,0 +1,73 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import UserProfile
+
+from .models import Automation
+from .scheduling import refresh_channel
+from .stats import add_successful_notifications, refresh_automation_counts
+
+
+@receiver(post_save, sender=Automation)
+def automation_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Mantém o canal monitorado em dia. Uma automação nova é verificada no
+    próximo tick do scheduler, sem esperar o intervalo do canal.
+    """
+    # Salvar só o status da verificação não muda canal nem contadores
+    if update_fields is not None and set(update_fields) == {'last_status'}:
+        return
+
+    refresh_channel(instance.platform, instance.channel_identifier, check_now=created)
+    refresh_automation_counts(instance.user_id)
+
+
+@receiver(pre_delete, sender=Automation)
+def automation_deleting(sender, instance, **kwargs):
+    """
+    Os logs saem junto com a automação (CASCADE); tira as notificações dela do contador.
+    """
+    sent = instance.logs.filter(status='SUCCESS').count()
+    add_successful_notifications({instance.user_id: -sent}, create=False)
+
+
+@receiver(post_delete, sender=Automation)
+def automation_deleted(sender, instance, **kwargs):
+    refresh_channel(instance.platform, instance.channel_identifier)
+    refresh_automation_counts(instance.user_id, create=False)
+
+
+# Campos do perfil que mudam o agendamento dos canais do usuário
+PROFILE_PLAN_FIELDS = ('plan_id', 'plan_expires_at')
+
+
+def profile_plan_state(profile):
+    # Campos adiados (only/defer) ficam de fora em vez de disparar uma consulta
+    return {field: profile.__dict__[field] for field in PROFILE_PLAN_FIELDS if field in profile.__dict__}
+
+
+@receiver(post_init, sender=UserProfile)
+def profile_loaded(sender, instance, **kwargs):
+    instance._saved_plan_state = profile_plan_state(instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved(sender, instance, created, **kwargs):
+    """
+    Troca de plano (ou da expiração) muda o intervalo dos canais que o usuário
+    segue. O perfil é salvo a cada User.save (inclusive o last_login do login),
+    então sem mudança nesses campos não há nada a refazer.
+    """
+    state = profile_plan_state(instance)
+    changed = created or state != instance._saved_plan_state
+    instance._saved_plan_state = state
+    if not changed:
+        return
+
+    channels = (
+        Automation.objects.filter(user_id=instance.user_id)
+        .values_list('platform', 'channel_identifier')
+        .distinct()
+    )
+    for platform, channel_identifier in channels:
+        refresh_channel(platform, channel_identifier)
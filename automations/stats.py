@@ -0,0 +1,105 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from .models import Automation, NotificationLog, UserStats
+
+
+def stats_cache_key(user_id):
+    return f"dashboard:stats:{user_id}"
+
+
+def automation_counts(user_id):
+    return Automation.objects.filter(user_id=user_id).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+    )
+
+
+def recompute_user_stats(user_id):
+    """
+    Recalcula os contadores do usuário a partir das tabelas (caminho lento,
+    usado só quando ainda não há registro ou para corrigir divergências).
+    successful_notifications conta os logs de sucesso ainda em NotificationLog;
+    os caminhos incrementais seguem a mesma regra (somam ao gravar e subtraem
+    ao excluir a automação ou ao expurgar pela retenção).
+    """
+    counts = automation_counts(user_id)
+    successful = NotificationLog.objects.filter(automation__user_id=user_id, status='SUCCESS').count()
+
+    stats, _ = UserStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'total_automations': counts['total'],
+            'active_automations': counts['active'],
+            'successful_notifications': successful,
+        },
+    )
+    cache.delete(stats_cache_key(user_id))
+    return stats
+
+
+def refresh_automation_counts(user_id, create=True):
+    """
+    Atualiza só os contadores de automações (uma agregação sobre as automações
+    do usuário, sem tocar nos logs). Com create=False não cria o registro,
+    o que importa quando o próprio usuário está sendo excluído.
+    """
+    counts = automation_counts(user_id)
+    updated = UserStats.objects.filter(user_id=user_id).update(
+        total_automations=counts['total'],
+        active_automations=counts['active'],
+    )
+    if not updated and create:
+        recompute_user_stats(user_id)
+    cache.delete(stats_cache_key(user_id))
+
+
+def add_successful_notifications(deltas, create=True):
+    """
+    Soma (ou subtrai, com valores negativos) notificações enviadas por usuário.
+    deltas: {user_id: quantidade}. Nunca fica abaixo de zero (um contador
+    defasado não pode quebrar a exclusão ou o expurgo).
+    """
+    for user_id, delta in deltas.items():
+        if not delta:
+            continue
+        updated = UserStats.objects.filter(user_id=user_id).update(
+            successful_notifications=Greatest(F('successful_notifications') + delta, 0),
+        )
+        if not updated and create:
+            # Sem registro ainda: o recálculo já enxerga os logs recém-gravados
+            recompute_user_stats(user_id)
+        cache.delete(stats_cache_key(user_id))
+
+
+def count_successful_logs(logs):
+    """
+    Contabiliza os NotificationLog de sucesso recém-criados (bulk_create não dispara signals).
+    As automações dos logs precisam estar carregadas.
+    """
+    add_successful_notifications(Counter(
+        log.automation.user_id for log in logs if log.status == 'SUCCESS'
+    ))
+
+
+def get_dashboard_stats(user_id):
+    """
+    Contadores do dashboard, servidos do cache por DASHBOARD_STATS_CACHE_TTL segundos.
+    """
+    key = stats_cache_key(user_id)
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    record = UserStats.objects.filter(user_id=user_id).first() or recompute_user_stats(user_id)
+    stats = {
+        'total_automations': record.total_automations,
+        'active_automations': record.active_automations,
+        'total_notifications': record.successful_notifications,
+    }
+    cache.set(key, stats, settings.DASHBOARD_STATS_CACHE_TTL)
+    return stats
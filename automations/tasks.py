@@ -1,143 +1,436 @@
 from celery import shared_task
 from django.conf import settings
-from .models import Automation, NotificationLog
-from discord_webhook import DiscordWebhook, DiscordEmbed
-from TikTokLive import TikTokLiveClient
-from asgiref.sync import async_to_sync
-import requests
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+from .models import Automation, MonitoredChannel, NotificationLog
+from .plan_limits import enforce_plan_limits
+from .retention import purge_notification_logs
+from .websub import renew_subscriptions
+from .scheduling import compute_next_check, plan_interval, record_live_start, rename_channels, sync_channels
+from . import backpressure, metrics
+from .live_cache import cached_check_many, claim_dispatches, release_dispatches, watched
+from .providers import get_provider
+from .stats import count_successful_logs
+from .delivery import DeliveryOutcome, build_discord_embed, execute_webhook, pop_pending_alerts, queue_alert, reserve_send
 import logging
-import re
+import time
 
 logger = logging.getLogger(__name__)
 
-def check_tiktok_live(username):
+BULK_BATCH_SIZE = 500
+
+@shared_task(bind=True, ignore_result=True)
+def deliver_discord_batch(self, webhook_url, alerts, attempt=0):
     """
-    Verifica se um usuário do TikTok está ao vivo usando a lib oficial.
+    Entrega no Discord, numa única mensagem, os alertas acumulados para um
+    webhook (até DISCORD_MAX_EMBEDS embeds), pela fila dedicada 'discord'.
+
+    Respeita um token bucket por webhook (e um global) guardado no Redis,
+    honra o Retry-After dos 429 e tenta de novo com backoff. Só grava os
+    NotificationLog com o resultado final.
     """
-    try:
-        clean_user = username.replace("@", "")
-        client = TikTokLiveClient(unique_id=clean_user)
-        is_live = async_to_sync(client.is_live)()
-        
-        logger.info(f"[DEBUG] TikTok Check para '{clean_user}': is_live={is_live}")
-        
-        return is_live, f"Live de {clean_user}", None
-        
-    except Exception as e:
-        logger.error(f"Erro ao verificar TikTok para '{username}': {e}")
-        return False, "", None
-
-def check_youtube_live(channel_id):
-    """
-    Verifica se um canal do YouTube está ao vivo via Web Scraping (Sem API Key).
-    Vantagem: Sem limite de cota diária.
-    """
-    url = f"https://www.youtube.com/channel/{channel_id}/live"
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
+    automations = Automation.objects.in_bulk([alert['automation_id'] for alert in alerts])
+    alerts = [alert for alert in alerts if alert['automation_id'] in automations]
+    if not alerts:
+        return "Nenhuma automação encontrada"
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
+    wait = reserve_send(webhook_url)
+    if wait:
+        # Esperar token não conta como tentativa
+        self.apply_async(args=[webhook_url, alerts], kwargs={'attempt': attempt}, countdown=wait)
+        return f"Aguardando {wait:.2f}s pelo rate limit"
 
-        if response.status_code != 200:
-            logger.warning(f"YouTube retornou status {response.status_code} para o canal {channel_id}")
-            return False, "", None
+    embeds = [
+        build_discord_embed(automations[alert['automation_id']], alert['is_starting'], alert['title'], alert['thumbnail'])
+        for alert in alerts
+    ]
+    outcome = execute_webhook(webhook_url, embeds, attempt)
 
-        html = response.text
+    if outcome.kind == DeliveryOutcome.RETRY and attempt + 1 < settings.DISCORD_MAX_ATTEMPTS:
+        self.apply_async(args=[webhook_url, alerts], kwargs={'attempt': attempt + 1}, countdown=outcome.delay)
+        return f"Nova tentativa em {outcome.delay:.2f}s: {outcome.detail}"
 
-        if '"isLive":true' in html:
-            logger.info(f"[DEBUG] YouTube Check '{channel_id}': LIVE DETECTADA! (isLive:true found)")
-            title_search = re.search(r'<title>(.*?)- YouTube</title>', html)
-            title = title_search.group(1).strip() if title_search else "Live no YouTube"
-            thumb_search = re.search(r'"thumbnailUrl":["\'](.*?)["\']', html)
-            thumbnail = thumb_search.group(1) if thumb_search else None
-            
-            return True, title, thumbnail
+    status = 'SUCCESS' if outcome.kind == DeliveryOutcome.SENT else 'FAILURE'
+    details = outcome.detail if status == 'SUCCESS' or attempt == 0 else f"{outcome.detail} (após {attempt + 1} tentativas)"
+    logs = NotificationLog.objects.bulk_create([
+        NotificationLog(
+            automation=automations[alert['automation_id']],
+            status=status,
+            event='STARTED' if alert['is_starting'] else 'ENDED',
+            details=details,
+        )
+        for alert in alerts
+    ])
+    count_successful_logs(logs)
+    return f"{len(alerts)} alertas: {details}"
 
-        logger.info(f"[DEBUG] YouTube Check '{channel_id}': Offline (isLive:true not found)")
-        return False, "", None
+@shared_task(ignore_result=True)
+def flush_discord_webhook(webhook_url):
+    """
+    Fecha a janela de agrupamento de um webhook e entrega o que acumulou.
+    Se sobrar mais que o limite de embeds, agenda outro flush na hora.
+    """
+    alerts, remaining = pop_pending_alerts(webhook_url, settings.DISCORD_MAX_EMBEDS)
+    if remaining:
+        flush_discord_webhook.delay(webhook_url)
+    if alerts:
+        return deliver_discord_batch(webhook_url, alerts)
+    return "Nada para enviar"
 
-    except Exception as e:
-        logger.error(f"Erro ao fazer scraping do YouTube para '{channel_id}': {e}")
-        return False, "", None
+def missing_webhook_log(automation, is_starting):
+    """
+    Log de falha (ainda não salvo) para automações sem webhook configurado.
+    """
+    return NotificationLog(
+        automation=automation,
+        status='FAILURE',
+        event='STARTED' if is_starting else 'ENDED',
+        details="URL do Webhook ausente",
+    )
 
-def send_discord_alert(automation, is_starting, title, thumbnail_url):
+def queue_discord_alert(automation, is_starting, title, thumbnail):
+    """
+    Acumula o alerta por webhook durante DISCORD_COALESCE_WINDOW segundos;
+    o primeiro alerta da janela agenda o flush que envia todos juntos.
+    """
+    alert = {
+        'automation_id': automation.id,
+        'is_starting': is_starting,
+        'title': title,
+        'thumbnail': thumbnail,
+    }
     if not automation.discord_webhook_url:
-        return False, "URL do Webhook ausente"
-
-    webhook = DiscordWebhook(url=automation.discord_webhook_url)
-    
-    if is_starting:
-        embed_color = '00FF00'
-        status_msg = "🔴 LIVE INICIADA!"
-        desc = f"A live **{title}** começou no {automation.get_platform_display()}!"
-    else:
-        embed_color = '808080'
-        status_msg = "⚫ LIVE ENCERRADA!"
-        desc = f"A live no {automation.get_platform_display()} terminou. Obrigado a todos!"
-
-    embed = DiscordEmbed(title=status_msg, description=desc, color=embed_color)
-    if thumbnail_url:
-        embed.set_thumbnail(url=thumbnail_url)
-        
-    link = ""
-    if automation.platform == 'TIKTOK':
-        link = f"https://www.tiktok.com/@{automation.channel_identifier.replace('@', '')}/live"
-    elif automation.platform == 'YOUTUBE':
-        link = f"https://www.youtube.com/channel/{automation.channel_identifier}/live"
-    
-    embed.add_embed_field(name="Assistir agora", value=f"[Clique aqui para entrar]({link})")
-    embed.set_footer(text=f"Bot LiveSync - Automação: {automation.name}")
-    embed.set_timestamp()
-    webhook.add_embed(embed)
-    
-    try:
-        webhook.execute()
-        return True, "Enviado com sucesso"
-    except Exception as e:
-        logger.error(f"Falha no Discord: {e}")
-        return False, str(e)
+        missing_webhook_log(automation, is_starting).save()
+        return
 
-@shared_task
-def process_automation(automation_id):
-    try:
-        automation = Automation.objects.get(id=automation_id)
-    except Automation.DoesNotExist:
-        return "Automação não encontrada"
+    if queue_alert(automation.discord_webhook_url, alert, settings.DISCORD_COALESCE_WINDOW):
+        flush_discord_webhook.apply_async(args=[automation.discord_webhook_url], countdown=settings.DISCORD_COALESCE_WINDOW)
 
-    is_live = False
-    title = ""
-    thumbnail = ""
+def queue_discord_alerts(alerts):
+    for automation, is_starting, title, thumbnail in alerts:
+        queue_discord_alert(automation, is_starting, title, thumbnail)
 
-    if automation.platform == 'TIKTOK':
-        is_live, title, thumbnail = check_tiktok_live(automation.channel_identifier)
-    elif automation.platform == 'YOUTUBE':
-        is_live, title, thumbnail = check_youtube_live(automation.channel_identifier)
+def check_channels(platform, identifiers, concurrency=None, recorder=None):
+    """
+    Verificação em lote pelo provider da plataforma, atrás do cache compartilhado.
+    """
+    provider = get_provider(platform)
+    return cached_check_many(
+        platform,
+        identifiers,
+        lambda pending: provider.check_many(pending, concurrency=concurrency, recorder=recorder),
+    )
 
-    current_status = 'ONLINE' if is_live else 'OFFLINE'
+def live_transition(automation, is_live):
+    """
+    Decide, sem tocar no banco, o que uma verificação muda numa automação.
+    Retorna (novo_status, is_starting); is_starting é None quando não há alerta.
+    """
     previous_status = automation.last_status
+    if is_live is None:
+        # Verificação sem resposta: mantém o status e não gera alerta
+        return previous_status, None
+
+    current_status = 'ONLINE' if is_live else 'OFFLINE'
 
     if current_status == 'ONLINE' and previous_status != 'ONLINE':
-        success, msg = send_discord_alert(automation, True, title, thumbnail)
-        NotificationLog.objects.create(automation=automation, status='SUCCESS' if success else 'FAILURE', details=msg)
-        
-    elif current_status == 'OFFLINE' and previous_status == 'ONLINE':
-        success, msg = send_discord_alert(automation, False, title, thumbnail)
-        NotificationLog.objects.create(automation=automation, status='SUCCESS' if success else 'FAILURE', details=msg)
-
-    if previous_status != current_status:
-        automation.last_status = current_status
-        automation.save(update_fields=['last_status'])
-        return f"Status atualizado para {current_status}"
-    
-    return "Status inalterado"
+        return current_status, True
+    if current_status == 'OFFLINE' and previous_status == 'ONLINE':
+        return current_status, False
+    return current_status, None
+
+CHANNEL_STATE_FIELDS = [
+    'last_status', 'last_checked_at', 'next_check_at', 'last_live_at', 'live_start_hours', 'is_active', 'poll_interval',
+]
+
+def advance_channel(channel, is_live, now):
+    """
+    Atualiza em memória o estado de polling do canal e agenda a próxima verificação.
+    Sem resposta (is_live None), só reagenda.
+    """
+    if is_live is None:
+        channel.next_check_at = compute_next_check(channel, now)
+        return
+
+    current_status = 'ONLINE' if is_live else 'OFFLINE'
+    if current_status == 'ONLINE' and channel.last_status != 'ONLINE':
+        record_live_start(channel, now)
+
+    channel.last_status = current_status
+    channel.last_checked_at = now
+    channel.next_check_at = compute_next_check(channel, now)
+
+@shared_task
+def process_channel(platform, channel_identifier):
+    """
+    Verifica um canal uma única vez e distribui o resultado para todas as
+    automações ativas inscritas nele.
+    """
+    return process_channels_batch(platform, [channel_identifier])
+
+def persist_channel_results(platform, results, now, automations=None, update_channels=True, dry_run=False):
+    """
+    Aplica os resultados de um lote de canais: decide as transições das
+    automações, reagenda os canais e grava tudo numa transação (bulk_update /
+    bulk_create). Os alertas vão para a fila do Discord depois do commit.
+
+    `automations` restringe quais automações são atualizadas (padrão: todas
+    com plano válido nos canais do lote). Com update_channels=False o
+    agendamento dos canais não é tocado; com dry_run nada é gravado nem enviado.
+    Retorna (automações, alteradas, alertas).
+    """
+    if automations is None:
+        automations = Automation.objects.entitled(now)
+    # Uma consulta só, já trazendo o plano de cada dono para recalcular o intervalo do canal
+    automations = list(automations.filter(
+        platform=platform,
+        channel_identifier__in=list(results),
+    ).select_related('user__profile__plan'))
+
+    changed = []
+    alerts = []
+    subscribed = {}
+    for automation in automations:
+        profile = getattr(automation.user, 'profile', None)
+        plan = profile.plan if profile else None
+        subscribed.setdefault(automation.channel_identifier, []).append(plan.poll_interval_seconds if plan else None)
+        is_live, title, thumbnail = results[automation.channel_identifier]
+        current_status, is_starting = live_transition(automation, is_live)
+        if is_starting is not None:
+            alerts.append((automation, is_starting, title, thumbnail))
+        if automation.last_status != current_status:
+            automation.last_status = current_status
+            changed.append(automation)
+
+    if dry_run:
+        return automations, changed, alerts
+
+    channels = []
+    if update_channels:
+        channels = list(MonitoredChannel.objects.filter(platform=platform, channel_identifier__in=list(results)))
+    for channel in channels:
+        # Canal sem nenhuma automação com plano válido sai do agendamento até alguém voltar a segui-lo
+        channel.is_active = channel.channel_identifier in subscribed
+        if channel.is_active:
+            channel.poll_interval = plan_interval(subscribed[channel.channel_identifier])
+        advance_channel(channel, results[channel.channel_identifier][0], now)
+
+    missing_webhook = [
+        missing_webhook_log(automation, is_starting)
+        for automation, is_starting, _, _ in alerts
+        if not automation.discord_webhook_url
+    ]
+    queued = [alert for alert in alerts if alert[0].discord_webhook_url]
+
+    # Uma transação e um punhado de consultas por lote, não por automação.
+    # Os alertas só vão para a fila do Discord depois do commit.
+    with transaction.atomic():
+        Automation.objects.bulk_update(changed, ['last_status'], batch_size=BULK_BATCH_SIZE)
+        MonitoredChannel.objects.bulk_update(channels, CHANNEL_STATE_FIELDS, batch_size=BULK_BATCH_SIZE)
+        NotificationLog.objects.bulk_create(missing_webhook, batch_size=BULK_BATCH_SIZE)
+        transaction.on_commit(lambda: queue_discord_alerts(queued))
+
+    return automations, changed, alerts
+
+@shared_task
+def process_channels_batch(platform, identifiers):
+    """
+    Verifica um lote de canais da mesma plataforma de forma concorrente
+    (um único event loop e cliente HTTP), aplica os resultados às automações
+    e agenda a próxima verificação de cada canal. Ao terminar libera a reserva
+    de despacho dos canais (claim_dispatches), mesmo se a verificação falhar.
+    """
+    started = time.perf_counter()
+    try:
+        results = check_channels(platform, identifiers)
+        automations, changed, _ = persist_channel_results(platform, results, timezone.now())
+        # @handle resolvido durante a verificação passa a ser salvo pelo ID do canal
+        renames = get_provider(platform).canonical_identifiers(results)
+        if renames:
+            rename_channels(platform, renames)
+    finally:
+        release_dispatches(platform, identifiers)
+        backpressure.record_drained()
+
+    recorder = metrics.Recorder()
+    recorder.observe('live_check_batch_duration_seconds', time.perf_counter() - started, platform=platform)
+    recorder.inc('scheduler_finished_channels_total', len(results), platform=platform)
+    recorder.inc('scheduler_finished_automations_total', len(automations), platform=platform)
+    recorder.flush()
+
+    live = sum(1 for is_live, _, _ in results.values() if is_live)
+    return f"{platform}: {len(results)} canais verificados, {live} ao vivo, {len(changed)} automações atualizadas"
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _dispatch_chunk(rows, now, budget, recorder, totals):
+    """
+    Despacha um pedaço dos canais vencidos, já na ordem dos mais atrasados:
+    tira os acompanhados pelo watcher e os que já estão na fila, monta os lotes
+    por faixa e plataforma e envia até `budget` lotes (None = sem limite).
+    Acumula as contagens em `totals` e retorna quantos lotes foram enviados.
+    """
+    # Canais com conexão persistente aberta (watcher do TikTok) não precisam de polling;
+    # ficam reservados e voltam a ser considerados quando a reserva vencer
+    watching = {}
+    for _, platform, channel_identifier, _, _ in rows:
+        watching.setdefault(platform, []).append(channel_identifier)
+    watching = {platform: watched(platform, identifiers) for platform, identifiers in watching.items()}
+
+    reserved = []
+    buckets = {}
+    for channel_id, platform, channel_identifier, poll_interval, next_check_at in rows:
+        if channel_identifier in watching[platform]:
+            totals['watched'] += 1
+            reserved.append(channel_id)
+            continue
+        buckets.setdefault((poll_interval, platform), []).append((channel_id, channel_identifier, next_check_at))
+
+    # Canal que ainda está na fila ou em verificação (fila lenta, reserva vencida) não entra de novo:
+    # cada canal ocupa no máximo um lugar na fila. Também não é reservado: o worker que está com ele
+    # grava o próximo next_check_at e a reserva do scheduler sobrescreveria esse agendamento
+    batches = []
+    for (poll_interval, platform), channels in buckets.items():
+        claimed = set(claim_dispatches(platform, [channel_identifier for _, channel_identifier, _ in channels]))
+        if len(claimed) < len(channels):
+            recorder.inc('scheduler_skipped_dispatch_total', len(channels) - len(claimed), platform=platform)
+            totals['duplicates'] += len(channels) - len(claimed)
+        channels = [channel for channel in channels if channel[1] in claimed]
+
+        # Cada provider recebe o lote inteiro, no tamanho que ele prefere
+        batch_size = get_provider(platform).batch_size
+        for start in range(0, len(channels), batch_size):
+            batches.append((poll_interval, platform, channels[start:start + batch_size]))
+
+    # Lote com o canal mais atrasado primeiro; entre iguais, a faixa mais rápida
+    batches.sort(key=lambda batch: (batch[2][0][2], batch[0]))
+    if budget is not None and budget < len(batches):
+        batches, deferred = batches[:budget], batches[budget:]
+        for _, platform, channels in deferred:
+            release_dispatches(platform, [channel_identifier for _, channel_identifier, _ in channels])
+            recorder.inc('scheduler_deferred_channels_total', len(channels), platform=platform)
+            totals['deferred'] += len(channels)
+
+    # Reserva os canais antes de enfileirar, para a gravação do worker não ser sobrescrita
+    # e o próximo tick não os despachar de novo enquanto estão na fila
+    reserved.extend(channel_id for _, _, channels in batches for channel_id, _, _ in channels)
+    MonitoredChannel.objects.filter(id__in=reserved).update(
+        next_check_at=now + timedelta(seconds=settings.LIVE_SCHEDULER_CLAIM_SECONDS)
+    )
+
+    # Sem countdown: o espalhamento vem do next_check_at em fase (scheduling.spread), e mensagem
+    # com ETA sai da fila direto para a memória do worker, onde o backpressure não a enxerga
+    for poll_interval, platform, channels in batches:
+        process_channels_batch.delay(platform, [channel_identifier for _, channel_identifier, _ in channels])
+        totals['tiers'][poll_interval] = totals['tiers'].get(poll_interval, 0) + len(channels)
+        recorder.inc('scheduler_dispatched_channels_total', len(channels), platform=platform)
+    return len(batches)
 
 @shared_task
 def scheduler_beat():
-    active_automations = Automation.objects.filter(is_active=True)
-    for auto in active_automations:
-        process_automation.delay(auto.id)
-    return f"Verificando {active_automations.count()} automações."
\ No newline at end of file
+    """
+    Despacha apenas os canais cuja próxima verificação já venceu, os mais
+    atrasados primeiro. Roda a cada LIVE_SCHEDULER_TICK segundos.
+
+    Os canais vencidos são lidos em pedaços de LIVE_SCHEDULER_CHUNK_SIZE (só
+    as colunas necessárias, sem carregar tudo na memória) e cada pedaço vira
+    lotes por faixa de plano (poll_interval) e plataforma, uma mensagem por lote.
+    Só entram na fila os lotes que os workers dão conta de esvaziar
+    (backpressure.dispatch_budget); o resto continua vencido e volta no próximo
+    ciclo, na frente dos que vencerem depois.
+    """
+    started = time.perf_counter()
+    now = timezone.now()
+    due = (
+        MonitoredChannel.objects.filter(is_active=True, next_check_at__lte=now)
+        .order_by('next_check_at')
+        .values_list('id', 'platform', 'channel_identifier', 'poll_interval', 'next_check_at')[:settings.LIVE_SCHEDULER_MAX_DISPATCH]
+    )
+    budget, depth, rate = backpressure.dispatch_budget()
+    recorder = metrics.Recorder()
+    totals = {'read': 0, 'watched': 0, 'duplicates': 0, 'deferred': 0, 'tiers': {}}
+    lag = 0
+
+    chunk_size = settings.LIVE_SCHEDULER_CHUNK_SIZE
+    # Fila cheia: nenhum canal é lido e todos seguem vencidos para o próximo ciclo
+    saturated = budget == 0
+    chunks = () if saturated else _chunks(due.iterator(chunk_size=chunk_size), chunk_size)
+    for position, rows in enumerate(chunks):
+        if position == 0:
+            lag = (now - rows[0][4]).total_seconds()
+        totals['read'] += len(rows)
+        sent = _dispatch_chunk(rows, now, budget, recorder, totals)
+        if budget is not None:
+            budget -= sent
+            if budget <= 0:
+                # O orçamento acabou: o resto nem é lido
+                break
+
+    # Sem leitura não há atraso medido; o gauge fica com o do último ciclo que leu
+    if not saturated:
+        recorder.set('scheduler_lag_seconds', lag)
+    recorder.observe('scheduler_cycle_duration_seconds', time.perf_counter() - started)
+    if depth is not None:
+        recorder.set('scheduler_queue_depth', depth)
+        recorder.set('scheduler_drain_rate', rate)
+    recorder.flush()
+
+    if saturated:
+        return f"Fila cheia ({depth} lotes, {rate:.2f} lotes/s): nenhum canal despachado."
+    if not totals['read']:
+        return "Nenhum canal para verificar."
+
+    tiers = totals['tiers']
+    summary = f"Verificando {sum(tiers.values())} canais ({', '.join(f'{interval}s: {count}' for interval, count in sorted(tiers.items()))})."
+    if totals['watched']:
+        summary += f" {totals['watched']} acompanhados pelo watcher."
+    if totals['duplicates']:
+        summary += f" {totals['duplicates']} já estavam na fila."
+    if totals['deferred']:
+        summary += f" {totals['deferred']} adiados (fila com {depth} lotes, {rate:.2f} lotes/s)."
+    return summary
+
+@shared_task
+def sync_monitored_channels():
+    """
+    Reconcilia a tabela de canais monitorados com as automações ativas
+    (os signals cobrem o caso comum; isto corrige o que escapar deles).
+    """
+    return sync_channels()
+
+@shared_task
+def enforce_plan_limits_sweep():
+    """
+    Suspende em massa as automações além do limite do plano e reativa as
+    que voltaram a caber; depois reconcilia os canais para o scheduler.
+    """
+    suspended, restored = enforce_plan_limits()
+    if suspended or restored:
+        sync_channels()
+    return f"{suspended} automações suspensas, {restored} reativadas."
+
+@shared_task
+def purge_notification_logs_sweep():
+    """
+    Aplica a política de retenção dos logs de notificação (apaga ou arquiva em lotes).
+    """
+    removed, archived = purge_notification_logs()
+    return f"{removed} logs removidos, {archived} arquivados."
+
+@shared_task
+def renew_websub_subscriptions():
+    """
+    Mantém as inscrições WebSub dos canais do YouTube: inscreve os novos,
+    renova as que estão para vencer e desinscreve os canais sem automações.
+    """
+    subscribed, unsubscribed, failed = renew_subscriptions()
+    return f"{subscribed} inscrições pedidas, {unsubscribed} desinscrições, {failed} falhas."
@@ -1,3 +1,1340 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlparse
 
-# Create your tests here.
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app import redis_client
+from benchmarks.stubs import ATOM_NOTIFICATION, FIXTURES_DIR, LiveSocketStub, PlatformStub
+from plans.models import Plan
+
+from . import breaker, delivery, live_cache, metrics, ratelimit, tiktok_rooms, views, websub
+from .models import (
+    Automation,
+    MonitoredChannel,
+    NotificationLog,
+    NotificationLogArchive,
+    UserStats,
+    YouTubeChannelAlias,
+)
+from .plan_limits import enforce_plan_limits
+from .providers import get_provider
+from .retention import purge_notification_logs
+from .scanner import YouTubeLiveScanner, scan_chunks
+from .scheduling import HOURS_PER_WEEK, compute_next_check, hour_of_week, refresh_channel, rename_channels, spread
+from .stats import count_successful_logs, get_dashboard_stats, recompute_user_stats
+from .tasks import _dispatch_chunk, persist_channel_results, process_channels_batch, scheduler_beat
+from .watcher import TikTokLiveWatcher
+from .youtube_resolver import ChannelNotFound, known_channel_id, parse_identifier, resolve_channel_id
+
+
+class RedisTestCase(TestCase):
+    """
+    Base dos testes que usam o Redis: troca a conexão compartilhada por uma em
+    REDIS_TEST_URL, limpa antes e depois de cada teste.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.previous_client = redis_client._client
+        redis_client._client = redis.Redis.from_url(settings.REDIS_TEST_URL, decode_responses=True)
+        redis_client._client.flushdb()
+        self.reset_scripts()
+
+    def tearDown(self):
+        redis_client._client.flushdb()
+        redis_client._client = self.previous_client
+        self.reset_scripts()
+        super().tearDown()
+
+    @staticmethod
+    def reset_scripts():
+        # Os scripts Lua registrados ficam presos à conexão que os registrou
+        breaker._scripts.clear()
+        delivery._pop_script = None
+        live_cache._extend_script = None
+        live_cache._release_script = None
+        ratelimit._script = None
+
+
+def create_user(username='streamer', poll_interval_seconds=60, max_automations=50):
+    plan = Plan.objects.create(
+        name=f"Plano {username}", max_automations=max_automations, poll_interval_seconds=poll_interval_seconds,
+    )
+    user = User.objects.create(username=username)
+    user.profile.plan = plan
+    user.profile.save()
+    return user
+
+
+async def wait_until(predicate, timeout=5):
+    """
+    Espera uma condição do teste assíncrono ficar verdadeira.
+    """
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("Condição não foi atingida a tempo")
+        await asyncio.sleep(0.01)
+
+
+class TikTokLiveWatcherTests(RedisTestCase):
+    """
+    Watcher contra o LiveSocketStub: conexões de verdade, cliente StandInLiveClient.
+    """
+
+    def setUp(self):
+        super().setUp()
+        user = create_user()
+        for name in ('ana', 'bia'):
+            Automation.objects.create(
+                name=name, user=user, platform='TIKTOK', channel_identifier=name,
+                discord_webhook_url='https://discord.example/webhook', last_status='ONLINE',
+            )
+        MonitoredChannel.objects.filter(platform='TIKTOK').update(last_status='ONLINE')
+
+    async def start_watcher(self, live, **kwargs):
+        self.stub = await LiveSocketStub(live=live).start()
+        self.watcher = TikTokLiveWatcher(
+            client_factory=self.stub.client_factory, refresh_interval=0.05, retry_seconds=0.05, **kwargs,
+        )
+        self.run_task = asyncio.create_task(self.watcher.run())
+        await wait_until(lambda: self.watcher.connected == set(live))
+
+    async def stop_watcher(self):
+        self.watcher.stop()
+        await self.run_task
+        await self.stub.stop()
+
+    def statuses(self, identifier):
+        automation = Automation.objects.get(platform='TIKTOK', channel_identifier=identifier)
+        channel = MonitoredChannel.objects.get(platform='TIKTOK', channel_identifier=identifier)
+        return automation.last_status, channel.last_status
+
+    async def test_live_end_event_sets_offline(self):
+        await self.start_watcher({'ana', 'bia'})
+
+        await self.stub.end_live('ana')
+        await wait_until(lambda: 'ana' not in self.watcher.tasks)
+
+        self.assertEqual(await sync_to_async(self.statuses)('ana'), ('OFFLINE', 'OFFLINE'))
+        self.assertEqual(await sync_to_async(self.statuses)('bia'), ('ONLINE', 'ONLINE'))
+        # O cache compartilhado já responde OFFLINE para quem verificar agora
+        cached = await sync_to_async(live_cache.get_cached)('TIKTOK', ['ana'])
+        self.assertEqual(cached, {'ana': (False, "", None)})
+        await self.stop_watcher()
+
+    async def test_drop_reconnects_when_still_live(self):
+        await self.start_watcher({'bia'})
+
+        with mock.patch('automations.watcher.confirm_live', return_value=True) as confirm:
+            await self.stub.drop('bia')
+            await wait_until(lambda: self.stub.counters['connections'] == 2 and 'bia' in self.watcher.connected)
+
+        confirm.assert_called_once_with('bia')
+        self.assertEqual(await sync_to_async(self.statuses)('bia'), ('ONLINE', 'ONLINE'))
+        await self.stop_watcher()
+
+    async def test_drop_confirmed_offline_sets_offline(self):
+        await self.start_watcher({'bia'})
+
+        with mock.patch('automations.watcher.confirm_live', return_value=False) as confirm:
+            await self.stub.drop('bia')
+            await wait_until(lambda: 'bia' not in self.watcher.tasks)
+
+        confirm.assert_called_once_with('bia')
+        self.assertEqual(self.stub.counters['connections'], 1)
+        self.assertEqual(await sync_to_async(self.statuses)('bia'), ('OFFLINE', 'OFFLINE'))
+        await self.stop_watcher()
+
+    async def test_watch_lease_is_renewed_and_released(self):
+        await self.start_watcher({'ana', 'bia'}, lease_seconds=30)
+        watched = sync_to_async(live_cache.watched)
+
+        self.assertEqual(await watched('TIKTOK', ['ana', 'bia']), {'ana', 'bia'})
+        ttl = await sync_to_async(redis_client._client.ttl)(live_cache._watch_key('TIKTOK', 'ana'))
+        self.assertTrue(0 < ttl <= 30)
+
+        # Marca perdida (expirou): o próximo refresh renova as das conexões abertas
+        await sync_to_async(live_cache.release_watch)('TIKTOK', 'ana')
+        await asyncio.sleep(0.2)
+        self.assertEqual(await watched('TIKTOK', ['ana', 'bia']), {'ana', 'bia'})
+
+        # Conexão encerrada devolve o canal ao scheduler
+        await self.stub.end_live('ana')
+        await wait_until(lambda: 'ana' not in self.watcher.tasks)
+        self.assertEqual(await watched('TIKTOK', ['ana', 'bia']), {'bia'})
+
+        await self.stop_watcher()
+        self.assertEqual(await watched('TIKTOK', ['ana', 'bia']), set())
+
+    async def test_watch_lease_lapses_without_release(self):
+        # Watcher que morre sem liberar as marcas: o canal volta ao scheduler quando a marca expira
+        with mock.patch('automations.watcher.release_watch'):
+            await self.start_watcher({'ana'}, lease_seconds=1)
+            watched = sync_to_async(live_cache.watched)
+            self.assertEqual(await watched('TIKTOK', ['ana']), {'ana'})
+
+            await self.stop_watcher()
+        self.assertEqual(await watched('TIKTOK', ['ana']), {'ana'})
+
+        await asyncio.sleep(1.2)
+        self.assertEqual(await watched('TIKTOK', ['ana']), set())
+
+
+class TikTokRoomCacheTests(RedisTestCase):
+    """
+    Cache de salas do TikTok contra o PlatformStub: só a primeira verificação
+    de uma live consulta a sala completa; as seguintes vão pelo check_alive.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stub = PlatformStub(live_ratio=1.0).start()
+        self.addCleanup(self.stub.stop)
+        overrides = override_settings(
+            TIKTOK_BASE_URL=self.stub.base_url, TIKTOK_WEBCAST_URL=f"{self.stub.base_url}/webcast",
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.provider = get_provider('TIKTOK')
+
+    def check(self):
+        return self.provider.check_many(['ana'])['ana']
+
+    def requests(self):
+        return self.stub.counters['tiktok_requests'], self.stub.counters['tiktok_check_alive_requests']
+
+    def test_live_room_is_confirmed_by_check_alive(self):
+        self.assertEqual(self.check(), (True, 'Live de ana', 'https://example.com/cover.jpg'))
+        self.assertEqual(self.requests(), (1, 0))
+        self.assertEqual(set(tiktok_rooms.get_rooms(['ana', 'bia'])), {'ana'})
+
+        # Hit: a sala em cache é confirmada sem a consulta completa
+        self.assertEqual(self.check(), (True, 'Live de ana', 'https://example.com/cover.jpg'))
+        self.assertEqual(self.requests(), (1, 1))
+
+    def test_stale_room_falls_back_to_full_lookup(self):
+        self.check()
+        self.stub.live_ratio = 0
+
+        self.assertEqual(self.check(), (False, "", None))
+        self.assertEqual(self.requests(), (2, 1))
+        self.assertEqual(tiktok_rooms.get_rooms(['ana']), {})
+
+    @override_settings(TIKTOK_ROOM_CACHE_TTL=1)
+    def test_expired_room_falls_back_to_full_lookup(self):
+        self.check()
+        time.sleep(1.2)
+
+        self.assertEqual(tiktok_rooms.get_rooms(['ana']), {})
+        self.assertEqual(self.check(), (True, 'Live de ana', 'https://example.com/cover.jpg'))
+        self.assertEqual(self.requests(), (2, 0))
+
+
+YOUTUBE_CHANNEL_ID = 'UC' + '1' * 22
+WEBHOOK_URL = 'https://discord.example/api/webhooks/1/token'
+
+
+@override_settings(WEBSUB_CALLBACK_BASE_URL='https://app.example')
+class WebSubTests(RedisTestCase):
+    """
+    Inscrição e push do WebSub com o hub stand-in do PlatformStub, falando com
+    a view pelo cliente de testes do Django.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.hub = PlatformStub().start()
+        self.addCleanup(self.hub.stop)
+        Automation.objects.create(
+            name='canal', user=create_user(), platform='YOUTUBE', channel_identifier=YOUTUBE_CHANNEL_ID,
+            discord_webhook_url='https://discord.example/webhook',
+        )
+        self.channel = MonitoredChannel.objects.get(platform='YOUTUBE', channel_identifier=YOUTUBE_CHANNEL_ID)
+        self.topic = websub.topic_url(YOUTUBE_CHANNEL_ID)
+        self.callback = reverse('websub_callback', args=[self.channel.pk])
+
+    def send(self, method, url, params=None, body=None, headers=None):
+        if method == 'GET':
+            response = self.client.get(urlparse(url).path, params)
+        else:
+            headers = dict(headers)
+            response = self.client.post(urlparse(url).path, body, content_type=headers.pop('Content-Type'), headers=headers)
+        return response.status_code, response.content.decode()
+
+    def subscribe(self):
+        with override_settings(WEBSUB_HUB_URL=self.hub.base_url + '/subscribe'):
+            self.assertEqual(websub.renew_subscriptions(), (1, 0, 0))
+        self.assertEqual(self.hub.verify_subscriptions(self.send), 1)
+        self.channel.refresh_from_db()
+
+    def verify(self, **params):
+        params = {'hub.mode': 'subscribe', 'hub.topic': self.topic, 'hub.challenge': 'desafio', **params}
+        return self.client.get(self.callback, params)
+
+    def request_pending(self, mode='subscribe', requested_at=None):
+        self.channel.websub_requested_at = requested_at or timezone.now()
+        self.channel.websub_requested_mode = mode
+        self.channel.save()
+
+    def test_hub_confirms_requested_subscription(self):
+        self.subscribe()
+
+        lease = self.channel.websub_lease_expires_at - timezone.now()
+        self.assertAlmostEqual(lease.total_seconds(), settings.WEBSUB_LEASE_SECONDS, delta=60)
+        self.assertIsNone(self.channel.websub_requested_at)
+        self.assertEqual(self.channel.websub_requested_mode, '')
+
+    def test_replayed_confirmation_is_refused(self):
+        self.subscribe()
+        self.assertEqual(self.verify().status_code, 404)
+
+    def test_unsolicited_confirmation_is_refused(self):
+        response = self.verify()
+
+        self.assertEqual(response.status_code, 404)
+        self.channel.refresh_from_db()
+        self.assertIsNone(self.channel.websub_lease_expires_at)
+
+    def test_confirmation_after_pending_window_is_refused(self):
+        self.request_pending(requested_at=timezone.now() - timedelta(seconds=settings.WEBSUB_RETRY_SECONDS + 1))
+        self.assertEqual(self.verify().status_code, 404)
+
+    def test_confirmation_of_other_mode_is_refused(self):
+        self.request_pending('subscribe')
+        self.assertEqual(self.verify(**{'hub.mode': 'unsubscribe'}).status_code, 404)
+
+    def test_confirmation_of_other_topic_is_refused(self):
+        self.request_pending()
+        self.assertEqual(self.verify(**{'hub.topic': websub.topic_url('UC' + '2' * 22)}).status_code, 404)
+
+    def test_lease_is_capped(self):
+        self.request_pending()
+        response = self.verify(**{'hub.lease_seconds': '99999999999'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'desafio')
+        self.channel.refresh_from_db()
+        lease = self.channel.websub_lease_expires_at - timezone.now()
+        self.assertLessEqual(lease.total_seconds(), settings.WEBSUB_LEASE_SECONDS)
+
+    def test_invalid_lease_is_refused(self):
+        for lease_seconds in ('abc', '1.5', '0', '-10'):
+            with self.subTest(lease_seconds=lease_seconds):
+                self.request_pending()
+                self.assertEqual(self.verify(**{'hub.lease_seconds': lease_seconds}).status_code, 404)
+
+    def test_callback_is_not_found_when_disabled(self):
+        self.request_pending()
+        with override_settings(WEBSUB_CALLBACK_BASE_URL=''):
+            self.assertEqual(self.verify().status_code, 404)
+            self.assertEqual(self.client.post(self.callback, b'', content_type='application/atom+xml').status_code, 404)
+
+    def test_signature_valid(self):
+        body = b'<feed/>'
+        signature = hmac.new(b'segredo', body, hashlib.sha1).hexdigest()
+
+        self.assertTrue(websub.signature_valid('segredo', body, f"sha1={signature}"))
+        self.assertTrue(websub.signature_valid('segredo', body, f"sha1={signature.upper()}"))
+        self.assertTrue(websub.signature_valid(
+            'segredo', body, "sha256=" + hmac.new(b'segredo', body, hashlib.sha256).hexdigest(),
+        ))
+        self.assertFalse(websub.signature_valid('outro', body, f"sha1={signature}"))
+        self.assertFalse(websub.signature_valid('segredo', b'<feed>alterado</feed>', f"sha1={signature}"))
+        self.assertFalse(websub.signature_valid('segredo', body, f"md5={signature}"))
+        self.assertFalse(websub.signature_valid('segredo', body, signature))
+        self.assertFalse(websub.signature_valid('segredo', body, None))
+        self.assertFalse(websub.signature_valid('', body, f"sha1={signature}"))
+
+    def publish(self, secret=None):
+        return self.hub.publish(self.topic, ATOM_NOTIFICATION.format(channel_id=YOUTUBE_CHANNEL_ID), self.send, secret=secret)
+
+    def test_push_with_bad_signature_is_ignored(self):
+        self.subscribe()
+        with mock.patch.object(views.process_channel, 'delay') as delay:
+            self.assertEqual(self.publish(secret='errado'), [202])
+        delay.assert_not_called()
+
+    def test_push_is_debounced(self):
+        self.subscribe()
+        with mock.patch.object(views.process_channel, 'delay') as delay:
+            self.assertEqual(self.publish(), [202])
+            self.assertEqual(self.publish(), [202])
+        delay.assert_called_once_with('YOUTUBE', YOUTUBE_CHANNEL_ID)
+
+    def test_push_while_check_is_queued_is_not_dispatched_again(self):
+        self.subscribe()
+        live_cache.claim_dispatches('YOUTUBE', [YOUTUBE_CHANNEL_ID])
+        with mock.patch.object(views.process_channel, 'delay') as delay:
+            self.assertEqual(self.publish(), [202])
+        delay.assert_not_called()
+
+
+def chunked(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+class YouTubeLiveScannerTests(SimpleTestCase):
+    """
+    O scanner precisa dar a mesma resposta qualquer que seja o corte dos pedaços.
+    """
+
+    PAGE = (
+        b'<html>' + b'x' * 100
+        + b'<title>Minha live - YouTube</title>'
+        + b'"thumbnailUrl":"https://i.ytimg.com/vi/abc/hq.jpg",'
+        + b'{"isLive":true}'
+        + b'var ytInitialData = {};' + b'y' * 1000
+    )
+    EXPECTED = (True, 'Minha live', 'https://i.ytimg.com/vi/abc/hq.jpg')
+
+    def test_every_two_chunk_split(self):
+        for split in range(1, len(self.PAGE)):
+            with self.subTest(split=split):
+                scanner = scan_chunks([self.PAGE[:split], self.PAGE[split:]])
+                self.assertEqual(scanner.result(), self.EXPECTED)
+
+    def test_single_byte_chunks(self):
+        scanner = scan_chunks(chunked(self.PAGE, 1))
+
+        self.assertEqual(scanner.result(), self.EXPECTED)
+        # Parou assim que teve marcador, título e thumbnail, sem ler o resto
+        self.assertEqual(scanner.bytes_read, self.PAGE.index(b'{"isLive":true}') + len(b'{"isLive":true'))
+
+    def test_stop_marker_split_between_chunks(self):
+        page = b'<title>Canal - YouTube</title>var ytInitialData = {};'
+        marker_end = page.index(b'var ytInitialData') + len(b'var ytInitialData')
+        for split in range(1, marker_end):
+            with self.subTest(split=split):
+                scanner = YouTubeLiveScanner()
+                self.assertFalse(scanner.feed(page[:split]))
+                self.assertTrue(scanner.feed(page[split:]))
+                self.assertEqual(scanner.result(), (False, "", None))
+
+    def test_fixture_pages(self):
+        live = (FIXTURES_DIR / "youtube_live.html").read_bytes()
+        offline = (FIXTURES_DIR / "youtube_offline.html").read_bytes()
+        expected = YouTubeLiveScanner()
+        expected.feed(live)
+
+        for size in (1024, 4096, 65536):
+            with self.subTest(size=size):
+                self.assertEqual(scan_chunks(chunked(live, size)).result(), expected.result())
+                scanner = scan_chunks(chunked(offline, size))
+                self.assertFalse(scanner.is_live)
+                self.assertLess(scanner.bytes_read, len(offline))
+        self.assertTrue(expected.is_live)
+        self.assertIsNotNone(expected.thumbnail)
+
+    def test_max_bytes(self):
+        scanner = scan_chunks(chunked(b'z' * 10000, 100), max_bytes=1000)
+
+        self.assertTrue(scanner.done)
+        self.assertEqual(scanner.bytes_read, 1000)
+        self.assertEqual(scanner.result(), (False, "", None))
+
+
+class SchedulingTests(SimpleTestCase):
+    NOW = datetime(2026, 10, 19, 10, 50, tzinfo=dt_timezone.utc)
+
+    def channel(self, identifier='canal', **fields):
+        fields.setdefault('created_at', self.NOW - timedelta(days=1))
+        fields.setdefault('poll_interval', 60)
+        return MonitoredChannel(platform='YOUTUBE', channel_identifier=identifier, **fields)
+
+    def assertAround(self, moment, target, interval):
+        """
+        `moment` é `target` deslocado pela fase do canal: no máximo meio intervalo.
+        """
+        offset = (moment - target).total_seconds()
+        self.assertGreaterEqual(offset, -interval / 2)
+        self.assertLess(offset, interval / 2)
+
+    def test_new_channel_uses_plan_interval(self):
+        for interval in (15, 60, 300):
+            with self.subTest(interval=interval):
+                channel = self.channel(poll_interval=interval)
+                next_check = compute_next_check(channel, self.NOW)
+                self.assertAround(next_check, self.NOW + timedelta(seconds=interval), interval)
+
+    def test_online_channel_is_checked_fast(self):
+        channel = self.channel(poll_interval=300, last_status='ONLINE')
+        interval = settings.LIVE_POLL_ONLINE_INTERVAL
+        self.assertAround(compute_next_check(channel, self.NOW), self.NOW + timedelta(seconds=interval), interval)
+
+    def test_idle_and_dormant_channels_back_off(self):
+        cases = (
+            (settings.LIVE_POLL_IDLE_AFTER_DAYS + 1, settings.LIVE_POLL_IDLE_FACTOR),
+            (settings.LIVE_POLL_DORMANT_AFTER_DAYS + 1, settings.LIVE_POLL_DORMANT_FACTOR),
+        )
+        for days, factor in cases:
+            with self.subTest(days=days):
+                # Sem live registrada conta desde quando o canal passou a ser monitorado
+                for fields in ({'last_live_at': self.NOW - timedelta(days=days)}, {'created_at': self.NOW - timedelta(days=days)}):
+                    interval = min(60 * factor, settings.LIVE_POLL_MAX_INTERVAL)
+                    next_check = compute_next_check(self.channel(**fields), self.NOW)
+                    self.assertAround(next_check, self.NOW + timedelta(seconds=interval), interval)
+
+    def test_hot_hour_uses_plan_interval(self):
+        hours = [0] * HOURS_PER_WEEK
+        hours[hour_of_week(self.NOW)] = 1
+        channel = self.channel(last_live_at=self.NOW - timedelta(days=60), live_start_hours=hours)
+
+        self.assertAround(compute_next_check(channel, self.NOW), self.NOW + timedelta(seconds=60), 60)
+
+    def test_back_off_stops_at_next_hot_window(self):
+        hours = [0] * HOURS_PER_WEEK
+        hours[hour_of_week(self.NOW) + 2] = 1
+        channel = self.channel(poll_interval=120, last_live_at=self.NOW - timedelta(days=60), live_start_hours=hours)
+
+        # Sem a janela das 12h (que começa a valer às 11h) o recuo seria de 1800 s
+        window_start = self.NOW.replace(hour=11, minute=0)
+        self.assertAround(compute_next_check(channel, self.NOW), window_start, 120)
+
+    def test_not_found_channel_is_rechecked_rarely(self):
+        channel = self.channel(not_found_at=self.NOW - timedelta(hours=1))
+        interval = settings.LIVE_POLL_NOT_FOUND_INTERVAL
+        self.assertAround(compute_next_check(channel, self.NOW), self.NOW + timedelta(seconds=interval), interval)
+
+    def test_spread_stays_within_half_interval(self):
+        for interval in (30, 60, 300, 3600):
+            for identifier in ('a', 'b', 'c', 'd'):
+                with self.subTest(interval=interval, identifier=identifier):
+                    target = self.NOW + timedelta(seconds=interval)
+                    self.assertAround(spread(self.channel(identifier), target, interval), target, interval)
+
+    def test_spread_keeps_channel_phase(self):
+        channel = self.channel()
+        first = spread(channel, self.NOW, 60)
+        for cycles in (1, 2, 7):
+            later = spread(channel, self.NOW + timedelta(seconds=60 * cycles + 5), 60)
+            self.assertAlmostEqual((later - first).total_seconds(), 60 * cycles, places=3)
+
+    def test_spread_distributes_channels(self):
+        buckets = Counter(
+            int(spread(self.channel(f"canal{number}"), self.NOW, 60).timestamp()) % 60 // 10
+            for number in range(1200)
+        )
+        self.assertEqual(set(buckets), set(range(6)))
+        for count in buckets.values():
+            self.assertTrue(120 < count < 280, buckets)
+
+    def test_websub_lease_uses_safety_net_interval(self):
+        channel = self.channel(websub_lease_expires_at=self.NOW + timedelta(days=1))
+        interval = settings.WEBSUB_SAFETY_NET_INTERVAL
+        self.assertAround(compute_next_check(channel, self.NOW), self.NOW + timedelta(seconds=interval), interval)
+
+
+class YouTubeResolverTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.stub = PlatformStub().start()
+        self.addCleanup(self.stub.stop)
+        self.stub.handles['@fulano'] = YOUTUBE_CHANNEL_ID
+        overrides = override_settings(YOUTUBE_BASE_URL=self.stub.base_url)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_parse_identifier(self):
+        cases = {
+            YOUTUBE_CHANNEL_ID: (YOUTUBE_CHANNEL_ID, None),
+            f'https://www.youtube.com/channel/{YOUTUBE_CHANNEL_ID}/live': (YOUTUBE_CHANNEL_ID, None),
+            'Fulano': (None, '@fulano'),
+            'https://www.youtube.com/@Fulano/streams': (None, '@fulano'),
+            'youtube.com/c/Fulano': (None, 'c/fulano'),
+            'https://www.youtube.com/watch?v=abc': (None, None),
+        }
+        for identifier, expected in cases.items():
+            with self.subTest(identifier=identifier):
+                self.assertEqual(parse_identifier(identifier), expected)
+
+    def test_alias_is_resolved_once(self):
+        self.assertIsNone(known_channel_id('@Fulano'))
+        self.assertEqual(resolve_channel_id('@Fulano'), YOUTUBE_CHANNEL_ID)
+        self.assertEqual(resolve_channel_id('https://youtube.com/@fulano'), YOUTUBE_CHANNEL_ID)
+        self.assertEqual(self.stub.counters['youtube_handle_requests'], 1)
+
+        # Sem cache, a tabela ainda responde sem ir ao YouTube
+        cache.clear()
+        self.assertEqual(known_channel_id('fulano'), YOUTUBE_CHANNEL_ID)
+        self.assertEqual(self.stub.counters['youtube_handle_requests'], 1)
+
+    def test_unknown_alias_is_cached_as_not_found(self):
+        for _ in range(2):
+            with self.assertRaises(ChannelNotFound):
+                resolve_channel_id('@sumido')
+        self.assertEqual(self.stub.counters['youtube_handle_requests'], 1)
+        self.assertFalse(YouTubeChannelAlias.objects.exists())
+
+
+class RenameChannelsTests(TestCase):
+    def setUp(self):
+        self.user = create_user()
+
+    def automation(self, identifier, user=None):
+        return Automation.objects.create(
+            name=identifier, user=user or self.user, platform='YOUTUBE', channel_identifier=identifier,
+            discord_webhook_url=WEBHOOK_URL,
+        )
+
+    def channels(self):
+        return dict(MonitoredChannel.objects.values_list('channel_identifier', 'is_active'))
+
+    def test_renames_channel_in_place(self):
+        automation = self.automation('@fulano')
+        MonitoredChannel.objects.update(not_found_at=timezone.now())
+
+        rename_channels('YOUTUBE', {'@fulano': YOUTUBE_CHANNEL_ID})
+
+        automation.refresh_from_db()
+        self.assertEqual(automation.channel_identifier, YOUTUBE_CHANNEL_ID)
+        channel = MonitoredChannel.objects.get()
+        self.assertEqual(channel.channel_identifier, YOUTUBE_CHANNEL_ID)
+        self.assertIsNone(channel.not_found_at)
+
+    def test_merges_into_existing_channel(self):
+        moved = self.automation('@fulano')
+        self.automation(YOUTUBE_CHANNEL_ID, user=create_user('outro'))
+
+        rename_channels('YOUTUBE', {'@fulano': YOUTUBE_CHANNEL_ID})
+
+        moved.refresh_from_db()
+        self.assertEqual((moved.channel_identifier, moved.is_active), (YOUTUBE_CHANNEL_ID, True))
+        # O canal antigo fica sem seguidores e sai do agendamento
+        self.assertEqual(self.channels(), {'@fulano': False, YOUTUBE_CHANNEL_ID: True})
+
+    def test_duplicate_is_deactivated_and_counted(self):
+        duplicate = self.automation('@fulano')
+        self.automation(YOUTUBE_CHANNEL_ID)
+        self.assertEqual(get_dashboard_stats(self.user.id)['active_automations'], 2)
+
+        rename_channels('YOUTUBE', {'@fulano': YOUTUBE_CHANNEL_ID})
+
+        duplicate.refresh_from_db()
+        self.assertEqual((duplicate.channel_identifier, duplicate.is_active), ('@fulano', False))
+        self.assertEqual(self.channels(), {'@fulano': False, YOUTUBE_CHANNEL_ID: True})
+        stats = get_dashboard_stats(self.user.id)
+        self.assertEqual((stats['total_automations'], stats['active_automations']), (2, 1))
+
+
+class EnforcePlanLimitsTests(TestCase):
+    def create_automations(self, user, count):
+        created_at = timezone.now() - timedelta(days=30)
+        automations = []
+        for number in range(count):
+            automation = Automation.objects.create(
+                name=f"{user.username} {number}", user=user, platform='TIKTOK',
+                channel_identifier=f"{user.username}{number}", discord_webhook_url=WEBHOOK_URL,
+            )
+            automations.append(automation)
+        # As duas primeiras empatam no created_at: o desempate é pelo id
+        for number, automation in enumerate(automations):
+            Automation.objects.filter(pk=automation.pk).update(created_at=created_at + timedelta(days=max(number, 1)))
+        return [automation.pk for automation in automations]
+
+    def suspended(self, ids):
+        return list(Automation.objects.filter(pk__in=ids, is_suspended=True).order_by('pk').values_list('pk', flat=True))
+
+    def test_suspends_newest_over_limit(self):
+        over = self.create_automations(create_user('cheio', max_automations=2), 5)
+        within = self.create_automations(create_user('folgado', max_automations=3), 3)
+
+        self.assertEqual(enforce_plan_limits(), (3, 0))
+
+        self.assertEqual(self.suspended(over), over[2:])
+        self.assertEqual(self.suspended(within), [])
+        # Mesma ordem a cada execução: nada muda na segunda
+        self.assertEqual(enforce_plan_limits(), (0, 0))
+        self.assertEqual(self.suspended(over), over[2:])
+
+    def test_restores_when_back_within_limit(self):
+        user = create_user('cheio', max_automations=2)
+        ids = self.create_automations(user, 4)
+        enforce_plan_limits()
+
+        Automation.objects.filter(pk=ids[0]).update(is_active=False)
+        self.assertEqual(enforce_plan_limits(), (0, 1))
+        self.assertEqual(self.suspended(ids), ids[3:])
+
+        user.profile.plan.max_automations = 10
+        user.profile.plan.save()
+        self.assertEqual(enforce_plan_limits(), (0, 1))
+        self.assertEqual(self.suspended(ids), [])
+
+    def test_expired_plan_is_not_ranked(self):
+        user = create_user('vencido', max_automations=1)
+        user.profile.plan_expires_at = timezone.now() - timedelta(days=1)
+        user.profile.save()
+        ids = self.create_automations(user, 3)
+
+        self.assertEqual(enforce_plan_limits(), (0, 0))
+        self.assertEqual(self.suspended(ids), [])
+
+
+def discord_response(status_code, body=None, headers=None):
+    response = mock.Mock(status_code=status_code, headers=headers or {})
+    if body is None:
+        response.json.side_effect = ValueError
+    else:
+        response.json.return_value = body
+    return response
+
+
+class ExecuteWebhookTests(RedisTestCase):
+    def execute(self, response=None, attempt=0, error=None):
+        with mock.patch('automations.delivery.DiscordWebhook.execute', return_value=response, side_effect=error):
+            return delivery.execute_webhook(WEBHOOK_URL, [], attempt)
+
+    def test_success(self):
+        outcome = self.execute(discord_response(204))
+        self.assertEqual(outcome.kind, delivery.DeliveryOutcome.SENT)
+
+    def test_client_error_is_final(self):
+        for status in (400, 401, 404):
+            with self.subTest(status=status):
+                outcome = self.execute(discord_response(status))
+                self.assertEqual(outcome.kind, delivery.DeliveryOutcome.FAILED)
+                self.assertEqual(outcome.detail, f"Discord retornou {status}")
+
+    def test_server_and_network_errors_are_retried_with_backoff(self):
+        delay = settings.DISCORD_RETRY_BASE_DELAY * 4
+        for outcome in (self.execute(discord_response(502), attempt=2), self.execute(error=ConnectionError("reset"), attempt=2)):
+            self.assertEqual(outcome.kind, delivery.DeliveryOutcome.RETRY)
+            self.assertTrue(delay * 0.8 <= outcome.delay <= delay * 1.2)
+
+    def test_rate_limit_blocks_webhook_bucket(self):
+        outcome = self.execute(discord_response(429, {'retry_after': 2.5, 'global': False}))
+
+        self.assertEqual(outcome.kind, delivery.DeliveryOutcome.RETRY)
+        self.assertEqual(outcome.delay, 2.5)
+        self.assertGreater(delivery.reserve_send(WEBHOOK_URL), 2)
+        self.assertEqual(delivery.reserve_send('https://discord.example/api/webhooks/2/token'), 0)
+
+    def test_global_rate_limit_blocks_every_webhook(self):
+        outcome = self.execute(discord_response(429, {'retry_after': 1, 'global': True}))
+
+        self.assertEqual(outcome.delay, 1)
+        self.assertGreater(delivery.reserve_send('https://discord.example/api/webhooks/2/token'), 0)
+
+    def test_rate_limit_reads_retry_after_header(self):
+        outcome = self.execute(discord_response(429, headers={'Retry-After': '3'}))
+
+        self.assertEqual(outcome.kind, delivery.DeliveryOutcome.RETRY)
+        self.assertEqual(outcome.delay, 3.0)
+
+
+@override_settings(
+    DISCORD_GLOBAL_BUCKET_CAPACITY=6,
+    DISCORD_GLOBAL_RATE=0.001,
+    DISCORD_WEBHOOK_BUCKET_CAPACITY=5,
+    DISCORD_WEBHOOK_RATE=0.001,
+)
+class ReserveSendTests(RedisTestCase):
+    OTHER_WEBHOOK_URL = 'https://discord.example/api/webhooks/2/token'
+
+    def test_webhook_bucket_limits_each_webhook(self):
+        for _ in range(5):
+            self.assertEqual(delivery.reserve_send(WEBHOOK_URL), 0)
+        self.assertGreater(delivery.reserve_send(WEBHOOK_URL), 0)
+
+    def test_waiting_on_webhook_does_not_spend_global_token(self):
+        for _ in range(5):
+            delivery.reserve_send(WEBHOOK_URL)
+        for _ in range(10):
+            self.assertGreater(delivery.reserve_send(WEBHOOK_URL), 0)
+
+        # Sobrou exatamente um token global para os outros webhooks
+        self.assertEqual(delivery.reserve_send(self.OTHER_WEBHOOK_URL), 0)
+        self.assertGreater(delivery.reserve_send(self.OTHER_WEBHOOK_URL), 0)
+
+    def test_waiting_on_global_does_not_spend_webhook_token(self):
+        delivery.block(delivery.GLOBAL_BUCKET, 60)
+        for _ in range(10):
+            self.assertGreater(delivery.reserve_send(WEBHOOK_URL), 50)
+
+        redis_client._client.delete(ratelimit._bucket_keys(delivery.GLOBAL_BUCKET)[1])
+        for _ in range(5):
+            self.assertEqual(delivery.reserve_send(WEBHOOK_URL), 0)
+
+
+@override_settings(LIVE_BACKPRESSURE_TARGET_SECONDS=0, LIVE_CHECK_BATCH_SIZE=2, LIVE_PLATFORM_BATCH_SIZE={})
+class SchedulerBeatTests(RedisTestCase):
+    """
+    Despacho do scheduler_beat com process_channels_batch.delay interceptado:
+    nenhum lote roda, só se olha o que foi para a fila.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+
+    def create_channels(self, count, platform='TIKTOK'):
+        # c000 é o mais atrasado
+        MonitoredChannel.objects.bulk_create([
+            MonitoredChannel(
+                platform=platform, channel_identifier=f'c{index:03}',
+                next_check_at=self.now - timedelta(seconds=count - index),
+            )
+            for index in range(count)
+        ])
+
+    def beat(self):
+        with mock.patch.object(process_channels_batch, 'delay') as delay:
+            summary = scheduler_beat()
+        return [identifier for call in delay.call_args_list for identifier in call.args[1]], summary
+
+    def next_checks(self):
+        return dict(MonitoredChannel.objects.values_list('channel_identifier', 'next_check_at'))
+
+    def test_channel_is_queued_once(self):
+        self.create_channels(3)
+
+        dispatched, _ = self.beat()
+        self.assertEqual(dispatched, ['c000', 'c001', 'c002'])
+        reserved_until = self.now + timedelta(seconds=settings.LIVE_SCHEDULER_CLAIM_SECONDS)
+        self.assertTrue(all(when >= reserved_until for when in self.next_checks().values()))
+
+        dispatched, summary = self.beat()
+        self.assertEqual((dispatched, summary), ([], "Nenhum canal para verificar."))
+
+    def test_claimed_channel_is_not_queued_or_rescheduled(self):
+        self.create_channels(3)
+        self.beat()
+
+        # Reserva do banco venceu com o lote ainda na fila: o canal fica de fora
+        # e o next_check_at que o worker gravar não é sobrescrito
+        MonitoredChannel.objects.update(next_check_at=self.now - timedelta(seconds=1))
+        live_cache.release_dispatches('TIKTOK', ['c002'])
+        dispatched, summary = self.beat()
+
+        self.assertEqual(dispatched, ['c002'])
+        self.assertIn("2 já estavam na fila", summary)
+        next_checks = self.next_checks()
+        self.assertEqual(next_checks['c000'], self.now - timedelta(seconds=1))
+        self.assertEqual(next_checks['c001'], self.now - timedelta(seconds=1))
+
+    def test_watched_channel_is_skipped(self):
+        self.create_channels(3)
+        live_cache.renew_watches('TIKTOK', ['c001'], 30)
+
+        dispatched, summary = self.beat()
+
+        self.assertEqual(dispatched, ['c000', 'c002'])
+        self.assertIn("1 acompanhados pelo watcher", summary)
+        # Fica reservado e volta a ser considerado quando a reserva vencer
+        self.assertGreater(self.next_checks()['c001'], self.now)
+        self.assertEqual(live_cache.claim_dispatches('TIKTOK', ['c001']), ['c001'])
+
+    @override_settings(LIVE_BACKPRESSURE_TARGET_SECONDS=60, LIVE_BACKPRESSURE_MIN_BATCHES=1)
+    def test_deferred_batches_release_their_claims(self):
+        self.create_channels(5)
+
+        dispatched, summary = self.beat()
+
+        # Orçamento de um lote (sem histórico de vazão): só o lote mais atrasado sai
+        self.assertEqual(dispatched, ['c000', 'c001'])
+        self.assertIn("3 adiados", summary)
+        deferred = ['c002', 'c003', 'c004']
+        self.assertEqual(live_cache.claim_dispatches('TIKTOK', deferred), deferred)
+        next_checks = self.next_checks()
+        self.assertTrue(all(next_checks[identifier] < self.now for identifier in deferred))
+
+    def test_full_queue_reads_no_channels(self):
+        self.create_channels(3)
+
+        with mock.patch('automations.tasks.backpressure.dispatch_budget', return_value=(0, 12, 0.5)), \
+                self.assertNumQueries(0):
+            dispatched, summary = self.beat()
+
+        self.assertEqual(dispatched, [])
+        self.assertEqual(summary, "Fila cheia (12 lotes, 0.50 lotes/s): nenhum canal despachado.")
+        self.assertEqual(live_cache.claim_dispatches('TIKTOK', ['c000']), ['c000'])
+
+    def test_budget_keeps_most_overdue_batches(self):
+        for identifier, platform, poll_interval, overdue in (
+            ('y0', 'YOUTUBE', 15, 100),
+            ('y1', 'YOUTUBE', 30, 200),
+            ('t0', 'TIKTOK', 60, 100),
+            ('t1', 'TIKTOK', 60, 100),
+            ('t2', 'TIKTOK', 60, 50),
+            ('t3', 'TIKTOK', 60, 50),
+        ):
+            MonitoredChannel.objects.create(
+                platform=platform, channel_identifier=identifier, poll_interval=poll_interval,
+                next_check_at=self.now - timedelta(seconds=overdue),
+            )
+
+        with mock.patch('automations.tasks.backpressure.dispatch_budget', return_value=(2, 0, 0.0)):
+            dispatched, summary = self.beat()
+
+        # O mais atrasado primeiro; no empate (y0 e t0/t1) vai a faixa mais rápida
+        self.assertEqual(dispatched, ['y1', 'y0'])
+        self.assertIn("4 adiados", summary)
+        exported = metrics.render_prometheus()
+        self.assertIn('scheduler_dispatched_channels_total{platform="YOUTUBE"} 2', exported)
+        self.assertIn('scheduler_deferred_channels_total{platform="TIKTOK"} 4', exported)
+        self.assertNotIn('scheduler_deferred_channels_total{platform="YOUTUBE"}', exported)
+
+    @override_settings(LIVE_SCHEDULER_CHUNK_SIZE=4)
+    def test_reads_all_chunks(self):
+        self.create_channels(10)
+
+        with mock.patch('automations.tasks._dispatch_chunk', wraps=_dispatch_chunk) as dispatch_chunk:
+            dispatched, summary = self.beat()
+
+        self.assertEqual([len(call.args[0]) for call in dispatch_chunk.call_args_list], [4, 4, 2])
+        self.assertEqual(dispatched, [f'c{index:03}' for index in range(10)])
+        self.assertTrue(summary.startswith("Verificando 10 canais"), summary)
+        # O atraso vem do primeiro pedaço: o canal mais atrasado (c000, 10 s)
+        lag = next(
+            float(line.split()[1]) for line in metrics.render_prometheus().splitlines()
+            if line.startswith('scheduler_lag_seconds ')
+        )
+        self.assertTrue(10 <= lag < 11, lag)
+
+    @override_settings(LIVE_SCHEDULER_CHUNK_SIZE=4, LIVE_SCHEDULER_MAX_DISPATCH=6)
+    def test_max_dispatch_caps_each_tick(self):
+        self.create_channels(10)
+
+        dispatched, _ = self.beat()
+        self.assertEqual(dispatched, [f'c{index:03}' for index in range(6)])
+
+        # O resto segue vencido e sai no próximo ciclo
+        dispatched, _ = self.beat()
+        self.assertEqual(dispatched, [f'c{index:03}' for index in range(6, 10)])
+
+
+class PendingAlertsTests(RedisTestCase):
+    def alert(self, number):
+        return {'automation_id': number, 'is_starting': True, 'title': f"Live {number}", 'thumbnail': None}
+
+    def test_first_alert_opens_window(self):
+        self.assertTrue(delivery.queue_alert(WEBHOOK_URL, self.alert(1), 2))
+        self.assertFalse(delivery.queue_alert(WEBHOOK_URL, self.alert(2), 2))
+
+    def test_pop_in_batches_and_release_window(self):
+        for number in range(12):
+            delivery.queue_alert(WEBHOOK_URL, self.alert(number), 2)
+
+        alerts, remaining = delivery.pop_pending_alerts(WEBHOOK_URL, 10)
+        self.assertEqual([alert['automation_id'] for alert in alerts], list(range(10)))
+        self.assertEqual(remaining, 2)
+        # Ainda há alertas: a janela continua aberta e um novo alerta não agenda outro flush
+        self.assertFalse(delivery.queue_alert(WEBHOOK_URL, self.alert(12), 2))
+
+        alerts, remaining = delivery.pop_pending_alerts(WEBHOOK_URL, 10)
+        self.assertEqual([alert['automation_id'] for alert in alerts], [10, 11, 12])
+        self.assertEqual(remaining, 0)
+        self.assertTrue(delivery.queue_alert(WEBHOOK_URL, self.alert(13), 2))
+
+    def test_pop_empty_queue(self):
+        self.assertEqual(delivery.pop_pending_alerts(WEBHOOK_URL, 10), ([], 0))
+
+    def test_webhooks_are_independent(self):
+        other = 'https://discord.example/api/webhooks/2/token'
+        delivery.queue_alert(WEBHOOK_URL, self.alert(1), 2)
+        self.assertTrue(delivery.queue_alert(other, self.alert(2), 2))
+
+        self.assertEqual(delivery.pop_pending_alerts(other, 10), ([self.alert(2)], 0))
+        self.assertEqual(delivery.pop_pending_alerts(WEBHOOK_URL, 10), ([self.alert(1)], 0))
+
+
+class PersistChannelResultsTests(TestCase):
+    def setUp(self):
+        user = create_user()
+        expired = create_user('expirado')
+        expired.profile.plan_expires_at = timezone.now() - timedelta(days=1)
+        expired.profile.save()
+
+        self.automations = {}
+        cases = (
+            ('starting', user, 'OFFLINE', WEBHOOK_URL),
+            ('ending', user, 'ONLINE', WEBHOOK_URL),
+            ('unknown', user, 'ONLINE', WEBHOOK_URL),
+            ('no_webhook', user, 'OFFLINE', ''),
+            ('expired', expired, 'OFFLINE', WEBHOOK_URL),
+        )
+        for name, owner, status, webhook_url in cases:
+            self.automations[name] = Automation.objects.create(
+                name=name, user=owner, platform='YOUTUBE', channel_identifier=name,
+                discord_webhook_url=webhook_url, last_status=status,
+            )
+        MonitoredChannel.objects.filter(channel_identifier__in=['ending', 'unknown']).update(last_status='ONLINE')
+
+    def test_transitions(self):
+        now = timezone.now()
+        results = {
+            'starting': (True, 'Começou', 'https://i.ytimg.com/thumb.jpg'),
+            'ending': (False, "", None),
+            'unknown': (None, "", None),
+            'no_webhook': (True, 'Sem webhook', None),
+            'expired': (True, 'Plano vencido', None),
+        }
+        with mock.patch('automations.tasks.queue_discord_alert') as queue, self.captureOnCommitCallbacks(execute=True):
+            automations, changed, alerts = persist_channel_results('YOUTUBE', results, now)
+
+        statuses = dict(Automation.objects.values_list('name', 'last_status'))
+        self.assertEqual(statuses, {
+            'starting': 'ONLINE', 'ending': 'OFFLINE', 'unknown': 'ONLINE', 'no_webhook': 'ONLINE', 'expired': 'OFFLINE',
+        })
+        self.assertEqual({automation.name for automation in changed}, {'starting', 'ending', 'no_webhook'})
+        self.assertEqual(
+            sorted((automation.name, is_starting) for automation, is_starting, _, _ in alerts),
+            [('ending', False), ('no_webhook', True), ('starting', True)],
+        )
+
+        # Só as automações com webhook vão para a fila, depois do commit
+        queued = sorted((call.args[0].name, call.args[1], call.args[2]) for call in queue.call_args_list)
+        self.assertEqual(queued, [('ending', False, ""), ('starting', True, 'Começou')])
+        log = NotificationLog.objects.get()
+        self.assertEqual((log.automation.name, log.status, log.event), ('no_webhook', 'FAILURE', 'STARTED'))
+
+        channels = {channel.channel_identifier: channel for channel in MonitoredChannel.objects.all()}
+        self.assertEqual(channels['starting'].last_status, 'ONLINE')
+        self.assertEqual(channels['starting'].last_live_at, now)
+        self.assertEqual(channels['ending'].last_status, 'OFFLINE')
+        # Sem resposta: mantém o status e só reagenda
+        self.assertEqual(channels['unknown'].last_status, 'ONLINE')
+        self.assertIsNone(channels['unknown'].last_checked_at)
+        self.assertGreater(channels['unknown'].next_check_at, now)
+        # Canal sem automação com plano válido sai do agendamento
+        self.assertFalse(channels['expired'].is_active)
+        self.assertTrue(channels['starting'].is_active)
+
+    def test_dry_run_writes_nothing(self):
+        with mock.patch('automations.tasks.queue_discord_alert') as queue, self.captureOnCommitCallbacks(execute=True):
+            _, changed, alerts = persist_channel_results('YOUTUBE', {'starting': (True, 'Começou', None)}, timezone.now(), dry_run=True)
+
+        self.assertEqual([automation.name for automation in changed], ['starting'])
+        self.assertEqual(len(alerts), 1)
+        queue.assert_not_called()
+        self.assertEqual(Automation.objects.get(name='starting').last_status, 'OFFLINE')
+
+
+class CheckListCommandTests(RedisTestCase):
+    def setUp(self):
+        super().setUp()
+        streamer = create_user()
+        other = create_user('outro')
+        for name, owner, platform in (('tk', streamer, 'TIKTOK'), ('yt', streamer, 'YOUTUBE'), ('yt2', other, 'YOUTUBE')):
+            Automation.objects.create(
+                name=name, user=owner, platform=platform, channel_identifier=name,
+                discord_webhook_url=WEBHOOK_URL, last_status='OFFLINE',
+            )
+        self.user_id = streamer.id
+        self.next_checks = dict(MonitoredChannel.objects.values_list('channel_identifier', 'next_check_at'))
+
+    def run_command(self, **options):
+        out = StringIO()
+
+        def all_live(platform, identifiers, **kwargs):
+            return {identifier: (True, 'Ao vivo', None) for identifier in identifiers}
+
+        with mock.patch('automations.management.commands.check_list.check_channels', side_effect=all_live) as check, \
+                mock.patch('automations.tasks.queue_discord_alert') as queue, \
+                self.captureOnCommitCallbacks(execute=True):
+            call_command('check_list', stdout=out, **options)
+        checked = sorted((call.args[0], identifier) for call in check.call_args_list for identifier in call.args[1])
+        return out.getvalue(), checked, queue
+
+    def test_filters_by_platform_and_user(self):
+        _, checked, _ = self.run_command(platform='YOUTUBE')
+        self.assertEqual(checked, [('YOUTUBE', 'yt'), ('YOUTUBE', 'yt2')])
+
+        _, checked, _ = self.run_command(user='streamer')
+        self.assertEqual(checked, [('TIKTOK', 'tk'), ('YOUTUBE', 'yt')])
+
+        _, checked, _ = self.run_command(platform='YOUTUBE', user=str(self.user_id))
+        self.assertEqual(checked, [('YOUTUBE', 'yt')])
+
+        output, checked, _ = self.run_command(user='ninguem')
+        self.assertEqual(checked, [])
+        self.assertIn("Nenhuma automação ativa encontrada", output)
+
+    def test_dry_run_writes_nothing(self):
+        output, checked, queue = self.run_command(dry_run=True)
+
+        self.assertEqual(len(checked), 3)
+        queue.assert_not_called()
+        self.assertEqual(set(Automation.objects.values_list('last_status', flat=True)), {'OFFLINE'})
+        self.assertEqual(dict(MonitoredChannel.objects.values_list('channel_identifier', 'next_check_at')), self.next_checks)
+        self.assertIn("Modo simulação", output)
+        self.assertIn("Alertas (simulados): 3", output)
+
+    def test_summary(self):
+        output, _, queue = self.run_command()
+
+        self.assertEqual(queue.call_count, 3)
+        self.assertEqual(set(Automation.objects.values_list('last_status', flat=True)), {'ONLINE'})
+        self.assertIn("3 canais (3 automações)", output)
+        self.assertIn("Ao vivo: 3  Mudanças: 3", output)
+        self.assertIn("Alertas enfileirados: 3", output)
+        self.assertIn("Falhas nas verificações: 0", output)
+        self.assertEqual(output.count("ONLINE 🔴"), 3)
+
+        # Sem mudança, --only-changed não lista nenhuma automação
+        output, _, queue = self.run_command(only_changed=True)
+        queue.assert_not_called()
+        self.assertIn("Ao vivo: 3  Mudanças: 0", output)
+        self.assertNotIn("Checking:", output)
+
+
+class MetricsViewTests(RedisTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('metrics')
+
+    @override_settings(METRICS_TOKEN='')
+    def test_without_token_only_staff(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, headers={'Authorization': 'Bearer '}).status_code, 403)
+
+        self.client.force_login(User.objects.create(username='comum'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.force_login(User.objects.create(username='admin', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='segredo')
+    def test_with_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, headers={'Authorization': 'Bearer errado'}).status_code, 403)
+        self.assertEqual(self.client.get(self.url, headers={'Authorization': 'Bearer segredo'}).status_code, 200)
+
+
+@override_settings(
+    LIVE_BREAKER_MIN_REQUESTS=4,
+    LIVE_BREAKER_ERROR_THRESHOLD=0.5,
+    LIVE_BREAKER_WINDOW=60,
+    LIVE_BREAKER_OPEN_SECONDS=30,
+    LIVE_BREAKER_HALF_OPEN_PROBES=2,
+)
+class BreakerTests(RedisTestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = 1_800_000_000.0
+        patcher = mock.patch('automations.breaker.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open_circuit(self):
+        self.assertEqual(breaker.record('YOUTUBE', 1, 3), 'opened')
+
+    def test_stays_closed_below_minimum_requests(self):
+        self.assertEqual(breaker.record('YOUTUBE', 0, 3), 'closed')
+        self.assertEqual(breaker.allow('YOUTUBE'), breaker.ALLOW)
+        self.assertIsNone(breaker.record('YOUTUBE', 0, 0))
+
+    def test_stays_closed_below_error_threshold(self):
+        self.assertEqual(breaker.record('YOUTUBE', 3, 2), 'closed')
+        self.assertEqual(breaker.state('YOUTUBE'), breaker.CLOSED)
+
+    def test_opens_at_error_threshold(self):
+        self.assertEqual(breaker.record('YOUTUBE', 1, 1), 'closed')
+        self.assertEqual(breaker.record('YOUTUBE', 1, 1), 'opened')
+
+        self.assertEqual(breaker.state('YOUTUBE'), breaker.OPEN)
+        self.assertEqual(breaker.allow('YOUTUBE'), breaker.DENY)
+        # Cada plataforma tem o seu circuito
+        self.assertEqual(breaker.allow('TIKTOK'), breaker.ALLOW)
+
+    def test_half_open_allows_limited_probes(self):
+        self.open_circuit()
+        self.now += 31
+
+        self.assertEqual(breaker.allow('YOUTUBE'), breaker.PROBE)
+        self.assertEqual(breaker.state('YOUTUBE'), breaker.HALF_OPEN)
+        self.assertEqual(breaker.allow('YOUTUBE'), breaker.PROBE)
+        self.assertEqual(breaker.allow('YOUTUBE'), breaker.DENY)
+
+        # Sondas que nunca reportaram são liberadas de novo
+        self.now += 31
+        self.assertEqual(breaker.allow('YOUTUBE'), breaker.PROBE)
+
+    def test_probe_failure_reopens(self):
+        self.open_circuit()
+        self.now += 31
+        breaker.allow('YOUTUBE')
+
+        self.assertEqual(breaker.record('YOUTUBE', 0, 1), 'opened')
+        self.assertEqual(breaker.allow('YOUTUBE'), breaker.DENY)
+
+    def test_probe_success_closes(self):
+        self.open_circuit()
+        self.now += 31
+        breaker.allow('YOUTUBE')
+
+        self.assertEqual(breaker.record('YOUTUBE', 1, 0), 'closed')
+        self.assertEqual(breaker.state('YOUTUBE'), breaker.CLOSED)
+        self.assertEqual(breaker.allow('YOUTUBE'), breaker.ALLOW)
+        # A janela de erros recomeça do zero depois de fechar
+        self.assertEqual(breaker.record('YOUTUBE', 0, 3), 'closed')
+
+
+@override_settings(LIVE_STATUS_LOCK_TIMEOUT=0.3, LIVE_STATUS_WAIT_INTERVAL=0.02)
+class CachedCheckManyTests(RedisTestCase):
+    def slow_check(self, seconds, calls):
+        def check(identifiers):
+            calls.append(list(identifiers))
+            time.sleep(seconds)
+            return {identifier: (True, f"Live {identifier}", None) for identifier in identifiers}
+        return check
+
+    def test_lock_outlives_timeout_while_batch_runs(self):
+        calls = []
+
+        def check(identifiers):
+            time.sleep(1)
+            # Bem depois do LIVE_STATUS_LOCK_TIMEOUT outro worker ainda não pode assumir o canal
+            self.assertEqual(live_cache.acquire_locks('TIKTOK', identifiers), {})
+            return self.slow_check(0, calls)(identifiers)
+
+        results = live_cache.cached_check_many('TIKTOK', ['ana', 'bia'], check)
+
+        self.assertEqual(results['ana'], (True, "Live ana", None))
+        self.assertEqual(calls, [['ana', 'bia']])
+        # Terminou: os locks foram liberados
+        self.assertEqual(set(live_cache.acquire_locks('TIKTOK', ['ana', 'bia'])), {'ana', 'bia'})
+
+    def test_waiting_worker_shares_result_of_long_batch(self):
+        owner_calls, waiter_calls = [], []
+        owner = threading.Thread(
+            target=live_cache.cached_check_many, args=('TIKTOK', ['ana'], self.slow_check(1, owner_calls)),
+        )
+        owner.start()
+        time.sleep(0.1)
+
+        results = live_cache.cached_check_many('TIKTOK', ['ana'], self.slow_check(0, waiter_calls))
+        owner.join()
+
+        self.assertEqual(results, {'ana': (True, "Live ana", None)})
+        self.assertEqual(owner_calls, [['ana']])
+        self.assertEqual(waiter_calls, [])
+
+    def test_waiting_worker_checks_when_owner_is_gone(self):
+        # Dono que morreu no meio: o lock não é renovado e expira
+        live_cache.acquire_locks('TIKTOK', ['ana'])
+        calls = []
+
+        results = live_cache.cached_check_many('TIKTOK', ['ana'], self.slow_check(0, calls))
+
+        self.assertEqual(results, {'ana': (True, "Live ana", None)})
+        self.assertEqual(calls, [['ana']])
+
+
+@override_settings(NOTIFICATION_LOG_RETENTION_DAYS=30, NOTIFICATION_LOG_RETENTION_MODE='archive', NOTIFICATION_LOG_RETENTION_BATCH=2)
+class PurgeNotificationLogsTests(TestCase):
+    def test_archives_expired_logs_with_short_details(self):
+        automation = Automation.objects.create(
+            name='canal', user=create_user(), platform='TIKTOK', channel_identifier='canal',
+            discord_webhook_url=WEBHOOK_URL,
+        )
+        now = timezone.now()
+        logs = NotificationLog.objects.bulk_create([
+            NotificationLog(automation=automation, status='FAILURE', event='STARTED', details='x' * 5000),
+            NotificationLog(automation=automation, status='SUCCESS', event='ENDED', details='Enviado com sucesso'),
+            NotificationLog(automation=automation, status='SUCCESS', event='STARTED', details='Enviado com sucesso'),
+        ])
+        NotificationLog.objects.filter(id__in=[log.id for log in logs[:2]]).update(timestamp=now - timedelta(days=31))
+
+        self.assertEqual(purge_notification_logs(now), (2, 2))
+
+        self.assertEqual(list(NotificationLog.objects.values_list('id', flat=True)), [logs[2].id])
+        archived = dict(NotificationLogArchive.objects.values_list('status', 'details'))
+        self.assertEqual(archived['FAILURE'], 'x' * NotificationLogArchive.DETAILS_MAX_LENGTH)
+        self.assertEqual(archived['SUCCESS'], 'Enviado com sucesso')
+
+    def test_purge_keeps_dashboard_counter_in_sync(self):
+        user = create_user()
+        automation = Automation.objects.create(
+            name='canal', user=user, platform='TIKTOK', channel_identifier='canal',
+            discord_webhook_url=WEBHOOK_URL,
+        )
+        now = timezone.now()
+        logs = NotificationLog.objects.bulk_create([
+            NotificationLog(automation=automation, status='SUCCESS', event='STARTED'),
+            NotificationLog(automation=automation, status='SUCCESS', event='ENDED'),
+            NotificationLog(automation=automation, status='FAILURE', event='STARTED'),
+        ])
+        count_successful_logs(logs)
+        self.assertEqual(UserStats.objects.get(user=user).successful_notifications, 2)
+        NotificationLog.objects.filter(id__in=[logs[0].id, logs[2].id]).update(timestamp=now - timedelta(days=31))
+
+        purge_notification_logs(now)
+
+        # O incremental e o recálculo contam a mesma coisa: os logs que ficaram
+        self.assertEqual(UserStats.objects.get(user=user).successful_notifications, 1)
+        self.assertEqual(recompute_user_stats(user.id).successful_notifications, 1)
+
+
+class ProfileSavedTests(TestCase):
+    def setUp(self):
+        self.user = create_user()
+        Automation.objects.create(
+            name='canal', user=self.user, platform='TIKTOK', channel_identifier='canal',
+            discord_webhook_url=WEBHOOK_URL,
+        )
+
+    def test_login_does_not_refresh_channels(self):
+        user = User.objects.get(pk=self.user.pk)
+        with mock.patch('automations.signals.refresh_channel') as refresh:
+            user.last_login = timezone.now()
+            user.save(update_fields=['last_login'])
+            user.save()
+        refresh.assert_not_called()
+
+    def test_plan_change_refreshes_channels(self):
+        profile = User.objects.get(pk=self.user.pk).profile
+        with mock.patch('automations.signals.refresh_channel') as refresh:
+            profile.plan = Plan.objects.create(name='Pro', max_automations=50, poll_interval_seconds=15)
+            profile.save()
+            # Salvar de novo sem mudança não refaz o agendamento
+            profile.save()
+        refresh.assert_called_once_with('TIKTOK', 'canal')
+
+        with mock.patch('automations.signals.refresh_channel', wraps=refresh_channel) as refresh:
+            profile.plan_expires_at = timezone.now() - timedelta(days=1)
+            profile.save()
+        refresh.assert_called_once_with('TIKTOK', 'canal')
+
+        channel = MonitoredChannel.objects.get(platform='TIKTOK', channel_identifier='canal')
+        self.assertFalse(channel.is_active)
+
+
+class AutomationSavedTests(TestCase):
+    def setUp(self):
+        self.automation = Automation.objects.create(
+            name='canal', user=create_user(), platform='TIKTOK', channel_identifier='canal',
+            discord_webhook_url=WEBHOOK_URL,
+        )
+
+    def test_status_update_skips_channel_refresh(self):
+        with mock.patch('automations.signals.refresh_channel') as refresh, \
+                mock.patch('automations.signals.refresh_automation_counts') as counts:
+            self.automation.last_status = 'ONLINE'
+            self.automation.save(update_fields=['last_status'])
+        refresh.assert_not_called()
+        counts.assert_not_called()
+
+    def test_other_saves_refresh_channel(self):
+        with mock.patch('automations.signals.refresh_channel') as refresh:
+            self.automation.name = 'outro nome'
+            self.automation.save()
+            self.automation.save(update_fields=['last_status', 'is_active'])
+        self.assertEqual(refresh.call_count, 2)
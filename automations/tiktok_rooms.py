@@ -0,0 +1,35 @@
+import json
+
+from django.conf import settings
+
+from app.redis_client import get_redis
+
+
+def _room_key(username):
+    return f"tiktok:room:{username.replace('@', '')}"
+
+
+def get_rooms(usernames):
+    """
+    Salas em cache: {usuário: {'room_id', 'title', 'cover'}} só para quem tem.
+    """
+    usernames = list(usernames)
+    if not usernames:
+        return {}
+    values = get_redis().mget([_room_key(username) for username in usernames])
+    return {username: json.loads(value) for username, value in zip(usernames, values) if value}
+
+
+def store_room(username, room_id, title, cover):
+    """
+    Guarda a sala de uma live em andamento por TIKTOK_ROOM_CACHE_TTL. Só salas
+    ao vivo entram: a próxima live do usuário abre outra sala.
+    """
+    payload = json.dumps({'room_id': str(room_id), 'title': title, 'cover': cover})
+    get_redis().set(_room_key(username), payload, ex=int(settings.TIKTOK_ROOM_CACHE_TTL))
+
+
+def forget_rooms(usernames):
+    usernames = list(usernames)
+    if usernames:
+        get_redis().delete(*[_room_key(username) for username in usernames])
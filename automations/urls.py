@@ -8,4 +8,7 @@ urlpatterns = [
     path('automations/new/', views.AutomationCreateView.as_view(), name='automation_create'),
     path('automations/<int:pk>/edit/', views.AutomationUpdateView.as_view(), name='automation_update'),
     path('automations/<int:pk>/delete/', views.AutomationDeleteView.as_view(), name='automation_delete'),
+
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('websub/youtube/<int:channel_id>/', views.websub_callback, name='websub_callback'),
 ]
\ No newline at end of file
@@ -1,9 +1,21 @@
-from django.shortcuts import render
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView
 from django.utils import timezone
-from .models import Automation, NotificationLog
+from .models import Automation, MonitoredChannel, NotificationLog
+from . import metrics
+from .live_cache import claim_dispatches, invalidate
+from .metrics import render_prometheus
+from .tasks import process_channel
+from .websub import claim_push, enabled as websub_enabled, signature_valid, verify_intent
+from .stats import get_dashboard_stats
 from .forms import AutomationForm
 
 class AutomationListView(LoginRequiredMixin, ListView):
@@ -82,22 +94,62 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        total_automations = Automation.objects.filter(user=user).count()
-        active_automations = Automation.objects.filter(user=user, is_active=True).count()
-        
-        total_notifications = NotificationLog.objects.filter(
-            automation__user=user, 
-            status='SUCCESS'
-        ).count()
+        # Contadores denormalizados (UserStats) com cache curto: não dependem do tamanho do histórico
+        stats = get_dashboard_stats(user.id)
         
         recent_logs = NotificationLog.objects.filter(
             automation__user=user
-        ).order_by('-timestamp')[:5]
-
-        context.update({
-            'total_automations': total_automations,
-            'active_automations': active_automations,
-            'total_notifications': total_notifications,
-            'recent_logs': recent_logs
-        })
+        ).select_related('automation').order_by('-timestamp')[:5]
+
+        context.update(stats)
+        context['recent_logs'] = recent_logs
         return context
+
+def metrics_view(request):
+    """
+    Métricas agregadas de todos os workers no formato texto do Prometheus.
+    Aceita o header "Authorization: Bearer <METRICS_TOKEN>" ou um usuário staff
+    logado; sem METRICS_TOKEN definido, só staff.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    has_token = bool(token) and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+    if not has_token and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def websub_callback(request, channel_id):
+    """
+    Callback do hub WebSub para um canal do YouTube: GET confirma a inscrição,
+    POST é um aviso de vídeo novo/atualizado e dispara uma verificação imediata.
+    """
+    if not websub_enabled():
+        return HttpResponseNotFound()
+    channel = get_object_or_404(MonitoredChannel, pk=channel_id, platform=Automation.PlatformChoices.YOUTUBE)
+
+    if request.method == 'GET':
+        challenge = verify_intent(channel, request.GET)
+        if challenge is None:
+            return HttpResponseNotFound()
+        return HttpResponse(challenge, content_type='text/plain')
+
+    # Pela especificação, aviso com assinatura inválida recebe 2xx mesmo assim e é ignorado
+    if not signature_valid(channel.websub_secret, request.body, request.headers.get('X-Hub-Signature')):
+        metrics.inc('websub_notifications_total', result='invalid_signature')
+        return HttpResponse(status=202)
+
+    if not channel.is_active or not claim_push(channel):
+        metrics.inc('websub_notifications_total', result='ignored')
+        return HttpResponse(status=202)
+
+    # Sem cache: a verificação que já estiver na fila também enxerga o vídeo novo
+    invalidate(channel.platform, [channel.channel_identifier])
+    if not claim_dispatches(channel.platform, [channel.channel_identifier]):
+        metrics.inc('websub_notifications_total', result='already_queued')
+        return HttpResponse(status=202)
+
+    metrics.inc('websub_notifications_total', result='dispatched')
+    process_channel.delay(channel.platform, channel.channel_identifier)
+    return HttpResponse(status=202)
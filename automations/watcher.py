@@ -0,0 +1,177 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from TikTokLive import TikTokLiveClient
+from TikTokLive.client.errors import UserOfflineError
+from TikTokLive.events import ConnectEvent, DisconnectEvent, LiveEndEvent
+
+from .live_cache import release_watch, renew_watches, store
+from .models import MonitoredChannel
+from .providers import get_provider
+from .tasks import persist_channel_results
+
+logger = logging.getLogger(__name__)
+
+PLATFORM = 'TIKTOK'
+OFFLINE_RESULT = (False, "", None)
+
+# Como terminou uma conexão com a sala
+ENDED = 'ended'
+DROPPED = 'dropped'
+
+
+def online_channels():
+    """
+    Canais do TikTok que estão ao vivo segundo a última verificação.
+    """
+    return set(
+        MonitoredChannel.objects.filter(platform=PLATFORM, is_active=True, last_status='ONLINE')
+        .values_list('channel_identifier', flat=True)
+    )
+
+
+def end_live(channel_identifier):
+    """
+    Aplica a transição para OFFLINE na hora: grava no cache compartilhado
+    (para nenhuma verificação em andamento devolver o ONLINE antigo) e nas
+    automações/canal, com os alertas de encerramento.
+    """
+    results = {channel_identifier: OFFLINE_RESULT}
+    store(PLATFORM, results)
+    _, changed, _ = persist_channel_results(PLATFORM, results, timezone.now())
+    return len(changed)
+
+
+def confirm_live(channel_identifier):
+    """
+    Uma verificação normal pelo provider, para quando a conexão cai sem LiveEndEvent.
+    """
+    return get_provider(PLATFORM).check_many([channel_identifier])[channel_identifier][0]
+
+
+class TikTokLiveWatcher:
+    """
+    Mantém uma conexão TikTokLiveClient aberta para cada canal ONLINE e aplica o
+    OFFLINE assim que a live termina, sem esperar o próximo ciclo de polling.
+    Os canais acompanhados ganham uma marca no Redis que tira eles do scheduler.
+
+    `client_factory(unique_id)` cria o cliente (padrão TikTokLiveClient); os
+    testes usam um stand-in local com a mesma interface (on, start, disconnect).
+    """
+
+    def __init__(self, client_factory=TikTokLiveClient, max_connections=None,
+                 refresh_interval=None, lease_seconds=None, retry_seconds=None):
+        self.client_factory = client_factory
+        self.max_connections = max_connections or settings.TIKTOK_WATCHER_MAX_CONNECTIONS
+        self.refresh_interval = refresh_interval or settings.TIKTOK_WATCHER_REFRESH_SECONDS
+        self.lease_seconds = lease_seconds or settings.TIKTOK_WATCHER_LEASE_SECONDS
+        self.retry_seconds = retry_seconds or settings.TIKTOK_WATCHER_RETRY_SECONDS
+        self.tasks = {}
+        self.connected = set()
+        self.stopping = asyncio.Event()
+
+    async def run(self):
+        """
+        Loop principal: a cada refresh_interval reconcilia as conexões com os
+        canais ONLINE e renova as marcas das conexões abertas. Roda até stop().
+        """
+        logger.info("Watcher do TikTok iniciado")
+        try:
+            while not self.stopping.is_set():
+                await self.refresh()
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.refresh_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.shutdown()
+
+    def stop(self):
+        self.stopping.set()
+
+    async def refresh(self):
+        online = await sync_to_async(online_channels)()
+
+        for identifier in list(self.tasks):
+            if identifier not in online:
+                self.tasks.pop(identifier).cancel()
+
+        for identifier in sorted(online - set(self.tasks)):
+            if len(self.tasks) >= self.max_connections:
+                logger.warning(f"Watcher do TikTok no limite de {self.max_connections} conexões; o resto segue no polling")
+                break
+            self.tasks[identifier] = asyncio.create_task(self.watch(identifier))
+
+        await sync_to_async(renew_watches)(PLATFORM, list(self.connected), self.lease_seconds)
+
+    async def shutdown(self):
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks.clear()
+
+    async def watch(self, channel_identifier):
+        """
+        Acompanha um canal até a live terminar; reconecta enquanto ele seguir ao vivo.
+        """
+        try:
+            while True:
+                outcome = await self.connect(channel_identifier)
+                if outcome == DROPPED:
+                    # Conexão caiu sem aviso de fim: confirma antes de mudar o status
+                    is_live = await sync_to_async(confirm_live)(channel_identifier)
+                    if is_live is False:
+                        outcome = ENDED
+
+                if outcome == ENDED:
+                    changed = await sync_to_async(end_live)(channel_identifier)
+                    logger.info(f"Live de '{channel_identifier}' terminou ({changed} automações atualizadas)")
+                    return
+
+                await asyncio.sleep(self.retry_seconds)
+        finally:
+            if self.tasks.get(channel_identifier) is asyncio.current_task():
+                del self.tasks[channel_identifier]
+
+    async def connect(self, channel_identifier):
+        """
+        Uma conexão com a sala; retorna ENDED (a live acabou) ou DROPPED.
+        """
+        client = self.client_factory(channel_identifier.replace("@", ""))
+        ended = asyncio.Event()
+
+        async def on_connect(event):
+            self.connected.add(channel_identifier)
+            await sync_to_async(renew_watches)(PLATFORM, [channel_identifier], self.lease_seconds)
+
+        def on_live_end(event):
+            ended.set()
+
+        def on_disconnect(event):
+            self.connected.discard(channel_identifier)
+
+        client.on(ConnectEvent, on_connect)
+        client.on(LiveEndEvent, on_live_end)
+        client.on(DisconnectEvent, on_disconnect)
+
+        try:
+            task = await client.start(fetch_room_info=False, fetch_gift_info=False)
+            # Ao cancelar o watcher, quem encerra o loop do cliente é o disconnect abaixo
+            await asyncio.shield(task)
+        except UserOfflineError:
+            return ENDED
+        except Exception as e:
+            logger.warning(f"Conexão com a live de '{channel_identifier}' falhou: {e}")
+        finally:
+            self.connected.discard(channel_identifier)
+            await sync_to_async(release_watch)(PLATFORM, channel_identifier)
+            try:
+                await client.disconnect(close_client=True)
+            except Exception:
+                logger.debug(f"Erro ao fechar o cliente de '{channel_identifier}'", exc_info=True)
+
+        return ENDED if ended.is_set() else DROPPED
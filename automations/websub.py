@@ -0,0 +1,203 @@
+"""
+Inscrição WebSub (PubSubHubbub) nos feeds dos canais do YouTube.
+
+O hub chama a view websub_callback: GET para confirmar a inscrição (ecoando
+hub.challenge) e POST a cada vídeo novo ou atualizado, assinado com HMAC do
+segredo de cada canal. O push dispara uma verificação imediata do canal; o
+polling dos canais inscritos vira só uma rede de segurança lenta.
+"""
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from app.redis_client import get_redis
+
+from .models import Automation, MonitoredChannel
+from .youtube_resolver import known_channel_id
+
+logger = logging.getLogger(__name__)
+
+FEED_URL = "https://www.youtube.com/xml/feeds/videos.xml?channel_id={}"
+
+# Algoritmos aceitos no header X-Hub-Signature ("sha1=<hex>"; o hub do YouTube usa sha1)
+SIGNATURE_ALGORITHMS = ('sha1', 'sha256', 'sha384', 'sha512')
+
+
+def enabled():
+    return bool(settings.WEBSUB_CALLBACK_BASE_URL)
+
+
+def topic_url(channel_identifier):
+    """
+    Tópico do feed do canal; None se o identificador for um alias ainda não resolvido.
+    """
+    channel_id = known_channel_id(channel_identifier)
+    return FEED_URL.format(channel_id) if channel_id else None
+
+
+def callback_url(channel):
+    return settings.WEBSUB_CALLBACK_BASE_URL.rstrip('/') + reverse('websub_callback', args=[channel.pk])
+
+
+def has_lease(channel, now=None):
+    """
+    Indica se o hub confirmou uma inscrição que ainda está valendo.
+    """
+    now = now or timezone.now()
+    return bool(channel.websub_lease_expires_at and channel.websub_lease_expires_at > now)
+
+
+def request_subscription(channel, mode='subscribe'):
+    """
+    Pede ao hub para inscrever (ou desinscrever) o callback do canal.
+    A confirmação chega depois, no GET do callback. Retorna True se o hub aceitou o pedido.
+    """
+    data = {
+        'hub.callback': callback_url(channel),
+        'hub.topic': topic_url(channel.channel_identifier),
+        'hub.mode': mode,
+        'hub.verify': 'async',
+    }
+    if mode == 'subscribe':
+        data['hub.secret'] = channel.websub_secret
+        data['hub.lease_seconds'] = settings.WEBSUB_LEASE_SECONDS
+
+    try:
+        response = requests.post(settings.WEBSUB_HUB_URL, data=data, timeout=settings.WEBSUB_TIMEOUT)
+    except requests.RequestException as e:
+        logger.error(f"Hub WebSub indisponível para '{channel.channel_identifier}': {e}")
+        return False
+
+    if response.status_code not in (202, 204):
+        logger.warning(f"Hub WebSub recusou {mode} de '{channel.channel_identifier}': {response.status_code} {response.text[:200]}")
+        return False
+    return True
+
+
+def renew_subscriptions(now=None):
+    """
+    Inscreve os canais do YouTube ativos sem inscrição ou perto de vencer
+    (WEBSUB_RENEW_BEFORE) e desinscreve os que ficaram sem automações.
+    Pedidos sem confirmação só são refeitos depois de WEBSUB_RETRY_SECONDS.
+    Retorna (inscrições pedidas, desinscrições pedidas, falhas).
+    """
+    if not enabled():
+        return 0, 0, 0
+
+    now = now or timezone.now()
+    youtube = MonitoredChannel.objects.filter(platform=Automation.PlatformChoices.YOUTUBE)
+    not_pending = Q(websub_requested_at__isnull=True) | Q(websub_requested_at__lt=now - timedelta(seconds=settings.WEBSUB_RETRY_SECONDS))
+    limit = settings.WEBSUB_MAX_REQUESTS_PER_RUN
+
+    to_subscribe = list(
+        youtube.filter(is_active=True)
+        .filter(Q(websub_lease_expires_at__isnull=True) | Q(websub_lease_expires_at__lt=now + timedelta(seconds=settings.WEBSUB_RENEW_BEFORE)))
+        .filter(not_pending)
+        .order_by('websub_lease_expires_at')[:limit]
+    )
+    to_unsubscribe = list(
+        youtube.filter(is_active=False, websub_lease_expires_at__gt=now).filter(not_pending)[:limit]
+    )
+
+    # Alias sem ID conhecido ainda não tem feed; entra depois que a verificação resolver
+    to_subscribe = [channel for channel in to_subscribe if topic_url(channel.channel_identifier)]
+
+    # O segredo precisa estar gravado antes do pedido: o hub pode confirmar e mandar push na hora
+    without_secret = [channel for channel in to_subscribe if not channel.websub_secret]
+    for channel in without_secret:
+        channel.websub_secret = secrets.token_hex(20)
+    MonitoredChannel.objects.bulk_update(without_secret, ['websub_secret'])
+
+    subscribed = unsubscribed = failed = 0
+    for channel in to_subscribe:
+        if request_subscription(channel, 'subscribe'):
+            subscribed += 1
+        else:
+            failed += 1
+        channel.websub_requested_at = now
+        channel.websub_requested_mode = 'subscribe'
+    for channel in to_unsubscribe:
+        if request_subscription(channel, 'unsubscribe'):
+            unsubscribed += 1
+        else:
+            failed += 1
+        channel.websub_requested_at = now
+        channel.websub_requested_mode = 'unsubscribe'
+
+    MonitoredChannel.objects.bulk_update(to_subscribe + to_unsubscribe, ['websub_requested_at', 'websub_requested_mode'])
+    return subscribed, unsubscribed, failed
+
+
+def verify_intent(channel, params, now=None):
+    """
+    Confirmação de inscrição/desinscrição pedida pelo hub (GET no callback).
+    Só confirma o modo que este app pediu (renew_subscriptions) e que ainda está
+    pendente (menos de WEBSUB_RETRY_SECONDS); o lease fica limitado a
+    WEBSUB_LEASE_SECONDS. Retorna o hub.challenge a ecoar, ou None para recusar.
+    """
+    if not enabled():
+        return None
+
+    mode = params.get('hub.mode')
+    challenge = params.get('hub.challenge')
+    topic = topic_url(channel.channel_identifier)
+    if not challenge or not topic or params.get('hub.topic') != topic:
+        return None
+
+    now = now or timezone.now()
+    pending_since = now - timedelta(seconds=settings.WEBSUB_RETRY_SECONDS)
+    if mode != channel.websub_requested_mode or not channel.websub_requested_at or channel.websub_requested_at < pending_since:
+        return None
+
+    if mode == 'subscribe':
+        if not channel.is_active:
+            return None
+        try:
+            lease_seconds = int(params.get('hub.lease_seconds') or settings.WEBSUB_LEASE_SECONDS)
+        except ValueError:
+            return None
+        if lease_seconds <= 0:
+            return None
+        lease_seconds = min(lease_seconds, settings.WEBSUB_LEASE_SECONDS)
+        channel.websub_lease_expires_at = now + timedelta(seconds=lease_seconds)
+    elif mode == 'unsubscribe':
+        if channel.is_active:
+            return None
+        channel.websub_lease_expires_at = None
+    else:
+        return None
+
+    channel.websub_requested_at = None
+    channel.websub_requested_mode = ''
+    channel.save(update_fields=['websub_lease_expires_at', 'websub_requested_at', 'websub_requested_mode'])
+    return challenge
+
+
+def signature_valid(secret, body, header):
+    """
+    Confere o header X-Hub-Signature ("<algoritmo>=<hex>") contra o HMAC do corpo.
+    """
+    if not secret or not header or '=' not in header:
+        return False
+    algorithm, signature = header.split('=', 1)
+    if algorithm not in SIGNATURE_ALGORITHMS:
+        return False
+    expected = hmac.new(secret.encode(), body, getattr(hashlib, algorithm)).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+def claim_push(channel):
+    """
+    Debounce dos pushes: o hub costuma mandar várias atualizações do mesmo
+    vídeo em sequência; só a primeira em WEBSUB_PUSH_DEBOUNCE segundos dispara verificação.
+    """
+    key = f"websub:push:{channel.pk}"
+    return bool(get_redis().set(key, 1, nx=True, ex=max(1, int(settings.WEBSUB_PUSH_DEBOUNCE))))
@@ -0,0 +1,139 @@
+import logging
+import re
+from urllib.parse import unquote, urlparse
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from .checkers import YOUTUBE_HEADERS, ChannelGone
+from .models import YouTubeChannelAlias
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_ID_RE = re.compile(r'^UC[\w-]{22}$')
+
+# Onde a página de um handle/URL personalizada diz qual é o canal
+CHANNEL_ID_PATTERNS = (
+    re.compile(r'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[\w-]{22})"'),
+    re.compile(r'"externalId":"(UC[\w-]{22})"'),
+    re.compile(r'"channelId":"(UC[\w-]{22})"'),
+)
+
+# Formatos de URL personalizada aceitos além do @handle
+CUSTOM_URL_PREFIXES = ('c', 'user')
+
+# Marca no cache para alias que o YouTube disse não existir
+NOT_FOUND = ''
+
+
+class ChannelNotFound(ChannelGone):
+    """
+    O handle/URL não corresponde a nenhum canal do YouTube.
+    """
+
+
+def is_channel_id(identifier):
+    return bool(CHANNEL_ID_RE.match(identifier or ''))
+
+
+def parse_identifier(identifier):
+    """
+    Separa o que o usuário digitou em (ID do canal, alias). Aceita o ID puro,
+    @handle, e URLs /channel/<id>, /@handle, /c/<nome> e /user/<nome>.
+    O alias é normalizado ('@handle', 'c/nome') e usado como chave da resolução.
+    """
+    value = (identifier or '').strip()
+    if is_channel_id(value):
+        return value, None
+
+    if '/' in value:
+        parsed = urlparse(value if '://' in value else f"https://{value}")
+        parts = [unquote(part) for part in parsed.path.split('/') if part]
+        if not parts:
+            return None, None
+        if parts[0] == 'channel' and len(parts) > 1 and is_channel_id(parts[1]):
+            return parts[1], None
+        if parts[0].startswith('@'):
+            return None, parts[0].lower()
+        if parts[0] in CUSTOM_URL_PREFIXES and len(parts) > 1:
+            return None, f"{parts[0]}/{parts[1].lower()}"
+        return None, None
+
+    if not value:
+        return None, None
+    return None, f"@{value.lstrip('@').lower()}"
+
+
+def _cache_key(alias):
+    return f"youtube:alias:{alias}"
+
+
+def known_channel_id(identifier):
+    """
+    ID do canal sem ir ao YouTube: o próprio identificador ou um alias já resolvido.
+    None quando ainda não se sabe.
+    """
+    channel_id, alias = parse_identifier(identifier)
+    if channel_id or not alias:
+        return channel_id
+
+    cached = cache.get(_cache_key(alias))
+    if cached:
+        return cached
+    if cached == NOT_FOUND:
+        return None
+
+    channel_id = YouTubeChannelAlias.objects.filter(alias=alias).values_list('channel_id', flat=True).first()
+    if channel_id:
+        cache.set(_cache_key(alias), channel_id, settings.YOUTUBE_ALIAS_CACHE_TTL)
+    return channel_id
+
+
+def fetch_channel_id(alias):
+    """
+    Uma requisição à página do alias para descobrir o ID do canal.
+    ChannelNotFound se o YouTube responder 404 ou a página não tiver o ID.
+    """
+    url = f"{settings.YOUTUBE_BASE_URL}/{alias}"
+    response = requests.get(url, headers=YOUTUBE_HEADERS, timeout=settings.LIVE_CHECK_TIMEOUT, allow_redirects=True)
+    if response.status_code == 404:
+        raise ChannelNotFound(alias)
+    response.raise_for_status()
+
+    for pattern in CHANNEL_ID_PATTERNS:
+        match = pattern.search(response.text)
+        if match:
+            return match.group(1)
+    raise ChannelNotFound(alias)
+
+
+def resolve_channel_id(identifier):
+    """
+    ID do canal (UC...) para qualquer formato aceito por parse_identifier.
+    Resolve o alias no YouTube uma única vez; depois vem do cache ou da tabela
+    YouTubeChannelAlias. Levanta ChannelNotFound (também guardado em cache
+    por YOUTUBE_ALIAS_NOT_FOUND_TTL) ou o erro de rede da requisição.
+    """
+    channel_id, alias = parse_identifier(identifier)
+    if channel_id:
+        return channel_id
+    if not alias:
+        raise ChannelNotFound(identifier)
+
+    channel_id = known_channel_id(identifier)
+    if channel_id:
+        return channel_id
+    if cache.get(_cache_key(alias)) == NOT_FOUND:
+        raise ChannelNotFound(alias)
+
+    try:
+        channel_id = fetch_channel_id(alias)
+    except ChannelNotFound:
+        cache.set(_cache_key(alias), NOT_FOUND, settings.YOUTUBE_ALIAS_NOT_FOUND_TTL)
+        raise
+
+    YouTubeChannelAlias.objects.update_or_create(alias=alias, defaults={'channel_id': channel_id})
+    cache.set(_cache_key(alias), channel_id, settings.YOUTUBE_ALIAS_CACHE_TTL)
+    logger.info(f"Alias do YouTube '{alias}' resolvido para {channel_id}")
+    return channel_id
@@ -0,0 +1,356 @@
+"""
+Benchmark de ponta a ponta do pipeline de verificação de lives:
+
+    scheduler_beat -> process_channels_batch -> fila do Discord -> deliver_discord_batch
+
+contra servidores locais que imitam o YouTube, o TikTok e o webhook do Discord
+(benchmarks/stubs.py), com latência, erros e 429 configuráveis.
+
+Uso:
+    python -m benchmarks.pipeline [--automations 1000 10000 100000] [--cycles 3] [--workers 4]
+                                  [--latency 0.05] [--error-rate 0.01] [--rate-limit-rate 0.01]
+                                  [--save resultado.json] [--compare baseline.json --tolerance 0.2]
+                                  [--trace-memory]
+
+Usa um banco de teste descartável, criado e apagado pelo próprio script a
+partir do DATABASES configurado, e um banco Redis separado (--redis-url,
+padrão db 15) que é LIMPO a cada ciclo. As tasks rodam no próprio processo;
+--workers simula quantos workers do Celery processam os lotes em paralelo.
+
+Com --compare, termina com código 1 se checks/s, p99 do ciclo ou consultas
+por ciclo piorarem mais que --tolerance em relação ao baseline salvo com --save.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import close_old_connections, connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+import app.redis_client  # noqa: E402
+from accounts.models import UserProfile  # noqa: E402
+from automations import tasks  # noqa: E402
+from automations.models import Automation, MonitoredChannel, NotificationLog, UserStats  # noqa: E402
+from automations.scheduling import sync_channels  # noqa: E402
+from plans.models import Plan  # noqa: E402
+
+from .stubs import PlatformStub  # noqa: E402
+
+AUTOMATIONS_PER_USER = 10
+
+
+class QueryCounter:
+    """
+    execute_wrapper que soma as consultas de todas as threads.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def peak_rss():
+    """
+    Pico de memória residente do processo, em bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def seed(total, channel_ratio, poll_interval, base_url):
+    """
+    Cria `total` automações (AUTOMATIONS_PER_USER por usuário) espalhadas em
+    total * channel_ratio canais, metade YouTube e metade TikTok.
+    """
+    plan = Plan.objects.create(name="Benchmark", max_automations=total, poll_interval_seconds=poll_interval)
+    user_count = max(1, -(-total // AUTOMATIONS_PER_USER))
+    channel_count = max(AUTOMATIONS_PER_USER, int(total * channel_ratio))
+
+    users = User.objects.bulk_create(
+        [User(username=f"bench{index}") for index in range(user_count)], batch_size=2000
+    )
+    UserProfile.objects.bulk_create([UserProfile(user=user, plan=plan) for user in users], batch_size=2000)
+    UserStats.objects.bulk_create([UserStats(user=user) for user in users], batch_size=2000)
+
+    automations = []
+    for index in range(total):
+        user = users[index // AUTOMATIONS_PER_USER]
+        channel = index % channel_count
+        youtube = channel % 2 == 0
+        automations.append(Automation(
+            name=f"bench {index}",
+            user=user,
+            platform="YOUTUBE" if youtube else "TIKTOK",
+            channel_identifier=f"UC{channel:022d}" if youtube else f"bench{channel}",
+            discord_webhook_url=f"{base_url}/api/webhooks/{user.id}/token",
+        ))
+    Automation.objects.bulk_create(automations, batch_size=2000)
+    sync_channels()
+    return MonitoredChannel.objects.filter(is_active=True).count()
+
+
+def run_cycle(stub, workers):
+    """
+    Um ciclo completo: todos os canais vencidos, lotes processados por
+    `workers` threads e a fila do Discord drenada. Retorna as métricas do ciclo.
+    """
+    app.redis_client.get_redis().flushdb()
+    MonitoredChannel.objects.update(next_check_at=timezone.now() - timedelta(seconds=1))
+
+    queries = QueryCounter()
+    batches = []
+    flushes = []
+    deferred = []
+    batch_times = []
+    lock = threading.Lock()
+
+    def run_in_worker(fn, *args):
+        close_old_connections()
+        try:
+            with connection.execute_wrapper(queries):
+                return fn(*args)
+        finally:
+            connection.close()
+
+    def timed_batch(platform, identifiers):
+        start = time.perf_counter()
+        run_in_worker(tasks.process_channels_batch, platform, identifiers)
+        with lock:
+            batch_times.append(time.perf_counter() - start)
+
+    def collect_flush(args=None, countdown=None, **kwargs):
+        with lock:
+            flushes.append(args[0])
+
+    def collect_deferred(args=None, kwargs=None, countdown=None, **options):
+        with lock:
+            deferred.append(countdown)
+
+    start = time.perf_counter()
+    with mock.patch.object(tasks.process_channels_batch, "delay", side_effect=lambda *a: batches.append(a)), \
+            mock.patch.object(tasks.flush_discord_webhook, "apply_async", side_effect=collect_flush), \
+            mock.patch.object(tasks.flush_discord_webhook, "delay", side_effect=lambda url: collect_flush([url])), \
+            mock.patch.object(tasks.deliver_discord_batch, "apply_async", side_effect=collect_deferred):
+        with connection.execute_wrapper(queries):
+            tasks.scheduler_beat()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda batch: timed_batch(*batch), batches))
+            checked_at = time.perf_counter()
+
+            # A janela de agrupamento do Discord é encurtada: o flush roda logo após os lotes
+            while flushes:
+                with lock:
+                    pending, flushes[:] = list(dict.fromkeys(flushes)), []
+                list(pool.map(lambda url: run_in_worker(tasks.flush_discord_webhook, url), pending))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "channels": sum(len(identifiers) for _, identifiers in batches),
+        "batches": len(batches),
+        "cycle_seconds": elapsed,
+        "check_seconds": checked_at - start,
+        "batch_seconds": batch_times,
+        "queries": queries.count,
+        "discord_deferred": len(deferred),
+    }
+
+
+def run_size(total, args):
+    stub = PlatformStub(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        discord_rate_limit_rate=args.discord_rate_limit_rate,
+        live_ratio=args.live_ratio,
+        seed=args.seed,
+    ).start()
+
+    try:
+        rps = {"YOUTUBE": args.platform_rps, "TIKTOK": args.platform_rps}
+        with override_settings(YOUTUBE_BASE_URL=stub.base_url, TIKTOK_BASE_URL=stub.base_url,
+                               TIKTOK_WEBCAST_URL=f"{stub.base_url}/webcast", LIVE_PLATFORM_RPS=rps,
+                               # Cada ciclo despacha tudo o que venceu (sem backpressure nem o teto por tick,
+                               # canais <= automações); o benchmark mede a vazão, não o limite do scheduler
+                               LIVE_BACKPRESSURE_TARGET_SECONDS=0, LIVE_SCHEDULER_MAX_DISPATCH=max(total, 1)):
+            call_command("flush", interactive=False, verbosity=0)
+            seed_start = time.perf_counter()
+            channels = seed(total, args.channel_ratio, args.poll_interval, stub.base_url)
+            seed_seconds = time.perf_counter() - seed_start
+
+            cycles = []
+            if args.trace_memory:
+                tracemalloc.start()
+            for cycle in range(args.cycles):
+                stub.cycle = cycle
+                if args.trace_memory:
+                    tracemalloc.reset_peak()
+                metrics = run_cycle(stub, args.workers)
+                # tracemalloc mede só o ciclo, mas deixa tudo ~2x mais lento; sem ele vale o pico do processo
+                metrics["peak_memory"] = tracemalloc.get_traced_memory()[1] if args.trace_memory else peak_rss()
+                cycles.append(metrics)
+                print(
+                    f"  ciclo {cycle + 1}/{args.cycles}: {metrics['channels']} canais em "
+                    f"{metrics['cycle_seconds']:.2f}s, {metrics['queries']} consultas",
+                    file=sys.stderr,
+                )
+            if args.trace_memory:
+                tracemalloc.stop()
+    finally:
+        stub.stop()
+
+    batch_seconds = [value for cycle in cycles for value in cycle["batch_seconds"]]
+    cycle_seconds = [cycle["cycle_seconds"] for cycle in cycles]
+    checked = sum(cycle["channels"] for cycle in cycles)
+    return {
+        "automations": total,
+        "channels": channels,
+        "cycles": args.cycles,
+        "workers": args.workers,
+        "seed_seconds": round(seed_seconds, 3),
+        "checks_per_sec": round(checked / sum(cycle["check_seconds"] for cycle in cycles), 1),
+        "cycle_p50": round(percentile(cycle_seconds, 50), 3),
+        "cycle_p99": round(percentile(cycle_seconds, 99), 3),
+        "batch_p50": round(percentile(batch_seconds, 50), 3),
+        "batch_p99": round(percentile(batch_seconds, 99), 3),
+        "queries_per_cycle": round(statistics.mean(cycle["queries"] for cycle in cycles)),
+        "peak_memory_mb": round(max(cycle["peak_memory"] for cycle in cycles) / 1024 / 1024, 1),
+        "notifications": NotificationLog.objects.filter(status="SUCCESS").count(),
+        "discord_deferred": sum(cycle["discord_deferred"] for cycle in cycles),
+        "upstream": dict(stub.counters),
+    }
+
+
+def print_report(results):
+    header = (
+        f"{'automações':>10} {'canais':>8} {'checks/s':>9} {'ciclo p50':>10} {'ciclo p99':>10} "
+        f"{'lote p50':>9} {'lote p99':>9} {'consultas':>10} {'pico mem':>9} {'alertas':>8} {'adiados':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['automations']:>10,} {result['channels']:>8,} {result['checks_per_sec']:>9,.1f} "
+            f"{result['cycle_p50']:>9.2f}s {result['cycle_p99']:>9.2f}s "
+            f"{result['batch_p50']:>8.2f}s {result['batch_p99']:>8.2f}s "
+            f"{result['queries_per_cycle']:>10,} {result['peak_memory_mb']:>7.1f}MB "
+            f"{result['notifications']:>8,} {result['discord_deferred']:>8,}"
+        )
+        upstream = ", ".join(f"{name}={value}" for name, value in sorted(result["upstream"].items()))
+        print(f"{'':>10} {upstream}")
+
+
+def compare(results, baseline_path, tolerance):
+    """
+    Compara com um resultado salvo. Retorna a lista de regressões encontradas.
+    """
+    with open(baseline_path) as handle:
+        baseline = {row["automations"]: row for row in json.load(handle)}
+
+    regressions = []
+    for result in results:
+        base = baseline.get(result["automations"])
+        if not base:
+            continue
+        checks = (
+            ("checks_per_sec", result["checks_per_sec"] < base["checks_per_sec"] * (1 - tolerance)),
+            ("cycle_p99", result["cycle_p99"] > base["cycle_p99"] * (1 + tolerance)),
+            ("queries_per_cycle", result["queries_per_cycle"] > base["queries_per_cycle"] * (1 + tolerance)),
+        )
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append(
+                    f"{result['automations']} automações: {metric} foi de {base[metric]} para {result[metric]}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--automations", type=int, nargs="+", default=[1000])
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--channel-ratio", type=float, default=0.5, help="canais distintos por automação")
+    parser.add_argument("--poll-interval", type=int, default=60)
+    parser.add_argument("--live-ratio", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.02, help="latência base das plataformas (s)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--discord-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--platform-rps", type=float, default=0.0, help="LIVE_PLATFORM_RPS das plataformas (0 desliga)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--save")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--trace-memory", action="store_true", help="pico por ciclo via tracemalloc (mais lento)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for name in ("automations", "discord_webhook"):
+            logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    results = []
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(
+            REDIS_URL=args.redis_url,
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        ):
+            app.redis_client._client = None
+            for total in args.automations:
+                print(f"Rodando com {total} automações...", file=sys.stderr)
+                results.append(run_size(total, args))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print_report(results)
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"!! regressão: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""
+Servidor HTTP local que imita as rotas usadas pelo pipeline de verificação:
+
+    GET  /channel/<id>/live         página /live do YouTube (HTML das fixtures)
+    GET  /@<handle>                 página do canal (só o link canonical; ver `handles`)
+    GET  /api-live/user/room/       sala do TikTok (JSON, ?uniqueId=<usuário>)
+    GET  /webcast/room/check_alive/ status de várias salas do TikTok (?room_ids=<id>,<id>)
+    POST /api/webhooks/<id>/<token> webhook do Discord
+    POST /subscribe                 hub WebSub (guarda o pedido; ver verify_subscriptions/publish)
+
+LiveSocketStub faz o papel do websocket de uma sala do TikTok para o watcher
+(automations.watcher): cada conexão em /<usuário> fica aberta até o teste
+encerrar a live (end_live) ou derrubar a conexão (drop). StandInLiveClient
+tem a parte da interface do TikTokLiveClient usada pelo watcher.
+
+Latência, taxa de erro (500) e taxa de 429 são configuráveis. Quem está ao
+vivo é decidido por um hash estável do canal e do ciclo atual, então cada
+ciclo do benchmark gera inícios e fins de live reproduzíveis.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from TikTokLive.client.errors import UserOfflineError
+from TikTokLive.events import ConnectEvent, DisconnectEvent, LiveEndEvent
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed, InvalidStatus
+
+ATOM_NOTIFICATION = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <yt:videoId>VIDEO</yt:videoId>
+    <yt:channelId>{channel_id}</yt:channelId>
+    <title>Live</title>
+  </entry>
+</feed>
+"""
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+class PlatformStub:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 discord_rate_limit_rate=0.0, live_ratio=0.05, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.discord_rate_limit_rate = discord_rate_limit_rate
+        self.live_ratio = live_ratio
+        self.cycle = 0
+        self.counters = Counter()
+        # Pedidos recebidos pelo hub WebSub, por (callback, tópico)
+        self.rooms = {}
+        # @handle (minúsculo) -> ID do canal servido em /@<handle>
+        self.handles = {}
+        self.hub_requests = {}
+        self.subscriptions = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages = {
+            True: (FIXTURES_DIR / "youtube_live.html").read_bytes(),
+            False: (FIXTURES_DIR / "youtube_offline.html").read_bytes(),
+        }
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        stub = self
+
+        class Handler(StubHandler):
+            pass
+
+        Handler.stub = stub
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def is_live(self, identifier):
+        bucket = zlib.crc32(f"{identifier}:{self.cycle}".encode()) % 10000
+        return bucket < self.live_ratio * 10000
+
+    def roll(self, rate):
+        with self._lock:
+            return self._random.random() < rate
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def delay(self):
+        with self._lock:
+            extra = self._random.uniform(0, self.jitter) if self.jitter else 0
+        if self.latency or extra:
+            time.sleep(self.latency + extra)
+
+    def verify_subscriptions(self, send=None):
+        """
+        Confirma os pedidos pendentes do hub com um GET no callback (hub.challenge).
+        `send(method, url, params=None, body=None, headers=None)` -> (status, texto);
+        o padrão é HTTP de verdade. Retorna quantos o callback confirmou.
+        """
+        send = send or http_send
+        with self._lock:
+            pending, self.hub_requests = self.hub_requests, {}
+
+        confirmed = 0
+        for (callback, topic), request in pending.items():
+            challenge = f"challenge-{random.getrandbits(32)}"
+            params = {"hub.mode": request["hub.mode"], "hub.topic": topic, "hub.challenge": challenge}
+            if request["hub.mode"] == "subscribe":
+                params["hub.lease_seconds"] = request.get("hub.lease_seconds", "432000")
+            status, text = send("GET", callback, params=params)
+            if not 200 <= status < 300 or text != challenge:
+                continue
+            confirmed += 1
+            with self._lock:
+                if request["hub.mode"] == "subscribe":
+                    self.subscriptions[(callback, topic)] = request.get("hub.secret", "")
+                else:
+                    self.subscriptions.pop((callback, topic), None)
+        return confirmed
+
+    def publish(self, topic, body, send=None, secret=None):
+        """
+        Entrega um aviso (Atom) a todos os inscritos no tópico, assinado com
+        HMAC-SHA1 do segredo de cada inscrição (ou `secret`, para simular uma
+        assinatura errada). Retorna os status devolvidos pelos callbacks.
+        """
+        send = send or http_send
+        body = body.encode() if isinstance(body, str) else body
+        with self._lock:
+            targets = [(callback, key) for (callback, subscribed), key in self.subscriptions.items() if subscribed == topic]
+
+        statuses = []
+        for callback, key in targets:
+            signature = hmac.new((secret or key).encode(), body, hashlib.sha1).hexdigest()
+            headers = {"Content-Type": "application/atom+xml", "X-Hub-Signature": f"sha1={signature}"}
+            statuses.append(send("POST", callback, body=body, headers=headers)[0])
+        return statuses
+
+
+def http_send(method, url, params=None, body=None, headers=None):
+    response = requests.request(method, url, params=params, data=body, headers=headers, timeout=10)
+    return response.status_code, response.text
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stub = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+
+        if len(parts) == 3 and parts[0] == "channel" and parts[2] == "live":
+            return self.youtube(parts[1])
+        if len(parts) == 1 and parts[0].startswith("@"):
+            return self.youtube_handle(parts[0].lower())
+        if url.path.rstrip("/") == "/api-live/user/room":
+            return self.tiktok(parse_qs(url.query).get("uniqueId", [""])[0])
+        if url.path.rstrip("/") == "/webcast/room/check_alive":
+            return self.check_alive(parse_qs(url.query).get("room_ids", [""])[0])
+        self.send_json(404, {"message": "not found"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.startswith("/api/webhooks/"):
+            return self.discord(body)
+        if urlparse(self.path).path.rstrip("/") == "/subscribe":
+            return self.hub(body)
+        self.send_json(404, {"message": "not found"})
+
+    def upstream_failure(self, platform):
+        """
+        Sorteia 500/429 para as plataformas. Retorna True se já respondeu.
+        """
+        if self.stub.roll(self.stub.error_rate):
+            self.stub.count(f"{platform}_500")
+            self.send_json(500, {"message": "internal error"})
+            return True
+        if self.stub.roll(self.stub.rate_limit_rate):
+            self.stub.count(f"{platform}_429")
+            self.send_json(429, {"message": "too many requests"}, headers={"Retry-After": "1"})
+            return True
+        return False
+
+    def youtube(self, channel_id):
+        self.stub.delay()
+        self.stub.count("youtube_requests")
+        if self.upstream_failure("youtube"):
+            return
+
+        page = self.stub._pages[self.stub.is_live(channel_id)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        try:
+            # Em pedaços, para o cliente conseguir fechar a conexão no meio da página
+            for start in range(0, len(page), 16384):
+                self.wfile.write(page[start:start + 16384])
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def youtube_handle(self, handle):
+        self.stub.count("youtube_handle_requests")
+        channel_id = self.stub.handles.get(handle)
+        if channel_id is None:
+            return self.send_json(404, {"message": "not found"})
+
+        page = f'<html><head><link rel="canonical" href="https://www.youtube.com/channel/{channel_id}"></head></html>'.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def tiktok(self, username):
+        self.stub.delay()
+        self.stub.count("tiktok_requests")
+        if self.upstream_failure("tiktok"):
+            return
+
+        live = self.stub.is_live(username)
+        room_id = str(zlib.crc32(username.encode()))
+        with self.stub._lock:
+            self.stub.rooms[room_id] = username
+        self.send_json(200, {
+            "data": {
+                "user": {"uniqueId": username, "roomId": room_id},
+                "liveRoom": {
+                    "status": 2 if live else 4,
+                    "title": f"Live de {username}" if live else "",
+                    "coverUrl": "https://example.com/cover.jpg" if live else "",
+                },
+            },
+        })
+
+    def check_alive(self, room_ids):
+        self.stub.delay()
+        self.stub.count("tiktok_check_alive_requests")
+        if self.upstream_failure("tiktok"):
+            return
+
+        rooms = [room_id for room_id in room_ids.split(",") if room_id]
+        self.send_json(200, {
+            "data": [
+                {"room_id": int(room_id), "alive": room_id in self.stub.rooms and self.stub.is_live(self.stub.rooms[room_id])}
+                for room_id in rooms
+            ],
+            "status_code": 0,
+        })
+
+    def discord(self, body):
+        self.stub.delay()
+        self.stub.count("discord_requests")
+        if self.stub.roll(self.stub.discord_rate_limit_rate):
+            self.stub.count("discord_429")
+            return self.send_json(
+                429,
+                {"message": "You are being rate limited.", "retry_after": 0.5, "global": False},
+                headers={"Retry-After": "0.5"},
+            )
+        if self.stub.roll(self.stub.error_rate):
+            self.stub.count("discord_500")
+            return self.send_json(500, {"message": "internal error"})
+
+        try:
+            embeds = len(json.loads(body or b"{}").get("embeds") or [])
+        except ValueError:
+            embeds = 0
+        self.stub.count("discord_embeds", embeds)
+        self.send_json(200, {"id": "1", "embeds": []})
+
+    def hub(self, body):
+        request = {name: values[0] for name, values in parse_qs(body.decode()).items()}
+        if request.get("hub.mode") not in ("subscribe", "unsubscribe") or not request.get("hub.callback"):
+            return self.send_json(400, {"message": "bad request"})
+        self.stub.count(f"hub_{request['hub.mode']}")
+        with self.stub._lock:
+            self.stub.hub_requests[(request["hub.callback"], request.get("hub.topic", ""))] = request
+        self.send_response(202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class LiveSocketStub:
+    """
+    Servidor websocket local. Usuários em `live` aceitam a conexão e recebem
+    "connect"; os demais são recusados com 404 (o cliente real levanta
+    UserOfflineError nesse caso).
+    """
+
+    def __init__(self, live=()):
+        self.live = set(live)
+        self.connections = {}
+        self.counters = Counter()
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = list(self._server.sockets)[0].getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    async def start(self):
+        self._server = await serve(self.handler, "127.0.0.1", 0, process_request=self.process_request)
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def process_request(self, connection, request):
+        if request.path.strip("/") not in self.live:
+            self.counters["rejected"] += 1
+            return connection.respond(404, "offline\n")
+        return None
+
+    async def handler(self, websocket):
+        username = websocket.request.path.strip("/")
+        self.connections[username] = websocket
+        self.counters["connections"] += 1
+        await websocket.send("connect")
+        await websocket.wait_closed()
+
+    async def end_live(self, username):
+        """
+        A live terminou: avisa o cliente e fecha a conexão.
+        """
+        self.live.discard(username)
+        websocket = self.connections.pop(username)
+        await websocket.send("live_end")
+        await websocket.close()
+
+    async def drop(self, username):
+        """
+        A conexão cai sem aviso (a live pode continuar).
+        """
+        await self.connections.pop(username).close()
+
+    def client_factory(self, unique_id):
+        return StandInLiveClient(self.base_url, unique_id)
+
+
+class StandInLiveClient:
+    """
+    on / start / disconnect como no TikTokLiveClient, falando com o LiveSocketStub.
+    """
+
+    def __init__(self, base_url, unique_id):
+        self.url = f"{base_url}/{unique_id}"
+        self.unique_id = unique_id
+        self.handlers = defaultdict(list)
+        self._websocket = None
+        self._task = None
+
+    def on(self, event, f):
+        self.handlers[event.get_type()].append(f)
+        return f
+
+    async def emit(self, event, payload):
+        for handler in self.handlers[event.get_type()]:
+            result = handler(payload)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def start(self, **kwargs):
+        try:
+            self._websocket = await connect(self.url)
+        except InvalidStatus:
+            raise UserOfflineError()
+        self._task = asyncio.create_task(self._loop())
+        return self._task
+
+    async def _loop(self):
+        try:
+            async for message in self._websocket:
+                if message == "connect":
+                    await self.emit(ConnectEvent, ConnectEvent(unique_id=self.unique_id, room_id=0))
+                elif message == "live_end":
+                    # O LiveEndEvent do TikTokLive só nasce de um payload protobuf
+                    await self.emit(LiveEndEvent, None)
+        except ConnectionClosed:
+            pass
+        await self.emit(DisconnectEvent, DisconnectEvent())
+
+    async def disconnect(self, close_client=False):
+        if self._websocket is not None:
+            await self._websocket.close()
+        if self._task is not None:
+            await self._task
+            self._task = None
@@ -0,0 +1,88 @@
+"""
+Micro-benchmark: leitura completa da página /live (response.text + regex)
+contra o scanner em streaming com saída antecipada.
+
+Uso:
+    python -m benchmarks.youtube_scanner [--chunk-size 16384] [--repeat 200] [arquivos.html ...]
+
+Sem argumentos, usa as páginas salvas em benchmarks/fixtures/. Para medir com
+páginas reais, salve o HTML de https://www.youtube.com/channel/<id>/live e
+passe o caminho do arquivo.
+"""
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+from automations.checkers import parse_youtube_html
+from automations.scanner import scan_chunks
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def iter_chunks(body, chunk_size):
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+def full_text(body, chunk_size):
+    # Abordagem antiga: junta o corpo inteiro, decodifica e roda as regex
+    raw = b"".join(iter_chunks(body, chunk_size))
+    return parse_youtube_html(raw.decode("utf-8", errors="replace")), len(raw)
+
+
+def streaming(body, chunk_size):
+    scanner = scan_chunks(iter_chunks(body, chunk_size))
+    return scanner.result(), scanner.bytes_read
+
+
+def measure(fn, body, chunk_size, repeat):
+    result, bytes_read = fn(body, chunk_size)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(body, chunk_size)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    fn(body, chunk_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, bytes_read, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--chunk-size", type=int, default=16384)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    files = args.files or sorted(FIXTURES_DIR.glob("*.html"))
+
+    header = f"{'página':<24} {'método':<10} {'bytes lidos':>12} {'tempo/pág':>12} {'pico mem':>10}  resultado"
+    print(header)
+    print("-" * len(header))
+
+    for path in files:
+        body = path.read_bytes()
+        rows = {}
+        for name, fn in (("full-text", full_text), ("streaming", streaming)):
+            rows[name] = measure(fn, body, args.chunk_size, args.repeat)
+            result, bytes_read, elapsed, peak = rows[name]
+            print(
+                f"{path.name:<24} {name:<10} {bytes_read:>12,} {elapsed * 1e6:>10.0f}µs "
+                f"{peak / 1024:>8.0f}KB  live={result[0]} title={result[1]!r}"
+            )
+
+        if rows["full-text"][0] != rows["streaming"][0]:
+            print(f"  !! resultados divergentes para {path.name}")
+
+        speedup = rows["full-text"][2] / rows["streaming"][2]
+        saved = 1 - rows["streaming"][1] / rows["full-text"][1]
+        print(f"  -> {speedup:.1f}x mais rápido, {saved:.0%} menos bytes lidos\n")
+
+
+if __name__ == "__main__":
+    main()
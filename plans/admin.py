@@ -3,6 +3,6 @@ from .models import Plan
 
 @admin.register(Plan)
 class PlanAdmin(admin.ModelAdmin):
-    list_display = ('name', 'max_automations', 'price')
+    list_display = ('name', 'max_automations', 'poll_interval_seconds', 'price')
     search_fields = ('name',)
     ordering = ('price',)
\ No newline at end of file
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plan',
+            name='poll_interval_seconds',
+            field=models.PositiveIntegerField(default=60, help_text='De quanto em quanto tempo os canais dos assinantes deste plano são verificados.', verbose_name='Intervalo de Verificação (segundos)'),
+        ),
+    ]
@@ -6,6 +6,11 @@ class Plan(models.Model):
     name = models.CharField(max_length=50, verbose_name="Nome do Plano")
     max_automations = models.IntegerField(default=1, verbose_name="Limite de Automações")
     price = models.DecimalField(max_digits=6, decimal_places=2, default=0.00, verbose_name="Preço Mensal")
+    poll_interval_seconds = models.PositiveIntegerField(
+        default=60,
+        verbose_name="Intervalo de Verificação (segundos)",
+        help_text="De quanto em quanto tempo os canais dos assinantes deste plano são verificados."
+    )
 
     def __str__(self):
         return f"{self.name} ({self.max_automations} automações)"